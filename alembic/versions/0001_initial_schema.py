@@ -0,0 +1,145 @@
+"""initial schema
+
+Схема, которую создавал create_all до появления миграций. Существующую базу
+этой версии отмечают командой `alembic stamp 0001`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table("users",
+    sa.Column("id", sa.Integer(), nullable=False),
+    sa.Column("username", sa.String(), nullable=True),
+    sa.Column("email", sa.String(), nullable=True),
+    sa.Column("hashed_password", sa.String(), nullable=False),
+    sa.Column("is_active", sa.Boolean(), nullable=True),
+    sa.Column("is_superuser", sa.Boolean(), nullable=True),
+    sa.Column("is_verified", sa.Boolean(), nullable=True),
+    sa.Column("role", sa.Enum("user", "manager", "team_admin", "admin", name="roleenum"), nullable=False),
+    sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+    sa.Column("member_of_team", sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint("id")
+    )
+    op.create_index(op.f("ix_users_email"), "users", ["email"], unique=True)
+    op.create_index(op.f("ix_users_id"), "users", ["id"], unique=True)
+    op.create_index(op.f("ix_users_username"), "users", ["username"], unique=True)
+
+    op.create_table("teams",
+    sa.Column("team_id", sa.Integer(), nullable=False),
+    sa.Column("team_name", sa.String(), nullable=True),
+    sa.Column("invite_code", sa.String(), nullable=True),
+    sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+    sa.Column("team_admin", sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(["team_admin"], ["users.id"], ),
+    sa.PrimaryKeyConstraint("team_id"),
+    sa.UniqueConstraint("invite_code")
+    )
+    op.create_index(op.f("ix_teams_team_id"), "teams", ["team_id"], unique=True)
+    op.create_index(op.f("ix_teams_team_name"), "teams", ["team_name"], unique=True)
+    # users и teams ссылаются друг на друга - внешний ключ добавляется после обеих таблиц
+    op.create_foreign_key("users_member_of_team_fkey", "users", "teams", ["member_of_team"], ["team_id"])
+
+    op.create_table("tasks",
+    sa.Column("task_id", sa.Integer(), nullable=False),
+    sa.Column("task_name", sa.String(), nullable=False),
+    sa.Column("task_description", sa.Text(), nullable=True),
+    sa.Column("status", sa.Enum("open", "in_progress", "completed", name="taskstatusenum"), nullable=False),
+    sa.Column("deadline", sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+    sa.Column("task_executor", sa.Integer(), nullable=True),
+    sa.Column("task_checker", sa.Integer(), nullable=True),
+    sa.Column("team_id", sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(["task_checker"], ["users.id"], ondelete="SET NULL"),
+    sa.ForeignKeyConstraint(["task_executor"], ["users.id"], ondelete="SET NULL"),
+    sa.ForeignKeyConstraint(["team_id"], ["teams.team_id"], ),
+    sa.PrimaryKeyConstraint("task_id")
+    )
+    op.create_index(op.f("ix_tasks_task_id"), "tasks", ["task_id"], unique=True)
+
+    op.create_table("meetings",
+    sa.Column("meeting_id", sa.Integer(), nullable=False),
+    sa.Column("meeting_name", sa.String(), nullable=False),
+    sa.Column("meeting_description", sa.Text(), nullable=True),
+    sa.Column("meeting_date", sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column("duration_minutes", sa.Integer(), nullable=True),
+    sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+    sa.Column("meeting_admin", sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(["meeting_admin"], ["users.id"], ondelete="SET NULL"),
+    sa.PrimaryKeyConstraint("meeting_id")
+    )
+    op.create_index(op.f("ix_meetings_meeting_id"), "meetings", ["meeting_id"], unique=True)
+
+    op.create_table("meeting_participants",
+    sa.Column("meeting_id", sa.Integer(), nullable=False),
+    sa.Column("user_id", sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(["meeting_id"], ["meetings.meeting_id"], ondelete="CASCADE"),
+    sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+    sa.PrimaryKeyConstraint("meeting_id", "user_id")
+    )
+
+    op.create_table("evaluations",
+    sa.Column("evaluation_id", sa.Integer(), nullable=False),
+    sa.Column("evaluation_name", sa.String(), nullable=True),
+    sa.Column("evaluation_value", sa.Integer(), nullable=False),
+    sa.Column("evaluation_comment", sa.Text(), nullable=True),
+    sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+    sa.Column("task_id", sa.Integer(), nullable=False),
+    sa.Column("evaluator_id", sa.Integer(), nullable=True),
+    sa.CheckConstraint("evaluation_value >= 1 AND evaluation_value <= 5", name="ck_evaluation_value_range"),
+    sa.ForeignKeyConstraint(["evaluator_id"], ["users.id"], ondelete="SET NULL"),
+    sa.ForeignKeyConstraint(["task_id"], ["tasks.task_id"], ondelete="CASCADE"),
+    sa.PrimaryKeyConstraint("evaluation_id"),
+    sa.UniqueConstraint("task_id", "evaluator_id", name="uq_task_evaluator")
+    )
+    op.create_index(op.f("ix_evaluations_evaluation_id"), "evaluations", ["evaluation_id"], unique=True)
+
+    op.create_table("comments",
+    sa.Column("comment_id", sa.Integer(), nullable=False),
+    sa.Column("content", sa.Text(), nullable=False),
+    sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+    sa.Column("task_id", sa.Integer(), nullable=False),
+    sa.Column("author_id", sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(["author_id"], ["users.id"], ondelete="SET NULL"),
+    sa.ForeignKeyConstraint(["task_id"], ["tasks.task_id"], ondelete="CASCADE"),
+    sa.PrimaryKeyConstraint("comment_id")
+    )
+    op.create_index(op.f("ix_comments_comment_id"), "comments", ["comment_id"], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_comments_comment_id"), table_name="comments")
+    op.drop_table("comments")
+    op.drop_index(op.f("ix_evaluations_evaluation_id"), table_name="evaluations")
+    op.drop_table("evaluations")
+    op.drop_table("meeting_participants")
+    op.drop_index(op.f("ix_meetings_meeting_id"), table_name="meetings")
+    op.drop_table("meetings")
+    op.drop_index(op.f("ix_tasks_task_id"), table_name="tasks")
+    op.drop_table("tasks")
+    op.drop_constraint("users_member_of_team_fkey", "users", type_="foreignkey")
+    op.drop_index(op.f("ix_teams_team_name"), table_name="teams")
+    op.drop_index(op.f("ix_teams_team_id"), table_name="teams")
+    op.drop_table("teams")
+    op.drop_index(op.f("ix_users_username"), table_name="users")
+    op.drop_index(op.f("ix_users_id"), table_name="users")
+    op.drop_index(op.f("ix_users_email"), table_name="users")
+    op.drop_table("users")
+    sa.Enum(name="taskstatusenum").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="roleenum").drop(op.get_bind(), checkfirst=True)
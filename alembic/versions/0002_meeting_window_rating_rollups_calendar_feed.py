@@ -0,0 +1,87 @@
+"""meeting window, rating rollups, calendar feed
+
+Конец встречи для поиска пересечений, сводные таблицы оценок,
+updated_at для водяного знака и токен календарной подписки.
+Существующие строки заполняются в этой же миграции.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 10:10:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # конец встречи
+    op.add_column("meetings", sa.Column("meeting_end", sa.TIMESTAMP(timezone=True), nullable=True))
+    op.execute(
+        "UPDATE meetings SET duration_minutes = COALESCE(duration_minutes, 60), "
+        "meeting_end = meeting_date + make_interval(mins => COALESCE(duration_minutes, 60))"
+    )
+    op.alter_column("meetings", "meeting_end", nullable=False)
+    op.create_index("ix_meetings_window", "meetings", ["meeting_date", "meeting_end"], unique=False)
+    op.create_index("ix_meetings_period", "meetings", [sa.text("tstzrange(meeting_date, meeting_end)")],
+                    unique=False, postgresql_using="gist")
+
+    # время изменения для водяного знака календарной подписки
+    op.add_column("tasks", sa.Column("updated_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False))
+    op.add_column("meetings", sa.Column("updated_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False))
+
+    # токен календарной подписки (хранится хэш)
+    op.add_column("users", sa.Column("calendar_feed_token_hash", sa.String(length=64), nullable=True))
+    op.create_index("ix_users_calendar_feed_token_hash", "users", ["calendar_feed_token_hash"], unique=True,
+                    postgresql_where=sa.text("calendar_feed_token_hash IS NOT NULL"))
+
+    # сводные таблицы оценок
+    op.create_table("user_rating_daily",
+    sa.Column("user_id", sa.Integer(), nullable=False),
+    sa.Column("bucket_date", sa.Date(), nullable=False),
+    sa.Column("rating_sum", sa.Integer(), nullable=False),
+    sa.Column("rating_count", sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+    sa.PrimaryKeyConstraint("user_id", "bucket_date")
+    )
+    op.create_table("task_rating_totals",
+    sa.Column("task_id", sa.Integer(), nullable=False),
+    sa.Column("rating_sum", sa.Integer(), nullable=False),
+    sa.Column("rating_count", sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(["task_id"], ["tasks.task_id"], ondelete="CASCADE"),
+    sa.PrimaryKeyConstraint("task_id")
+    )
+    op.execute(
+        "INSERT INTO user_rating_daily (user_id, bucket_date, rating_sum, rating_count) "
+        "SELECT tasks.task_executor, CAST(timezone('UTC', evaluations.created_at) AS DATE), "
+        "sum(evaluations.evaluation_value), count(*) "
+        "FROM evaluations JOIN tasks ON tasks.task_id = evaluations.task_id "
+        "WHERE tasks.task_executor IS NOT NULL "
+        "GROUP BY tasks.task_executor, CAST(timezone('UTC', evaluations.created_at) AS DATE)"
+    )
+    op.execute(
+        "INSERT INTO task_rating_totals (task_id, rating_sum, rating_count) "
+        "SELECT task_id, sum(evaluation_value), count(*) FROM evaluations GROUP BY task_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("task_rating_totals")
+    op.drop_table("user_rating_daily")
+    op.drop_index("ix_users_calendar_feed_token_hash", table_name="users")
+    op.drop_column("users", "calendar_feed_token_hash")
+    op.drop_column("meetings", "updated_at")
+    op.drop_column("tasks", "updated_at")
+    op.drop_index("ix_meetings_period", table_name="meetings")
+    op.drop_index("ix_meetings_window", table_name="meetings")
+    op.drop_column("meetings", "meeting_end")
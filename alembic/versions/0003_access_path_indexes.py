@@ -0,0 +1,62 @@
+"""access path indexes
+
+Индексы под фильтры репозиториев, в том числе частичный индекс незавершенных
+задач исполнителя по дедлайну. Создаются CONCURRENTLY, чтобы не
+блокировать запись в рабочие таблицы на время построения.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 10:20:00
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (имя, таблица, колонки)
+INDEXES = [
+    # календарь и подписка: задачи исполнителя по дедлайну; список задач исполнителя
+    ("ix_tasks_executor_deadline", "tasks", ["task_executor", "deadline"]),
+    # незавершенные задачи исполнителя по дедлайну (частичный, без завершенных)
+    ("ix_tasks_executor_open_deadline", "tasks", ["task_executor", "deadline"]),
+    # задачи пользователя (исполнитель или проверяющий), порядок keyset по task_id
+    ("ix_tasks_checker", "tasks", ["task_checker", "task_id"]),
+    # задачи команды с фильтром статуса, порядок keyset по task_id
+    ("ix_tasks_team_status", "tasks", ["team_id", "status", "task_id"]),
+    # оценки, выставленные пользователем (task_id покрыт uq_task_evaluator)
+    ("ix_evaluations_evaluator_created", "evaluations", ["evaluator_id", "created_at"]),
+    # комментарии задачи, порядок keyset по comment_id
+    ("ix_comments_task", "comments", ["task_id", "comment_id"]),
+    # встречи участника (первичный ключ начинается с meeting_id)
+    ("ix_meeting_participants_user_id", "meeting_participants", ["user_id", "meeting_id"]),
+]
+
+# условия частичных индексов
+WHERE = {
+    "ix_tasks_executor_open_deadline": "status <> 'completed'",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            where = sa.text(WHERE[name]) if name in WHERE else None
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True,
+                            postgresql_where=where, sqlite_where=where)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
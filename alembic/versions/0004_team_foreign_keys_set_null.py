@@ -0,0 +1,41 @@
+"""team foreign keys set null
+
+Удаление команды одним DELETE: участники и задачи команды отвязываются
+базой (ON DELETE SET NULL), а не загрузкой и каскадом ORM.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 10:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (имя, таблица, колонка)
+FOREIGN_KEYS = [
+    ("users_member_of_team_fkey", "users", "member_of_team"),
+    ("tasks_team_id_fkey", "tasks", "team_id"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, column in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_="foreignkey")
+        op.create_foreign_key(name, table, "teams", [column], ["team_id"], ondelete="SET NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, column in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_="foreignkey")
+        op.create_foreign_key(name, table, "teams", [column], ["team_id"])
@@ -1,11 +1,20 @@
 """Админская панель"""
 import os
-from sqladmin import ModelView
+from typing import Any, List, Optional
+from sqladmin import Admin, ModelView
+from sqladmin._queries import Query
 from sqladmin.authentication import AuthenticationBackend
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import selectinload
+from starlette.applications import Starlette
 from starlette.requests import Request
-from fastapi_users.password import PasswordHelper
 from wtforms import PasswordField
 from fastapi import HTTPException
+from app.database import loading
+from app.database.repository import rating_repo
+from app.services.password_pool import password_pool
+from app.services.principal import principal_cache
 from app.database.models import (User,
                                  Team,
                                  Task,
@@ -14,9 +23,6 @@ from app.database.models import (User,
                                  Comment)
 
 
-password_helper = PasswordHelper()
-
-
 """ аутентификация """
 
 
@@ -38,8 +44,67 @@ class SimpleAuth(AuthenticationBackend):
         request.session.pop("admin_user", None)
 
 
+class ProfiledModelView(ModelView):
+    """Базовая вкладка: связи моделей не грузятся жадно, поэтому
+    страница просмотра явно подгружает отображаемые связи"""
+    list_options = loading.NONE
+
+    def list_query(self, request: Request) -> Select:
+        return super().list_query(request).options(*self.list_options)
+
+    def details_query(self, request: Request) -> Select:
+        stmt = super().details_query(request)
+        for relation in self._details_relations:
+            stmt = stmt.options(selectinload(relation))
+        return stmt
+
+
+class RatedModelView(ProfiledModelView):
+    """
+    Вкладка моделей, от которых зависят сводные суммы оценок: запись и пересчет
+    сумм по разнице вклада затронутых задач идут одной транзакцией
+    """
+
+    def rated_task_ids(self, obj: Any) -> List[Optional[int]]:
+        """Задачи, вклад которых меняет запись объекта"""
+        return [obj.task_id]
+
+    async def insert_model(self, request: Request, data: dict) -> Any:
+        async with self.session_maker(expire_on_commit=False) as session:
+            with session.no_autoflush:
+                obj = await Query(self)._set_attributes_async(session, self.model(), data)
+                session.add(obj)
+                before = await rating_repo.snapshot(session, self.rated_task_ids(obj))
+            await rating_repo.settle(session, before)
+            await session.commit()
+            return obj
+
+    async def update_model(self, request: Request, pk: str, data: dict) -> Any:
+        stmt = self._stmt_by_identifier(pk)
+        for relation in self._form_relations:
+            stmt = stmt.options(selectinload(relation))
+
+        async with self.session_maker(expire_on_commit=False) as session:
+            obj = (await session.execute(stmt)).scalars().first()
+            task_ids = self.rated_task_ids(obj)
+            with session.no_autoflush:
+                obj = await Query(self)._set_attributes_async(session, obj, data)
+                before = await rating_repo.snapshot(session, task_ids + self.rated_task_ids(obj))
+            await rating_repo.settle(session, before)
+            await session.commit()
+            return obj
+
+    async def delete_model(self, request: Request, pk: Any) -> None:
+        async with self.session_maker() as session:
+            obj = (await session.execute(self._stmt_by_identifier(pk))).scalars().first()
+            before = await rating_repo.snapshot(session, self.rated_task_ids(obj))
+            await session.delete(obj)
+            await rating_repo.settle(session, before)
+            await session.commit()
+
+
 # Регистрируем модели
-class UserAdmin(ModelView, model=User):
+class UserAdmin(ProfiledModelView, model=User):
     """вкладка для User"""
     column_list = [User.id,
                    User.username,
@@ -93,22 +158,30 @@ class UserAdmin(ModelView, model=User):
             raise HTTPException(
                 status_code=400,
                 detail="Password is required when creating a user via admin.")
-        data["hashed_password"] = password_helper.hash(pw)
+        data["hashed_password"] = await password_pool.hash(pw)
         return await super().insert_model(request, data)
 
     async def update_model(self, request: Request, pk, data: dict):
         if "password" in data:
             pw = data.pop("password")
             if pw:
-                data["hashed_password"] = password_helper.hash(pw)
+                data["hashed_password"] = await password_pool.hash(pw)
             else:
                 data.pop("hashed_password", None)
 
-        return await super().update_model(request, pk, data)
+        user = await super().update_model(request, pk, data)
+        principal_cache.invalidate(int(pk))
+        return user
+
+    async def delete_model(self, request: Request, pk) -> None:
+        await super().delete_model(request, pk)
+        principal_cache.invalidate(int(pk))
 
 
-class TeamAdmin(ModelView, model=Team):
+class TeamAdmin(ProfiledModelView, model=Team):
     """вкладка для Team"""
+    list_options = loading.TEAM_ADMIN
+
     column_list = [Team.team_id,
                    Team.team_name,
                    Team.admin,
@@ -123,8 +196,10 @@ class TeamAdmin(ModelView, model=Team):
     }
 
 
-class TaskAdmin(ModelView, model=Task):
+class TaskAdmin(RatedModelView, model=Task):
     """вкладка для Task"""
+    list_options = loading.TASK_ADMIN
+
     column_list = [Task.task_id,
                    Task.task_name,
                    Task.status,
@@ -150,8 +225,16 @@ class TaskAdmin(ModelView, model=Task):
     column_searchable_list = [Task.task_name]
     column_sortable_list = [Task.task_id, Task.task_name]
 
+    async def delete_model(self, request: Request, pk: Any) -> None:
+        # оценки удаляет база (ON DELETE CASCADE): их вклад вычитается до удаления
+        async with self.session_maker() as session:
+            task = (await session.execute(self._stmt_by_identifier(pk))).scalars().first()
+            await rating_repo.remove_task(session, task.task_id, task.task_executor)
+            await session.delete(task)
+            await session.commit()
+
 
-class MeetingAdmin(ModelView, model=Meeting):
+class MeetingAdmin(ProfiledModelView, model=Meeting):
     """вкладка для Meeting"""
     column_list = [Meeting.meeting_id,
                    Meeting.meeting_name,
@@ -167,7 +250,7 @@ class MeetingAdmin(ModelView, model=Meeting):
     }
 
 
-class EvaluationAdmin(ModelView, model=Evaluation):
+class EvaluationAdmin(RatedModelView, model=Evaluation):
     """вкладка для Evaluation"""
     column_list = [Evaluation.evaluation_id,
                    Evaluation.evaluation_value,
@@ -190,7 +273,7 @@ class EvaluationAdmin(ModelView, model=Evaluation):
                             Evaluation.created_at]
 
 
-class CommentAdmin(ModelView, model=Comment):
+class CommentAdmin(ProfiledModelView, model=Comment):
     """вкладка для Comment"""
     column_list = [Comment.comment_id,
                    Comment.content,
@@ -205,3 +288,18 @@ class CommentAdmin(ModelView, model=Comment):
             m.created_at.strftime("%Y-%m-%d %H:%M:%S") if m.created_at else None
         )
     }
+
+
+def create_admin(engine: AsyncEngine, secret_key: str, base_url: str = "/admin") -> Starlette:
+    """
+    Собрать sqladmin со всеми вкладками и вернуть его ASGI-приложение.
+    Монтирует его вызывающий (main.py - лениво, при первом запросе к /admin)
+    """
+    admin = Admin(app=Starlette(), engine=engine, authentication_backend=SimpleAuth(secret_key), base_url=base_url)
+
+    admin.add_view(UserAdmin)
+    admin.add_view(TeamAdmin)
+    admin.add_view(TaskAdmin)
+    admin.add_view(MeetingAdmin)
+    admin.add_view(EvaluationAdmin)
+    return admin.admin
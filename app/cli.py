@@ -0,0 +1,175 @@
+"""Служебные команды: python -m app.cli <команда>"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+import httpx
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.database.database import async_session_maker, engine, engine_options, DATABASE_URL
+from app.database.migrations import verify_schema_version
+from app.database.models import Task, TaskStatusEnum
+from app.database.repository import rating_repo
+from app.schemas import Page, TaskRead
+from app.services.fast_json import page_response
+
+
+async def rebuild_ratings(args: argparse.Namespace):
+    """Пересчитать сводные суммы оценок по существующим данным"""
+    async with async_session_maker() as session:
+        user_buckets, task_totals = await rating_repo.rebuild(session)
+    await engine.dispose()
+    print(f"Rating rollups rebuilt: {user_buckets} user day buckets, {task_totals} task totals")
+
+
+async def create_admin(args: argparse.Namespace):
+    """Создать администратора из ADMIN_* после `alembic upgrade head` (production-старт его не создает)"""
+    from app.fastapi_users import create_admin_user
+
+    await verify_schema_version(engine)
+    await create_admin_user()
+    await engine.dispose()
+
+
+async def _benchmark_pool_size(pool_size: int, concurrency: int, requests: int, query_ms: float) -> dict:
+    """Прогон запросов через отдельный engine с заданным размером пула"""
+    bench_engine = create_async_engine(DATABASE_URL, **engine_options(pool_size=pool_size, max_overflow=0))
+    query = text("SELECT pg_sleep(:seconds)")
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            async with bench_engine.connect() as conn:
+                await conn.execute(query, {"seconds": query_ms / 1000})
+
+    # прогрев: соединения открываются до замера
+    warm = await asyncio.gather(*(bench_engine.connect().start() for _ in range(pool_size)))
+    await asyncio.gather(*(conn.close() for conn in warm))
+    metrics = bench_engine.pool.metrics
+    metrics.reset()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    snapshot = metrics.snapshot()
+    await bench_engine.dispose()
+    return {
+        "pool_size": pool_size,
+        "rps": requests / elapsed,
+        "wait_avg_ms": (snapshot["wait_seconds_avg"] or 0) * 1000,
+        "wait_p95_ms": (snapshot["wait_seconds_p95"] or 0) * 1000,
+        "timeouts": snapshot["timeouts"],
+    }
+
+
+async def benchmark_pool(args: argparse.Namespace):
+    """Пропускная способность и ожидание соединения для разных размеров пула"""
+    print(f"{args.requests} queries of {args.query_ms} ms, concurrency {args.concurrency}")
+    print(f"{'pool_size':>9} {'rps':>9} {'wait_avg_ms':>12} {'wait_p95_ms':>12} {'timeouts':>9}")
+    for pool_size in args.sizes:
+        row = await _benchmark_pool_size(pool_size, args.concurrency, args.requests, args.query_ms)
+        print(f"{row['pool_size']:>9} {row['rps']:>9.1f} {row['wait_avg_ms']:>12.2f} "
+              f"{row['wait_p95_ms']:>12.2f} {row['timeouts']:>9}")
+    await engine.dispose()
+
+
+async def benchmark_http(args: argparse.Namespace):
+    """Запросы в секунду и задержки запущенного сервера (сравнение `main.py dev` и `main.py serve`)"""
+    latencies = []
+    remaining = args.requests
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.url, limits=limits) as client:
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                response = await client.get(args.path)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+    print(f"GET {args.path}: {args.requests} requests, concurrency {args.concurrency}")
+    print(f"rps {args.requests / elapsed:.1f}, p50 {p50:.2f} ms, p95 {p95:.2f} ms")
+
+
+async def benchmark_serialization(args: argparse.Namespace):
+    """Сборка JSON-ответа страницы задач: прежний путь FastAPI и page_response"""
+    tasks = [Task(task_id=i, task_name=f"Task {i}", task_description="description", status=TaskStatusEnum.open,
+                  task_executor=i % 50, task_checker=1, team_id=i % 7, created_at=datetime(2030, 1, 1))
+             for i in range(args.rows)]
+    field = create_model_field(name="Response_get_tasks", type_=Page[TaskRead], mode="serialization")
+
+    async def standard():
+        content = Page[TaskRead](items=[TaskRead.model_validate(task) for task in tasks], next_cursor=None)
+        return JSONResponse(await serialize_response(field=field, response_content=content)).body
+
+    async def fast():
+        return page_response(TaskRead, tasks).body
+
+    # строки запроса по колонкам (как в выгрузке) вместо ORM-объектов
+    mappings = [{column: getattr(task, column) for column in TaskRead.model_fields} for task in tasks]
+
+    async def fast_mappings():
+        return page_response(TaskRead, mappings).body
+
+    print(f"{args.rows} tasks, best of {args.repeat}")
+    bodies = {}
+    for name, build in (("standard", standard), ("fast", fast), ("mappings", fast_mappings)):
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            bodies[name] = await build()
+            timings.append(time.perf_counter() - started)
+        print(f"{name:>9} {min(timings) * 1000:>9.1f} ms {len(bodies[name]):>10} bytes")
+    print(f"identical body: {len(set(bodies.values())) == 1}")
+
+
+COMMANDS = {
+    "rebuild-ratings": rebuild_ratings,
+    "benchmark-pool": benchmark_pool,
+    "create-admin": create_admin,
+    "benchmark-http": benchmark_http,
+    "benchmark-serialization": benchmark_serialization,
+}
+
+
+def main(argv=None):
+    """Разбор аргументов и запуск команды"""
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rebuild-ratings", help=rebuild_ratings.__doc__)
+    subparsers.add_parser("create-admin", help=create_admin.__doc__)
+    benchmark = subparsers.add_parser("benchmark-pool", help=benchmark_pool.__doc__)
+    benchmark.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 5, 10, 20])
+    benchmark.add_argument("--concurrency", type=int, default=50)
+    benchmark.add_argument("--requests", type=int, default=2000)
+    benchmark.add_argument("--query-ms", type=float, default=5.0)
+    http = subparsers.add_parser("benchmark-http", help=benchmark_http.__doc__)
+    http.add_argument("--url", default="http://127.0.0.1:8000")
+    http.add_argument("--path", default="/openapi.json")
+    http.add_argument("--concurrency", type=int, default=50)
+    http.add_argument("--requests", type=int, default=5000)
+    serialization = subparsers.add_parser("benchmark-serialization", help=benchmark_serialization.__doc__)
+    serialization.add_argument("--rows", type=int, default=10000)
+    serialization.add_argument("--repeat", type=int, default=5)
+
+    args = parser.parse_args(argv)
+    asyncio.run(COMMANDS[args.command](args))
+
+
+if __name__ == "__main__":
+    main()
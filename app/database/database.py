@@ -1,13 +1,14 @@
 """ Интерфейс настройки базы данных и подключения """
 import os
+from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
 from sqlalchemy.ext.asyncio import (create_async_engine,
                                     AsyncSession,
                                     async_sessionmaker)
 from sqlalchemy.orm import declarative_base
-from typing import AsyncGenerator
-from fastapi_users.db import SQLAlchemyUserDatabase
+from typing import AsyncGenerator, AsyncIterator
+from app.database.pool import InstrumentedAsyncPool
 
 load_dotenv()
 DB_USER = os.getenv("DB_USER")
@@ -16,30 +17,83 @@ DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 DB_NAME = os.getenv("DB_NAME")
 
-DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Пул соединений
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# уровень изоляции транзакций (пусто - по умолчанию сервера); временные ошибки
+# более строгих уровней повторяет DatabaseErrorHandler
+DB_ISOLATION_LEVEL = os.getenv("DB_ISOLATION_LEVEL") or None
+# кэш подготовленных выражений asyncpg на соединение (0 - выключен, нужно для pgbouncer в режиме transaction)
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+
+DATABASE_URL = (f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+                f"?prepared_statement_cache_size={DB_STATEMENT_CACHE_SIZE}")
 
 Base = declarative_base()
+# серверные значения (created_at, id) возвращаются тем же INSERT/UPDATE через RETURNING, без refresh
+Base.__mapper_args__ = {"eager_defaults": True}
+
+# ключ session.info: сессия работает в режиме unit of work
+UNIT_OF_WORK = "unit_of_work"
+
+
+def engine_options(**overrides) -> dict:
+    """Параметры create_async_engine для пула из настроек окружения"""
+    options = {
+        "poolclass": InstrumentedAsyncPool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if DB_ISOLATION_LEVEL:
+        options["isolation_level"] = DB_ISOLATION_LEVEL
+    options.update(overrides)
+    return options
+
 
 engine = create_async_engine(DATABASE_URL,
                              future=True,
-                             echo=False)
+                             echo=False,
+                             **engine_options())
 
 async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
 
+@asynccontextmanager
+async def unit_of_work(session: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """
+    Одна транзакция на запрос: записи репозиториев делают только flush,
+    коммит - один раз после обработчика, при исключении - откат
+    """
+    session.info[UNIT_OF_WORK] = True
+    try:
+        yield session
+    except BaseException:
+        await session.rollback()
+        raise
+    if session.in_transaction():
+        await session.commit()
+
+
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Сессия запроса, общая для fastapi-users и роутеров (FastAPI вызывает зависимость
+    один раз на запрос). Соединение берется из пула при первом запросе к базе и
+    возвращается при закрытии сессии сразу после обработчика
+    """
     async with async_session_maker() as session:
-        yield session
+        async with unit_of_work(session):
+            yield session
 
 async def create_db_and_tables():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
 
-async def get_user_db():
-    async with get_async_session() as session:
-        yield SQLAlchemyUserDatabase(session, User)
-
-
 from app.database.models import User, Task, Team, Meeting, Evaluation
@@ -0,0 +1,51 @@
+"""Профили загрузки связей для запросов репозитория
+
+Модели ничего не подгружают жадно (lazy="raise_on_sql"), поэтому каждый
+запрос явно перечисляет связи, которые ему нужны. Неожиданная ленивая
+загрузка вызывает исключение, а не лишний запрос к базе.
+"""
+from sqlalchemy.orm import joinedload, selectinload
+from app.database.models import Task, Team, Meeting, Evaluation
+
+
+# Только колонки сущности: проверки прав и ответы по Pydantic-схемам
+NONE = ()
+
+# Задача с исполнителем, проверяющим, командой и оценками (главная страница)
+TASK_OVERVIEW = (
+    joinedload(Task.executor),
+    joinedload(Task.checker),
+    joinedload(Task.team),
+    selectinload(Task.evaluations),
+)
+
+# Задача для списка в админке: оценки вместе с их авторами.
+# sqladmin сам добавляет selectinload для колонок-связей, поэтому
+# стратегии здесь должны совпадать с его стратегией
+TASK_ADMIN = (
+    selectinload(Task.executor),
+    selectinload(Task.checker),
+    selectinload(Task.team),
+    selectinload(Task.evaluations).joinedload(Evaluation.evaluator),
+)
+
+# Команда с администратором и участниками (главная страница)
+TEAM_OVERVIEW = (
+    joinedload(Team.admin),
+    selectinload(Team.members),
+)
+
+# Команда для списка в админке
+TEAM_ADMIN = (
+    selectinload(Team.admin),
+)
+
+# Встреча с участниками: проверка доступа, замена списка участников
+MEETING_PARTICIPANTS = (
+    selectinload(Meeting.participants),
+)
+
+# Оценка вместе с задачей: проверка, что пользователь исполнитель/проверяющий
+EVALUATION_TASK = (
+    joinedload(Evaluation.task),
+)
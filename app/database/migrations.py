@@ -0,0 +1,36 @@
+"""Проверка версии схемы базы по Alembic при старте приложения"""
+from functools import lru_cache
+from pathlib import Path
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+class SchemaVersionError(RuntimeError):
+    """Схема базы не совпадает с последней миграцией"""
+
+
+@lru_cache(maxsize=None)
+def alembic_head() -> str:
+    """Последняя ревизия в каталоге миграций"""
+    return ScriptDirectory.from_config(Config(str(ALEMBIC_INI))).get_current_head()
+
+
+async def verify_schema_version(engine: AsyncEngine) -> str:
+    """Одним запросом сверить alembic_version с последней миграцией вместо create_all"""
+    expected = alembic_head()
+    try:
+        async with engine.connect() as conn:
+            current = await conn.scalar(text("SELECT version_num FROM alembic_version"))
+    except DBAPIError as e:
+        raise SchemaVersionError("Database is not under Alembic control: run `alembic upgrade head`") from e
+
+    if current != expected:
+        raise SchemaVersionError(f"Database schema is at revision {current}, expected {expected}: "
+                                 f"run `alembic upgrade head`")
+    return current
@@ -1,5 +1,7 @@
 """ Модели данных для заполнения базы """
 from fastapi_users_db_sqlalchemy import SQLAlchemyBaseUserTable
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 from sqlalchemy import (Table,
                         Column,
                         Integer,
@@ -7,11 +9,15 @@ from sqlalchemy import (Table,
                         ForeignKey,
                         Boolean,
                         TIMESTAMP,
+                        Date,
                         func,
                         CheckConstraint,
                         Enum,
                         UniqueConstraint,
-                        Text)
+                        Index,
+                        Text,
+                        event,
+                        text)
 from app.database.database import Base
 from sqlalchemy.orm import relationship, synonym
 from fastapi_users.password import PasswordHelper
@@ -22,9 +28,16 @@ meeting_participants = Table(
     "meeting_participants",
     Base.metadata,
     Column("meeting_id", Integer, ForeignKey("meetings.meeting_id", ondelete="CASCADE"), primary_key=True),
-    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_meeting_participants_user_id", "user_id", "meeting_id")
 )
 
+
+def _utcnow() -> datetime:
+    """Время изменения строки (для водяного знака календарной подписки)"""
+    return datetime.now(timezone.utc)
+
+
 _password_helper = PasswordHelper()
 
 
@@ -56,17 +69,24 @@ class User(SQLAlchemyBaseUserTable[int], Base):
     is_verified = Column(Boolean, default=False)
     role = Column(Enum(RoleEnum), default=RoleEnum.user, nullable=False)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
+    calendar_feed_token_hash = Column(String(64), nullable=True)
+
+    __table_args__ = (
+        Index("ix_users_calendar_feed_token_hash", "calendar_feed_token_hash", unique=True,
+              postgresql_where=text("calendar_feed_token_hash IS NOT NULL"),
+              sqlite_where=text("calendar_feed_token_hash IS NOT NULL")),
+    )
 
     # Relations
     # Связи
-    member_of_team = Column(Integer, ForeignKey("teams.team_id"), nullable=True)
-    team = relationship("Team", back_populates="members", foreign_keys=[member_of_team], lazy="joined")
-    admin_of = relationship("Team", back_populates="admin", uselist=False, foreign_keys="Team.team_admin", lazy="selectin")
-    tasks_assigned = relationship("Task", back_populates="executor", foreign_keys="Task.task_executor", lazy="selectin")
-    tasks_checked = relationship("Task", back_populates="checker", foreign_keys="Task.task_checker", lazy="selectin")
-    evaluations_given = relationship("Evaluation", back_populates="evaluator", foreign_keys="Evaluation.evaluator_id", lazy="selectin")
-    meetings = relationship("Meeting", secondary=meeting_participants, back_populates="participants", lazy="selectin")
-    comments_written = relationship("Comment", back_populates="author", lazy="selectin")
+    member_of_team = Column(Integer, ForeignKey("teams.team_id", ondelete="SET NULL"), nullable=True)
+    team = relationship("Team", back_populates="members", foreign_keys=[member_of_team], lazy="raise_on_sql")
+    admin_of = relationship("Team", back_populates="admin", uselist=False, foreign_keys="Team.team_admin", lazy="raise_on_sql")
+    tasks_assigned = relationship("Task", back_populates="executor", foreign_keys="Task.task_executor", lazy="raise_on_sql")
+    tasks_checked = relationship("Task", back_populates="checker", foreign_keys="Task.task_checker", lazy="raise_on_sql")
+    evaluations_given = relationship("Evaluation", back_populates="evaluator", foreign_keys="Evaluation.evaluator_id", lazy="raise_on_sql")
+    meetings = relationship("Meeting", secondary=meeting_participants, back_populates="participants", lazy="raise_on_sql")
+    comments_written = relationship("Comment", back_populates="author", lazy="raise_on_sql")
 
     def __str__(self):
         return self.username
@@ -75,6 +95,7 @@ class User(SQLAlchemyBaseUserTable[int], Base):
         return self.hashed_password
 
     def _set_password(self, raw_password: str) -> None:
+        # синхронный путь для скриптов и консоли: запросы хешируют через password_pool
         if raw_password:
             self.hashed_password = _password_helper.hash(raw_password)
 
@@ -92,20 +113,31 @@ class Task(Base):
     status = Column(Enum(TaskStatusEnum), default=TaskStatusEnum.open, nullable=False)
     deadline = Column(TIMESTAMP(timezone=True), nullable=True)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(TIMESTAMP(timezone=True), default=_utcnow, onupdate=_utcnow, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_tasks_executor_deadline", "task_executor", "deadline"),
+        Index("ix_tasks_executor_open_deadline", "task_executor", "deadline",
+              postgresql_where=text("status <> 'completed'"),
+              sqlite_where=text("status <> 'completed'")),
+        Index("ix_tasks_checker", "task_checker", "task_id"),
+        Index("ix_tasks_team_status", "team_id", "status", "task_id"),
+    )
 
     # Relations
     # Связи
     task_executor = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     task_checker = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
-    team_id = Column(Integer, ForeignKey("teams.team_id"), nullable=True)
-    executor = relationship("User", back_populates="tasks_assigned", foreign_keys=[task_executor], lazy="joined")
-    checker = relationship("User", back_populates="tasks_checked", foreign_keys=[task_checker], lazy="joined")
-    team = relationship("Team", back_populates="tasks", lazy="joined")
-    evaluations = relationship("Evaluation", back_populates="task", cascade="all, delete-orphan", lazy="selectin")
-    comments = relationship("Comment", back_populates="task", cascade="all, delete-orphan", lazy="selectin")
+    team_id = Column(Integer, ForeignKey("teams.team_id", ondelete="SET NULL"), nullable=True)
+    executor = relationship("User", back_populates="tasks_assigned", foreign_keys=[task_executor], lazy="raise_on_sql")
+    checker = relationship("User", back_populates="tasks_checked", foreign_keys=[task_checker], lazy="raise_on_sql")
+    team = relationship("Team", back_populates="tasks", lazy="raise_on_sql")
+    evaluations = relationship("Evaluation", back_populates="task", cascade="all, delete-orphan", passive_deletes=True, lazy="raise_on_sql")
+    comments = relationship("Comment", back_populates="task", cascade="all, delete-orphan", passive_deletes=True, lazy="raise_on_sql")
 
     def average_rating(self):
-        """Вычисляем среднюю оценку (None если оценок нет)."""
+        """Вычисляем среднюю оценку по загруженным оценкам (None если оценок нет).
+        Без загрузки оценок используйте rating_repo.get_task_average_rating."""
         if not self.evaluations:
             return None
         vals = [e.evaluation_value for e in self.evaluations if e.evaluation_value is not None]
@@ -125,9 +157,9 @@ class Team(Base):
     # Relations
     # Связи
     team_admin = Column(Integer, ForeignKey("users.id"), nullable=True)
-    admin = relationship("User", back_populates="admin_of", foreign_keys=[team_admin], uselist=False, lazy="joined")
-    members = relationship("User", back_populates="team", foreign_keys="User.member_of_team", lazy="selectin", cascade="all, delete-orphan")
-    tasks = relationship("Task", back_populates="team", lazy="selectin")
+    admin = relationship("User", back_populates="admin_of", foreign_keys=[team_admin], uselist=False, lazy="raise_on_sql")
+    members = relationship("User", back_populates="team", foreign_keys="User.member_of_team", lazy="raise_on_sql", passive_deletes=True)
+    tasks = relationship("Task", back_populates="team", lazy="raise_on_sql", passive_deletes=True)
 
 
 class Meeting(Base):
@@ -140,13 +172,35 @@ class Meeting(Base):
     meeting_description = Column(Text, nullable=True)
     meeting_date = Column(TIMESTAMP(timezone=True), nullable=False)
     duration_minutes = Column(Integer, default=60)
+    meeting_end = Column(TIMESTAMP(timezone=True), nullable=False)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(TIMESTAMP(timezone=True), default=_utcnow, onupdate=_utcnow, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_meetings_window", "meeting_date", "meeting_end"),
+        Index("ix_meetings_period", func.tstzrange(meeting_date, meeting_end),
+              postgresql_using="gist").ddl_if(dialect="postgresql"),
+    )
 
     # Relations
     # Связи
     meeting_admin = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
-    admin = relationship("User", foreign_keys=[meeting_admin], lazy="joined")
-    participants = relationship("User", secondary=meeting_participants, back_populates="meetings", lazy="selectin")
+    admin = relationship("User", foreign_keys=[meeting_admin], lazy="raise_on_sql")
+    participants = relationship("User", secondary=meeting_participants, back_populates="meetings", lazy="raise_on_sql", passive_deletes=True)
+
+
+@event.listens_for(Meeting, "before_insert")
+@event.listens_for(Meeting, "before_update")
+def _set_meeting_end(mapper, connection, meeting: Meeting) -> None:
+    """Конец встречи хранится отдельно для индексированного поиска пересечений"""
+    if meeting.duration_minutes is None:
+        meeting.duration_minutes = 60
+    meeting.meeting_end = meeting_end(meeting.meeting_date, meeting.duration_minutes)
+
+
+def meeting_end(meeting_date: datetime, duration_minutes: Optional[int]) -> datetime:
+    """Конец встречи (длительность по умолчанию - 60 минут)"""
+    return meeting_date + timedelta(minutes=duration_minutes or 60)
 
 
 class Evaluation(Base):
@@ -163,14 +217,15 @@ class Evaluation(Base):
     __table_args__ = (
         CheckConstraint("evaluation_value >= 1 AND evaluation_value <= 5", name="ck_evaluation_value_range"),
         UniqueConstraint("task_id", "evaluator_id", name="uq_task_evaluator"),
+        Index("ix_evaluations_evaluator_created", "evaluator_id", "created_at"),
     )
 
     # Relations
     # Связи
     task_id = Column(Integer, ForeignKey("tasks.task_id", ondelete="CASCADE"), nullable=False)
     evaluator_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
-    task = relationship("Task", back_populates="evaluations", foreign_keys=[task_id], lazy="joined")
-    evaluator = relationship("User", back_populates="evaluations_given", foreign_keys=[evaluator_id], lazy="joined")
+    task = relationship("Task", back_populates="evaluations", foreign_keys=[task_id], lazy="raise_on_sql")
+    evaluator = relationship("User", back_populates="evaluations_given", foreign_keys=[evaluator_id], lazy="raise_on_sql")
 
 
 class Comment(Base):
@@ -182,9 +237,36 @@ class Comment(Base):
     content = Column(Text, nullable=False)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
 
+    __table_args__ = (
+        Index("ix_comments_task", "task_id", "comment_id"),
+    )
+
     # Relations
     # Связи
     task_id = Column(Integer, ForeignKey("tasks.task_id", ondelete="CASCADE"), nullable=False)
     author_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
-    task = relationship("Task", back_populates="comments", foreign_keys=[task_id], lazy="joined")
-    author = relationship("User", back_populates="comments_written", foreign_keys=[author_id], lazy="joined")
+    task = relationship("Task", back_populates="comments", foreign_keys=[task_id], lazy="raise_on_sql")
+    author = relationship("User", back_populates="comments_written", foreign_keys=[author_id], lazy="raise_on_sql")
+
+
+class UserRatingDaily(Base):
+    """Дневные суммы оценок задач исполнителя (средний рейтинг за период)"""
+    __tablename__ = "user_rating_daily"
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    bucket_date = Column(Date, primary_key=True)
+
+    # Fields
+    # Поля
+    rating_sum = Column(Integer, nullable=False, default=0)
+    rating_count = Column(Integer, nullable=False, default=0)
+
+
+class TaskRatingTotal(Base):
+    """Сумма и количество оценок задачи (средняя оценка задачи)"""
+    __tablename__ = "task_rating_totals"
+    task_id = Column(Integer, ForeignKey("tasks.task_id", ondelete="CASCADE"), primary_key=True)
+
+    # Fields
+    # Поля
+    rating_sum = Column(Integer, nullable=False, default=0)
+    rating_count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,107 @@
+"""Keyset (курсорная) пагинация списков
+
+Страница выбирается условием по ключам сортировки последней выданной строки
+вместо OFFSET, поэтому стоимость запроса не растет с номером страницы.
+Курсор - непрозрачная для клиента base64-строка со значениями этих ключей.
+"""
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Any, List, NamedTuple, Optional, Sequence
+from dotenv import load_dotenv
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+load_dotenv()
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "100"))
+
+
+class InvalidCursorError(ValueError):
+    """Курсор поврежден или не относится к этому списку"""
+
+
+class KeysetPage(NamedTuple):
+    """Строки страницы и курсор следующей (None - страница последняя)"""
+    items: List[Any]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Упаковать значения ключей сортировки в курсор"""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence[InstrumentedAttribute]) -> List[Any]:
+    """Распаковать курсор в значения ключей сортировки"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError):
+        raise InvalidCursorError(cursor)
+
+    if not isinstance(payload, list) or len(payload) != len(keys):
+        raise InvalidCursorError(cursor)
+
+    values = []
+    for key, value in zip(keys, payload):
+        python_type = key.type.python_type
+        if python_type is datetime and isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                raise InvalidCursorError(cursor)
+        elif not isinstance(value, python_type):
+            raise InvalidCursorError(cursor)
+        values.append(value)
+    return values
+
+
+def clamp_limit(limit: int) -> int:
+    """Ограничить размер страницы серверным максимумом"""
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def is_entity_query(query: Select) -> bool:
+    """Запрос выбирает одну ORM-сущность целиком, а не колонки"""
+    descriptions = query.column_descriptions
+    return len(descriptions) == 1 and descriptions[0]["expr"] is descriptions[0]["entity"]
+
+
+async def paginate(db: AsyncSession,
+                   query: Select,
+                   keys: Sequence[InstrumentedAttribute],
+                   cursor: Optional[str] = None,
+                   limit: int = DEFAULT_PAGE_SIZE,
+                   descending: bool = False) -> KeysetPage:
+    """
+    Выполнить запрос страницы: сортировка по keys (последний ключ - уникальный),
+    условие по курсору и одна лишняя строка для определения следующей страницы.
+    Запрос сущности дает ORM-объекты, запрос колонок - строки Row (ключи сортировки
+    добавляются к колонкам, если их нет: по ним строится курсор)
+    """
+    limit = clamp_limit(limit)
+    entity = is_entity_query(query)
+    if not entity:
+        query = query.add_columns(*(key for key in keys if key.key not in query.selected_columns))
+    key_expr = keys[0] if len(keys) == 1 else tuple_(*keys)
+
+    if cursor:
+        values = decode_cursor(cursor, keys)
+        bound = values[0] if len(keys) == 1 else tuple_(*values)
+        query = query.where(key_expr < bound if descending else key_expr > bound)
+
+    order = [key.desc() if descending else key.asc() for key in keys]
+    result = await db.execute(query.order_by(*order).limit(limit + 1))
+    items = list(result.scalars().all() if entity else result.all())
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor([getattr(items[-1], key.key) for key in keys])
+    return KeysetPage(items, next_cursor)
@@ -0,0 +1,112 @@
+"""Пул соединений с метриками ожидания соединения"""
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+
+# верхние границы корзин гистограммы ожидания, секунды
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class PoolMetrics:
+    """Счетчики выдачи соединений и гистограмма времени ожидания"""
+
+    def __init__(self, buckets: tuple = WAIT_BUCKETS):
+        self.buckets = buckets
+        self.reset()
+
+    def reset(self) -> None:
+        """Обнулить метрики"""
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+        self._bucket_counts: List[int] = [0] * (len(self.buckets) + 1)
+
+    def observe(self, wait: float, timed_out: bool = False) -> None:
+        """Учесть одно ожидание соединения"""
+        if timed_out:
+            self.timeouts += 1
+        else:
+            self.checkouts += 1
+        self.wait_sum += wait
+        self.wait_max = max(self.wait_max, wait)
+        self._bucket_counts[bisect_left(self.buckets, wait)] += 1
+
+    def histogram(self) -> Dict[str, int]:
+        """Накопительная гистограмма (как у Prometheus): граница -> число ожиданий не дольше нее"""
+        result = {}
+        total = 0
+        for bound, count in zip((*map(str, self.buckets), "+Inf"), self._bucket_counts):
+            total += count
+            result[bound] = total
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Оценка квантиля ожидания по верхней границе корзины"""
+        observed = sum(self._bucket_counts)
+        if not observed:
+            return None
+        rank = q * observed
+        total = 0
+        for bound, count in zip(self.buckets, self._bucket_counts):
+            total += count
+            if total >= rank:
+                return bound
+        return self.wait_max
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Метрики для диагностики"""
+        observed = self.checkouts + self.timeouts
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_seconds_sum": round(self.wait_sum, 6),
+            "wait_seconds_avg": round(self.wait_sum / observed, 6) if observed else None,
+            "wait_seconds_max": round(self.wait_max, 6),
+            "wait_seconds_p95": self.quantile(0.95),
+            "wait_seconds_histogram": self.histogram(),
+        }
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool, замеряющий ожидание свободного соединения"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.observe(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.observe(time.perf_counter() - started)
+        return connection
+
+    def recreate(self) -> "InstrumentedAsyncPool":
+        """Пул после dispose() продолжает те же метрики"""
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def pool_status(pool: Pool) -> Dict[str, Any]:
+    """Текущее состояние пула и его метрики"""
+    status: Dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        })
+    metrics = getattr(pool, "metrics", None)
+    status["metrics"] = metrics.snapshot() if metrics else None
+    return status
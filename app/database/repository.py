@@ -1,182 +1,715 @@
 """Репозиторий для работы с базой данных"""
-from datetime import datetime, date, timedelta
-from typing import List, Optional, Any, Sequence
-from sqlalchemy import Row, RowMapping
+from datetime import datetime, date, time, timedelta, timezone
+from typing import Dict, List, NamedTuple, Optional, Any, Sequence, Set, Tuple, Union
+from sqlalchemy import (Row, RowMapping, Date, Integer, Select, String, case, cast, delete, func, insert, literal_column,
+                        null, true, type_coerce, union_all, update)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.database.models import Task, Meeting, Evaluation, Comment, Team, User
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.interfaces import ORMOption
+from app.database import loading
+from app.database.pagination import KeysetPage, paginate, DEFAULT_PAGE_SIZE
+from app.database.models import (Task, Meeting, Evaluation, Comment, Team, User, UserRatingDaily, TaskRatingTotal,
+                                 RoleEnum, TaskStatusEnum, meeting_participants, meeting_end)
 from app.services.database_error_handler import db_error_handler
+from app.services.principal import Principal, invalidate_principal_on_commit
 
 
 class CalendarRepository:
     """Репозиторий календаря"""
     @staticmethod
-    async def get_user_tasks_by_date_range(db: AsyncSession,user_id: int,start_date: date,end_date: date) -> Sequence[
-        Task]:
-        """Получить задачи пользователя по диапазону дат"""
+    def _events_query(user_id: Any, start_date: date, end_date: date):
+        """
+        UNION ALL задач исполнителя и встреч участника за [start_date, end_date]:
+        только колонки, нужные схемам календаря, без ORM-объектов
+        """
+        window_start = datetime.combine(start_date, time.min)
+        window_end = datetime.combine(end_date + timedelta(days=1), time.min)
+
+        tasks = select(
+            literal_column("'task'", String).label("kind"),
+            Task.task_id.label("id"),
+            Task.task_name.label("title"),
+            Task.deadline.label("start"),
+            type_coerce(null(), Meeting.meeting_end.type).label("end"),
+            cast(Task.status, String).label("status"),
+            Task.task_description.label("description"),
+            type_coerce(null(), Integer).label("duration"),
+            Task.updated_at.label("updated_at"),
+        ).where(
+            Task.task_executor == user_id,
+            Task.deadline >= window_start,
+            Task.deadline < window_end
+        )
+
+        meetings = select(
+            literal_column("'meeting'", String),
+            Meeting.meeting_id,
+            Meeting.meeting_name,
+            Meeting.meeting_date,
+            Meeting.meeting_end,
+            null(),
+            Meeting.meeting_description,
+            Meeting.duration_minutes,
+            Meeting.updated_at,
+        ).join(
+            meeting_participants, meeting_participants.c.meeting_id == Meeting.meeting_id
+        ).where(
+            meeting_participants.c.user_id == user_id,
+            Meeting.meeting_date >= window_start,
+            Meeting.meeting_date < window_end
+        )
+
+        return union_all(tasks, meetings).subquery("events")
+
+    @staticmethod
+    async def get_user_events(db: AsyncSession, user_id: int, start_date: date, end_date: date,
+                              limit: Optional[int] = None) -> Sequence[Row]:
+        """
+        Получить события пользователя (задачи и встречи) по диапазону дат одним запросом.
+        Строки отсортированы по началу события:
+        kind, id, title, start, end, status, description, duration, updated_at, day
+        """
+        events = CalendarRepository._events_query(user_id, start_date, end_date)
+        query = select(events, _utc_day(db, events.c.start).label("day")).order_by(
+            events.c.start, events.c.kind, events.c.id
+        )
+        if limit is not None:
+            query = query.limit(limit)
+
+        result = await db.execute(query)
+        return result.all()
+
+    @staticmethod
+    async def get_user_event_counts_by_day(db: AsyncSession, user_id: int, start_date: date,
+                                           end_date: date) -> Sequence[Row]:
+        """Количество задач и встреч пользователя по дням (GROUP BY в базе): day, task_count, meeting_count"""
+        events = CalendarRepository._events_query(user_id, start_date, end_date)
+        day = _utc_day(db, events.c.start).label("day")
         result = await db.execute(
-            select(Task).where(
-                Task.task_executor == user_id,
-                Task.deadline >= start_date,
-                Task.deadline <= end_date
+            select(
+                day,
+                func.count().filter(events.c.kind == "task").label("task_count"),
+                func.count().filter(events.c.kind == "meeting").label("meeting_count"),
+            ).group_by(day).order_by(day)
+        )
+        return result.all()
+
+
+    @staticmethod
+    async def get_feed_watermark(db: AsyncSession, token_hash: str, start_date: date, end_date: date) -> Row:
+        """
+        Водяной знак календарной подписки одним запросом: владелец токена,
+        количество событий и время последнего изменения (user_id None - токен недействителен)
+        """
+        owner = select(User.id).where(
+            User.calendar_feed_token_hash == token_hash,
+            User.is_active.is_(True)
+        ).scalar_subquery()
+        events = CalendarRepository._events_query(owner, start_date, end_date)
+        result = await db.execute(
+            select(
+                owner.label("user_id"),
+                func.count(events.c.id).label("event_count"),
+                func.max(events.c.updated_at).label("last_modified"),
             )
         )
-        return result.scalars().all()
+        return result.one()
+
+
+def _select(model: Any, options: Sequence[ORMOption] = loading.NONE, fields: Optional[Sequence[str]] = None) -> Select:
+    """
+    select(model) с профилем загрузки, а с fields - только эти колонки:
+    строки Row без ORM-объектов, identity map и связей
+    """
+    if fields is None:
+        return select(model).options(*options)
+    return select(*(getattr(model, field) for field in fields))
+
+
+def _one_or_none(result: Any, fields: Optional[Sequence[str]]) -> Any:
+    """Сущность или строка Row проекции"""
+    return result.scalar_one_or_none() if fields is None else result.one_or_none()
+
+
+def _dialect_insert(db: AsyncSession, model: Any):
+    """INSERT с поддержкой ON CONFLICT для диалекта сессии"""
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    return dialect_insert(model)
+
+
+def _upsert_increments(db: AsyncSession, model: Any, key_names: Sequence[str], rows: Sequence[dict]):
+    """
+    Многострочный INSERT ... ON CONFLICT DO UPDATE с приращением суммы и количества:
+    rows - ключи, rating_sum и rating_count (ключи в rows не повторяются)
+    """
+    stmt = _dialect_insert(db, model).values(list(rows))
+    return stmt.on_conflict_do_update(
+        index_elements=list(key_names),
+        set_={
+            "rating_sum": model.rating_sum + stmt.excluded.rating_sum,
+            "rating_count": model.rating_count + stmt.excluded.rating_count,
+        },
+    )
+
+
+def _upsert_increment(db: AsyncSession, model: Any, keys: dict, rating_sum: int, rating_count: int):
+    """INSERT ... ON CONFLICT DO UPDATE с приращением суммы и количества"""
+    return _upsert_increments(db, model, list(keys), [{**keys, "rating_sum": rating_sum, "rating_count": rating_count}])
+
+
+def _bucket_date(moment: datetime) -> date:
+    """Дневная корзина (UTC) для момента времени"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return moment.date()
+
+
+def _utc_day(db: AsyncSession, column: Any):
+    """День (UTC) для колонки TIMESTAMP WITH TIME ZONE"""
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(func.timezone("UTC", column), Date)
+    return func.date(column, type_=Date)
+
+
+class RatingSnapshot(NamedTuple):
+    """Вклад оценок задач в сводные суммы: (исполнитель, день) и задача -> (сумма, количество)"""
+    task_ids: Set[int]
+    users: Dict[Tuple[int, date], Tuple[int, int]]
+    tasks: Dict[int, Tuple[int, int]]
+
+
+def _difference(before: Dict[Any, Tuple[int, int]], after: Dict[Any, Tuple[int, int]]) -> Dict[Any, Tuple[int, int]]:
+    """Ненулевые изменения (сумма, количество) между двумя снимками"""
+    changes = {}
+    for key in before.keys() | after.keys():
+        old_sum, old_count = before.get(key, (0, 0))
+        new_sum, new_count = after.get(key, (0, 0))
+        if (new_sum, new_count) != (old_sum, old_count):
+            changes[key] = (new_sum - old_sum, new_count - old_count)
+    return changes
+
+
+class RatingRollupRepository:
+    """
+    Репозиторий сводных сумм оценок: дневные корзины исполнителя и итоги задачи.
+    Обновляется в той же транзакции, что и сами оценки
+    """
+    @staticmethod
+    async def apply_delta(db: AsyncSession, task_id: int, executor_id: Optional[int], bucket_date: date,
+                          value_delta: int, count_delta: int) -> None:
+        """Добавить изменение суммы/количества оценок без коммита"""
+        if executor_id is not None:
+            await db.execute(_upsert_increment(db, UserRatingDaily, {"user_id": executor_id, "bucket_date": bucket_date},
+                                               value_delta, count_delta))
+        await db.execute(_upsert_increment(db, TaskRatingTotal, {"task_id": task_id}, value_delta, count_delta))
+
+    @staticmethod
+    async def apply_deltas(db: AsyncSession,
+                           user_deltas: Dict[Tuple[int, date], Tuple[int, int]],
+                           task_deltas: Dict[int, Tuple[int, int]]) -> None:
+        """
+        Изменения сумм/количеств пачкой без коммита: (исполнитель, день) -> (сумма, количество)
+        и задача -> (сумма, количество). Не больше одного запроса на таблицу
+        """
+        if user_deltas:
+            await db.execute(_upsert_increments(db, UserRatingDaily, ["user_id", "bucket_date"], [
+                {"user_id": user_id, "bucket_date": bucket_date, "rating_sum": total, "rating_count": count}
+                for (user_id, bucket_date), (total, count) in user_deltas.items()
+            ]))
+        if task_deltas:
+            await db.execute(_upsert_increments(db, TaskRatingTotal, ["task_id"], [
+                {"task_id": task_id, "rating_sum": total, "rating_count": count}
+                for task_id, (total, count) in task_deltas.items()
+            ]))
+
+    @staticmethod
+    async def _contributions(db: AsyncSession, task_ids: Set[int]) -> RatingSnapshot:
+        """Текущий вклад оценок задач task_ids по дневным корзинам исполнителя и итогам задач"""
+        users: Dict[Tuple[int, date], Tuple[int, int]] = {}
+        tasks: Dict[int, Tuple[int, int]] = {}
+        if not task_ids:
+            return RatingSnapshot(task_ids, users, tasks)
+
+        day = _utc_day(db, Evaluation.created_at)
+        result = await db.execute(
+            select(Evaluation.task_id, Task.task_executor, day, func.sum(Evaluation.evaluation_value), func.count())
+            .join(Task, Task.task_id == Evaluation.task_id)
+            .where(Evaluation.task_id.in_(task_ids))
+            .group_by(Evaluation.task_id, Task.task_executor, day)
+        )
+        for task_id, executor_id, bucket_date, total, count in result.all():
+            if isinstance(bucket_date, str):
+                bucket_date = date.fromisoformat(bucket_date)
+            task_sum, task_count = tasks.get(task_id, (0, 0))
+            tasks[task_id] = (task_sum + int(total), task_count + int(count))
+            if executor_id is not None:
+                user_sum, user_count = users.get((executor_id, bucket_date), (0, 0))
+                users[(executor_id, bucket_date)] = (user_sum + int(total), user_count + int(count))
+        return RatingSnapshot(task_ids, users, tasks)
+
+    @staticmethod
+    async def snapshot(db: AsyncSession, task_ids: Sequence[Optional[int]]) -> RatingSnapshot:
+        """
+        Вклад задач до изменения (строки задач блокируются до конца транзакции).
+        Для произвольных ORM-записей оценок и задач: смены исполнителя, правок и
+        удалений в админке. После записи - settle с этим снимком
+        """
+        ids = {task_id for task_id in task_ids if task_id is not None}
+        if ids:
+            await db.execute(select(Task.task_id).where(Task.task_id.in_(ids)).with_for_update())
+        return await RatingRollupRepository._contributions(db, ids)
+
+    @staticmethod
+    async def settle(db: AsyncSession, before: RatingSnapshot) -> None:
+        """Учесть в сводных суммах разницу вклада задач снимка после записи без коммита"""
+        await db.flush()
+        after = await RatingRollupRepository._contributions(db, before.task_ids)
+        await RatingRollupRepository.apply_deltas(db, _difference(before.users, after.users),
+                                                  _difference(before.tasks, after.tasks))
+
+    @staticmethod
+    async def get_user_rating(db: AsyncSession, user_id: int, since: date) -> Tuple[int, int]:
+        """Сумма и количество оценок исполнителя начиная с даты"""
+        result = await db.execute(
+            select(func.coalesce(func.sum(UserRatingDaily.rating_sum), 0),
+                   func.coalesce(func.sum(UserRatingDaily.rating_count), 0))
+            .where(UserRatingDaily.user_id == user_id, UserRatingDaily.bucket_date >= since)
+        )
+        total, count = result.one()
+        return int(total), int(count)
 
     @staticmethod
-    async def get_user_meetings_by_date_range(db: AsyncSession,user_id: int,start_date: date,end_date: date) -> \
-    Sequence[Meeting]:
-        """Получить встречи пользователя по диапазону дат"""
+    async def get_task_average_rating(db: AsyncSession, task_id: int) -> Optional[float]:
+        """Средняя оценка задачи (None если оценок нет)"""
         result = await db.execute(
-            select(Meeting).where(
-                Meeting.participants.any(id=user_id),
-                Meeting.meeting_date >= start_date,
-                Meeting.meeting_date <= end_date
+            select(TaskRatingTotal.rating_sum, TaskRatingTotal.rating_count).where(TaskRatingTotal.task_id == task_id)
+        )
+        row = result.one_or_none()
+        if not row or not row.rating_count:
+            return None
+        return round(row.rating_sum / row.rating_count, 2)
+
+    @staticmethod
+    async def remove_task(db: AsyncSession, task_id: int, executor_id: Optional[int]) -> None:
+        """Вычесть оценки удаляемой задачи из корзин исполнителя без коммита"""
+        if executor_id is not None:
+            day = _utc_day(db, Evaluation.created_at)
+            result = await db.execute(
+                select(day, func.sum(Evaluation.evaluation_value), func.count())
+                .where(Evaluation.task_id == task_id)
+                .group_by(day)
+            )
+            for bucket_date, total, count in result.all():
+                if isinstance(bucket_date, str):
+                    bucket_date = date.fromisoformat(bucket_date)
+                await db.execute(_upsert_increment(db, UserRatingDaily, {"user_id": executor_id, "bucket_date": bucket_date},
+                                                   -int(total), -int(count)))
+        await db.execute(delete(TaskRatingTotal).where(TaskRatingTotal.task_id == task_id))
+
+    @staticmethod
+    async def rebuild(db: AsyncSession) -> Tuple[int, int]:
+        """Пересчитать сводные таблицы по существующим оценкам"""
+        day = _utc_day(db, Evaluation.created_at)
+        await db.execute(delete(UserRatingDaily))
+        await db.execute(delete(TaskRatingTotal))
+
+        users = await db.execute(
+            insert(UserRatingDaily).from_select(
+                ["user_id", "bucket_date", "rating_sum", "rating_count"],
+                select(Task.task_executor, day, func.sum(Evaluation.evaluation_value), func.count())
+                .join(Evaluation.task)
+                .where(Task.task_executor.is_not(None))
+                .group_by(Task.task_executor, day)
             )
         )
-        return result.scalars().all()
+        tasks = await db.execute(
+            insert(TaskRatingTotal).from_select(
+                ["task_id", "rating_sum", "rating_count"],
+                select(Evaluation.task_id, func.sum(Evaluation.evaluation_value), func.count())
+                .group_by(Evaluation.task_id)
+            )
+        )
+        await db.commit()
+        return users.rowcount, tasks.rowcount
 
 
 class EvaluationRepository:
     """Репозиторий для оценок"""
     @staticmethod
     async def get_user_average_rating(db: AsyncSession,user_id: int,period_days: int) -> dict:
-        """Получить средний рейтинг пользователя (исправленная версия)"""
-        start_date = datetime.now() - timedelta(days=period_days)
+        """Получить средний рейтинг пользователя по дневным корзинам за период"""
+        start_date = (datetime.now(timezone.utc) - timedelta(days=period_days)).date()
 
-        result = await db.execute(select(Evaluation).join(Evaluation.task).where(Task.task_executor == user_id,Evaluation.created_at >= start_date))
-        evaluations = result.scalars().all()
+        total, count = await RatingRollupRepository.get_user_rating(db, user_id, start_date)
 
-        if not evaluations:
+        if not count:
             return {"average_rating": None, "total_evaluations": 0}
 
-        total = sum(eval.evaluation_value for eval in evaluations)
-        average = total / len(evaluations)
-
         return {
-            "average_rating": round(average, 2),
-            "total_evaluations": len(evaluations),
+            "average_rating": round(total / count, 2),
+            "total_evaluations": count,
             "period_days": period_days
         }
 
     @staticmethod
-    async def get_evaluations_by_filters(db: AsyncSession,skip: int = 0,limit: int = 100,task_id: Optional[int] = None,user_id: Optional[int] = None) -> \
-    Sequence[Row[Any] | RowMapping | Any]:
-        """Получение оценки по фильтрам"""
-        query = select(Evaluation)
+    async def get_evaluations_by_filters(db: AsyncSession,cursor: Optional[str] = None,limit: int = DEFAULT_PAGE_SIZE,task_id: Optional[int] = None,user_id: Optional[int] = None,
+                                         participant_id: Optional[int] = None,
+                                         options: Sequence[ORMOption] = loading.NONE,
+                                         fields: Optional[Sequence[str]] = None) -> KeysetPage:
+        """Получение оценки по фильтрам (participant_id - исполнитель или проверяющий задачи)"""
+        query = EvaluationRepository._filter_evaluations(_select(Evaluation, options, fields), task_id, user_id,
+                                                         participant_id)
+        return await paginate(db, query, [Evaluation.evaluation_id], cursor, limit)
 
+    @staticmethod
+    def _filter_evaluations(query: Select, task_id: Optional[int] = None, user_id: Optional[int] = None,
+                            participant_id: Optional[int] = None, team_id: Optional[int] = None) -> Select:
+        """Фильтры оценок (team_id - команда оцененной задачи)"""
         if task_id:
             query = query.where(Evaluation.task_id == task_id)
         if user_id:
             query = query.where(Evaluation.evaluator_id == user_id)
+        if participant_id or team_id:
+            query = query.join(Task, Task.task_id == Evaluation.task_id)
+        if participant_id:
+            query = query.where((Task.task_executor == participant_id) | (Task.task_checker == participant_id))
+        if team_id:
+            query = query.where(Task.team_id == team_id)
+        return query
 
-        result = await db.execute(query.offset(skip).limit(limit))
-        return result.scalars().all()
+    @staticmethod
+    def export_query(task_id: Optional[int] = None, user_id: Optional[int] = None,
+                     participant_id: Optional[int] = None, team_id: Optional[int] = None) -> Select:
+        """Колонки оценок для выгрузки в порядке evaluation_id"""
+        query = select(*Evaluation.__table__.c).order_by(Evaluation.evaluation_id)
+        return EvaluationRepository._filter_evaluations(query, task_id, user_id, participant_id, team_id)
 
     @staticmethod
     async def get_evaluation_by_id(
         db: AsyncSession,
-        evaluation_id: int
-    ) -> Optional[Evaluation]:
-        """Получение оценки по ее id"""
-        result = await db.execute(select(Evaluation).where(Evaluation.evaluation_id == evaluation_id))
-        return result.scalar_one_or_none()
+        evaluation_id: int,
+        options: Sequence[ORMOption] = loading.EVALUATION_TASK,
+        fields: Optional[Sequence[str]] = None
+    ) -> Optional[Union[Evaluation, Row]]:
+        """Получение оценки по ее id (проекция fields несет и исполнителя с проверяющим задачи)"""
+        query = _select(Evaluation, options, fields).where(Evaluation.evaluation_id == evaluation_id)
+        if fields is not None:
+            query = query.add_columns(Task.task_executor, Task.task_checker).join(
+                Task, Task.task_id == Evaluation.task_id)
+        return _one_or_none(await db.execute(query), fields)
 
     @staticmethod
-    async def get_user_evaluations(db: AsyncSession,user_id: int) -> Sequence[Row[Any] | RowMapping | Any]:
-        """Получение оценок пользователя"""
-        result = await db.execute(
-            select(Evaluation)
-            .join(Evaluation.task)
-            .where(Task.task_executor == user_id)
-            .order_by(Evaluation.created_at.desc())
-        )
-        return result.scalars().all()
+    async def get_user_evaluations(db: AsyncSession,user_id: int,cursor: Optional[str] = None,limit: int = DEFAULT_PAGE_SIZE,
+                                   fields: Optional[Sequence[str]] = None) -> KeysetPage:
+        """Получение оценок пользователя (новые первыми)"""
+        query = _select(Evaluation, fields=fields).join(Task, Task.task_id == Evaluation.task_id).where(
+            Task.task_executor == user_id)
+        return await paginate(db, query, [Evaluation.created_at, Evaluation.evaluation_id], cursor, limit, descending=True)
 
     @staticmethod
-    async def check_duplicate_evaluations(
-        db: AsyncSession,
-        task_id: int,
-        evaluator_id: int
-    ) -> bool:
-        """Проверка дублей"""
+    async def get_evaluation_targets(db: AsyncSession, task_ids: Sequence[int], evaluator_id: int) -> Dict[int, Row]:
+        """
+        Задачи для оценки одним запросом: статус, проверяющий, исполнитель и прежняя оценка
+        evaluator_id (evaluation_value None - еще не оценивал). Строки задач блокируются
+        до конца транзакции: прежняя оценка не изменится до upsert
+        """
+        if not task_ids:
+            return {}
         result = await db.execute(
-            select(Evaluation).where(
-                Evaluation.task_id == task_id,
-                Evaluation.evaluator_id == evaluator_id
-            )
+            select(Task.task_id, Task.status, Task.task_checker, Task.task_executor,
+                   Evaluation.evaluation_value, Evaluation.created_at)
+            .outerjoin(Evaluation, (Evaluation.task_id == Task.task_id) & (Evaluation.evaluator_id == evaluator_id))
+            .where(Task.task_id.in_(set(task_ids)))
+            .with_for_update(of=Task)
         )
-        return result.scalar_one_or_none()
+        return {row.task_id: row for row in result}
+
+    @staticmethod
+    async def upsert_evaluations(db: AsyncSession,
+                                 evaluations_data: Sequence[dict],
+                                 targets: Dict[int, Row],
+                                 update_existing: bool = False) -> Optional[List[Evaluation]]:
+        """
+        Оценки одним INSERT ... ON CONFLICT (task_id, evaluator_id) DO NOTHING / DO UPDATE ... RETURNING
+        и сводные суммы пачкой. targets - результат get_evaluation_targets (прежние оценки для
+        приращений). Возвращает вставленные и обновленные оценки, пропущенных в результате нет
+        """
+        async def _upsert():
+            now = datetime.now(timezone.utc)
+            stmt = _dialect_insert(db, Evaluation).values([{**data, "created_at": now} for data in evaluations_data])
+            if update_existing:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["task_id", "evaluator_id"],
+                    set_={field: stmt.excluded[field]
+                          for field in ("evaluation_value", "evaluation_name", "evaluation_comment")},
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=["task_id", "evaluator_id"])
+            result = await db.scalars(stmt.returning(Evaluation), execution_options={"populate_existing": True})
+            evaluations = list(result)
+
+            user_deltas: Dict[Tuple[int, date], Tuple[int, int]] = {}
+            task_deltas: Dict[int, Tuple[int, int]] = {}
+            for evaluation in evaluations:
+                target = targets[evaluation.task_id]
+                if target.evaluation_value is None:
+                    delta, count, bucket = evaluation.evaluation_value, 1, _bucket_date(now)
+                else:
+                    delta, count, bucket = (evaluation.evaluation_value - target.evaluation_value, 0,
+                                            _bucket_date(target.created_at))
+                if not delta and not count:
+                    continue
+                if target.task_executor is not None:
+                    total, counted = user_deltas.get((target.task_executor, bucket), (0, 0))
+                    user_deltas[(target.task_executor, bucket)] = (total + delta, counted + count)
+                total, counted = task_deltas.get(evaluation.task_id, (0, 0))
+                task_deltas[evaluation.task_id] = (total + delta, counted + count)
+
+            await RatingRollupRepository.apply_deltas(db, user_deltas, task_deltas)
+            await db_error_handler.save(db)
+            return evaluations
+
+        if not evaluations_data:
+            return []
+        return await db_error_handler.execute_with_error_handling(db, _upsert)
 
     @staticmethod
     async def create_evaluation(db: AsyncSession, evaluation_data: dict) -> Optional[Evaluation]:
-        """Создать оценку"""
-        return await db_error_handler.create_operation(db, Evaluation, evaluation_data)
+        """Создать оценку и учесть ее в сводных суммах"""
+        async def _create():
+            evaluation = Evaluation(**evaluation_data)
+            if evaluation.created_at is None:
+                evaluation.created_at = datetime.now(timezone.utc)
+            db.add(evaluation)
+            await db.flush()
+
+            executor_id = await db.scalar(select(Task.task_executor).where(Task.task_id == evaluation.task_id))
+            await RatingRollupRepository.apply_delta(db, evaluation.task_id, executor_id, _bucket_date(evaluation.created_at),
+                                                     evaluation.evaluation_value, 1)
+            await db_error_handler.save(db)
+            return evaluation
+
+        return await db_error_handler.execute_with_error_handling(db, _create)
 
     @staticmethod
     async def update_evaluation(db: AsyncSession, evaluation_id: int, evaluation_data: dict) -> Optional[Evaluation]:
-        """Обновить оценку"""
-        return await db_error_handler.update_operation(db, EvaluationRepository.get_evaluation_by_id, evaluation_id, evaluation_data)
+        """
+        Обновить оценку запросом UPDATE ... RETURNING и сводные суммы.
+        Прежнее значение читается (с блокировкой строки) только если меняется сама оценка
+        """
+        async def _update():
+            previous = None
+            if "evaluation_value" in evaluation_data:
+                result = await db.execute(
+                    select(Evaluation.task_id, Evaluation.evaluation_value, Evaluation.created_at, Task.task_executor)
+                    .join(Evaluation.task)
+                    .where(Evaluation.evaluation_id == evaluation_id)
+                    .with_for_update(of=Evaluation)
+                )
+                previous = result.one_or_none()
+                if previous is None:
+                    return None
+
+            result = await db.execute(
+                update(Evaluation).where(Evaluation.evaluation_id == evaluation_id)
+                .values(**evaluation_data).returning(Evaluation)
+            )
+            evaluation = result.scalar_one_or_none()
+            if evaluation is None:
+                return None
+            if previous is not None and evaluation.evaluation_value != previous.evaluation_value:
+                await RatingRollupRepository.apply_delta(db, previous.task_id, previous.task_executor,
+                                                         _bucket_date(previous.created_at),
+                                                         evaluation.evaluation_value - previous.evaluation_value, 0)
+            await db_error_handler.save(db)
+            return evaluation
+
+        return await db_error_handler.execute_with_error_handling(db, _update)
 
     @staticmethod
     async def delete_evaluation(db: AsyncSession, evaluation_id: int) -> bool:
-        """Удалить оценку"""
-        return await db_error_handler.delete_operation(db, EvaluationRepository.get_evaluation_by_id, evaluation_id)
+        """Удалить оценку запросом DELETE ... RETURNING и вычесть ее из сводных сумм"""
+        async def _delete():
+            executor_id = select(Task.task_executor).where(Task.task_id == Evaluation.task_id).scalar_subquery()
+            result = await db.execute(
+                delete(Evaluation).where(Evaluation.evaluation_id == evaluation_id)
+                .returning(Evaluation.task_id, Evaluation.evaluation_value, Evaluation.created_at,
+                           executor_id.label("task_executor"))
+            )
+            deleted = result.one_or_none()
+            if deleted is None:
+                return False
+            await RatingRollupRepository.apply_delta(db, deleted.task_id, deleted.task_executor,
+                                                     _bucket_date(deleted.created_at), -deleted.evaluation_value, -1)
+            await db_error_handler.save(db)
+            return True
+
+        result = await db_error_handler.execute_with_error_handling(db, _delete)
+        return result if result is not None else False
 
 
 class TaskRepository:
     """Репозиторий для задач"""
     @staticmethod
-    async def get_tasks_by_filters(db: AsyncSession,skip: int = 0,limit: int = 100,status: Optional[str] = None,team_id: Optional[int] = None,user_id: Optional[int] = None) -> \
-    Sequence[Row[Any] | RowMapping | Any]:
-        """получение задачи по фильтру"""
-        query = select(Task)
-
+    def _filter_tasks(query: Select, status: Optional[str] = None, team_id: Optional[int] = None,
+                      user_id: Optional[int] = None, participant_id: Optional[int] = None) -> Select:
+        """Фильтры задач (participant_id - исполнитель или проверяющий)"""
         if status:
             query = query.where(Task.status == status)
         if team_id:
             query = query.where(Task.team_id == team_id)
         if user_id:
             query = query.where(Task.task_executor == user_id)
+        if participant_id:
+            query = query.where((Task.task_executor == participant_id) | (Task.task_checker == participant_id))
+        return query
 
-        result = await db.execute(query.offset(skip).limit(limit))
-        return result.scalars().all()
+    @staticmethod
+    async def get_tasks_by_filters(db: AsyncSession,cursor: Optional[str] = None,limit: int = DEFAULT_PAGE_SIZE,status: Optional[str] = None,team_id: Optional[int] = None,user_id: Optional[int] = None,
+                                   options: Sequence[ORMOption] = loading.NONE,
+                                   fields: Optional[Sequence[str]] = None) -> KeysetPage:
+        """получение задачи по фильтру"""
+        query = TaskRepository._filter_tasks(_select(Task, options, fields), status, team_id, user_id)
+        return await paginate(db, query, [Task.task_id], cursor, limit)
+
+    @staticmethod
+    def export_query(status: Optional[str] = None, team_id: Optional[int] = None, user_id: Optional[int] = None,
+                     participant_id: Optional[int] = None) -> Select:
+        """Колонки задач для выгрузки (без ORM-объектов) в порядке task_id"""
+        query = select(*Task.__table__.c).order_by(Task.task_id)
+        return TaskRepository._filter_tasks(query, status, team_id, user_id, participant_id)
 
     @staticmethod
-    async def get_task_by_id(db: AsyncSession, task_id: int) -> Optional[Task]:
+    async def get_task_by_id(db: AsyncSession, task_id: int, options: Sequence[ORMOption] = loading.NONE,
+                             fields: Optional[Sequence[str]] = None) -> Optional[Union[Task, Row]]:
         """Получение задачи по id"""
-        result = await db.execute(select(Task).where(Task.task_id == task_id))
-        return result.scalar_one_or_none()
+        result = await db.execute(_select(Task, options, fields).where(Task.task_id == task_id))
+        return _one_or_none(result, fields)
 
     @staticmethod
-    async def get_user_tasks(db: AsyncSession, user_id: int) -> Sequence[Row[Any] | RowMapping | Any]:
-        """Получение задач пользователя"""
+    async def get_open_tasks_by_deadline(db: AsyncSession, user_id: int, limit: int = DEFAULT_PAGE_SIZE) -> Sequence[Task]:
+        """Незавершенные задачи исполнителя с ближайшим дедлайном (частичный индекс ix_tasks_executor_open_deadline)"""
         result = await db.execute(
             select(Task).where(
-                (Task.task_executor == user_id) | (Task.task_checker == user_id)
-            )
+                Task.task_executor == user_id,
+                # литерал, а не параметр: иначе планировщик не сопоставит условие частичного индекса
+                Task.status != literal_column("'completed'"),
+                Task.deadline.is_not(None),
+            ).order_by(Task.deadline).limit(limit)
         )
         return result.scalars().all()
 
+    @staticmethod
+    async def get_user_tasks(db: AsyncSession, user_id: int, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE,
+                             fields: Optional[Sequence[str]] = None) -> KeysetPage:
+        """Получение задач пользователя"""
+        query = TaskRepository._filter_tasks(_select(Task, fields=fields), participant_id=user_id)
+        return await paginate(db, query, [Task.task_id], cursor, limit)
+
     @staticmethod
     async def creaate_task(db: AsyncSession, task_data: dict) -> Task:
         """Создание новой задачи"""
         return await db_error_handler.create_operation(db, Task, task_data)
 
+    @staticmethod
+    async def create_tasks(db: AsyncSession, tasks_data: Sequence[dict]) -> Optional[List[Task]]:
+        """
+        Создание списка задач одним INSERT ... RETURNING: задачи в порядке tasks_data
+        (PostgreSQL сортирует RETURNING по неявному sentinel, пачками insertmanyvalues)
+        """
+        async def _create():
+            result = await db.scalars(insert(Task).returning(Task, sort_by_parameter_order=True), tasks_data)
+            tasks = list(result)
+            await db_error_handler.save(db)
+            return tasks
+
+        if not tasks_data:
+            return []
+        return await db_error_handler.execute_with_error_handling(db, _create)
+
     @staticmethod
     async def update_task(db: AsyncSession, task_id: int, task_data: dict) -> Optional[Task]:
-        """Обновить задачу"""
-        return await db_error_handler.update_operation(db,TaskRepository.get_task_by_id,task_id,task_data)
+        """Обновить задачу (смена исполнителя переносит оценки задачи в его дневные корзины)"""
+        if "task_executor" not in task_data:
+            return await db_error_handler.update_operation(db, Task, Task.task_id == task_id, task_data)
+
+        async def _update():
+            before = await RatingRollupRepository.snapshot(db, [task_id])
+            result = await db.execute(update(Task).where(Task.task_id == task_id).values(**task_data).returning(Task))
+            task = result.scalar_one_or_none()
+            if task is None:
+                return None
+            await RatingRollupRepository.settle(db, before)
+            await db_error_handler.save(db)
+            return task
+
+        return await db_error_handler.execute_with_error_handling(db, _update)
+
+    @staticmethod
+    async def update_task_status(db: AsyncSession, task_id: int, status: str, user_id: Optional[int] = None) -> Optional[Task]:
+        """
+        обновление статуса выполнения задачи одним запросом.
+        С user_id - только если пользователь исполнитель или проверяющий задачи
+        """
+        criteria = Task.task_id == task_id
+        if user_id is not None:
+            criteria = criteria & ((Task.task_executor == user_id) | (Task.task_checker == user_id))
+        return await db_error_handler.update_operation(db, Task, criteria, {"status": status})
 
     @staticmethod
-    async def update_task_status(db: AsyncSession,task_id: int,status: str) -> Optional[Task]:
-        """обновление статуса выполнения задачи"""
-        return await db_error_handler.update_operation(db,TaskRepository.get_task_by_id,task_id,{"status": status})
+    def status_permission(user: Principal):
+        """
+        Условие прав на смену статуса: исполнитель или проверяющий задачи,
+        менеджер и админ команды - задачи своей команды, администратор - любые
+        """
+        if user.role == RoleEnum.admin:
+            return true()
+        criteria = (Task.task_executor == user.id) | (Task.task_checker == user.id)
+        if user.role in (RoleEnum.team_admin, RoleEnum.manager) and user.member_of_team:
+            criteria = criteria | (Task.team_id == user.member_of_team)
+        return criteria
+
+    @staticmethod
+    async def update_task_statuses(db: AsyncSession,
+                                   statuses: Dict[int, TaskStatusEnum],
+                                   user: Principal) -> Optional[List[int]]:
+        """
+        Смена статусов списка задач одним UPDATE ... SET status = CASE task_id ... RETURNING:
+        права - в условии запроса, результат - id измененных задач (None - при ошибке)
+        """
+        async def _update():
+            result = await db.execute(
+                update(Task)
+                .where(Task.task_id.in_(statuses), TaskRepository.status_permission(user))
+                .values(status=case(statuses, value=Task.task_id))
+                .returning(Task.task_id)
+            )
+            task_ids = list(result.scalars())
+            if task_ids:
+                await db_error_handler.save(db)
+            return task_ids
+
+        if not statuses:
+            return []
+        return await db_error_handler.execute_with_error_handling(db, _update)
 
     @staticmethod
     async def delete_task(db: AsyncSession, task_id: int) -> bool:
-        """Удалить задачу"""
-        return await db_error_handler.delete_operation(db,TaskRepository.get_task_by_id,task_id)
+        """Удалить задачу (оценки задачи вычитаются из рейтинга исполнителя)"""
+        async def _delete():
+            task = (await db.execute(select(Task.task_executor).where(Task.task_id == task_id))).one_or_none()
+            if task is None:
+                return False
+            await RatingRollupRepository.remove_task(db, task_id, task.task_executor)
+            # оценки и комментарии удаляет база (ON DELETE CASCADE)
+            await db.execute(delete(Task).where(Task.task_id == task_id))
+            await db_error_handler.save(db)
+            return True
+
+        result = await db_error_handler.execute_with_error_handling(db, _delete)
+        return result if result is not None else False
 
 
 class UserRepository:
@@ -184,18 +717,77 @@ class UserRepository:
     @staticmethod
     async def get_users(
             db: AsyncSession,
-            skip: int = 0,
-            limit: int = 100
-    ) -> Sequence[User]:
+            cursor: Optional[str] = None,
+            limit: int = DEFAULT_PAGE_SIZE,
+            options: Sequence[ORMOption] = loading.NONE
+    ) -> KeysetPage:
         """получение данных пользователя"""
-        result = await db.execute(select(User).offset(skip).limit(limit))
-        return result.scalars().all()
+        return await paginate(db, select(User).options(*options), [User.id], cursor, limit)
 
     @staticmethod
     async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
-        """Получение данных пользователя по id"""
-        result = await db.execute(select(User).where(User.id == user_id))
-        return result.scalar_one_or_none()
+        """Получение данных пользователя по id (без запроса, если он уже загружен в сессию)"""
+        return await db.get(User, user_id)
+
+    @staticmethod
+    async def get_users_by_ids(db: AsyncSession, user_ids: Sequence[int]) -> Dict[int, User]:
+        """Пользователи по списку id одним запросом: id -> User (отсутствующих нет в словаре)"""
+        if not user_ids:
+            return {}
+        result = await db.execute(select(User).where(User.id.in_(set(user_ids))))
+        return {user.id: user for user in result.scalars()}
+
+    @staticmethod
+    async def get_taken_logins(db: AsyncSession,
+                               emails: Sequence[str],
+                               usernames: Sequence[str]) -> Tuple[Set[str], Set[str]]:
+        """Уже занятые email (в нижнем регистре) и username из переданных - одним запросом"""
+        if not emails and not usernames:
+            return set(), set()
+        result = await db.execute(
+            select(func.lower(User.email), User.username)
+            .where(func.lower(User.email).in_(emails) | User.username.in_(usernames))
+        )
+        taken_emails, taken_usernames = set(), set()
+        for email, username in result:
+            taken_emails.add(email)
+            taken_usernames.add(username)
+        return taken_emails & set(emails), taken_usernames & set(usernames)
+
+    @staticmethod
+    async def create_users(db: AsyncSession, users_data: Sequence[dict]) -> Optional[Dict[str, int]]:
+        """
+        Массовое создание: один INSERT ... RETURNING, драйвер разбивает его на пачки
+        (insertmanyvalues). Результат - email в нижнем регистре -> id, None - при ошибке
+        """
+        async def _create():
+            # без sort_by_parameter_order: порядок строк RETURNING не нужен, а с ним
+            # SQLAlchemy без sentinel-колонки вставляет по одной строке
+            result = await db.execute(insert(User).returning(User.id, User.email), users_data)
+            user_ids = {email.lower(): user_id for user_id, email in result}
+            await db_error_handler.save(db)
+            return user_ids
+
+        if not users_data:
+            return {}
+        return await db_error_handler.execute_with_error_handling(db, _create)
+
+    @staticmethod
+    async def get_team_memberships(db: AsyncSession, user_ids: Sequence[int]) -> Dict[int, Optional[int]]:
+        """Команды пользователей одним запросом: id -> member_of_team (отсутствующих нет в словаре)"""
+        if not user_ids:
+            return {}
+        result = await db.execute(select(User.id, User.member_of_team).where(User.id.in_(set(user_ids))))
+        return dict(result.tuples().all())
+
+    @staticmethod
+    async def get_principal(db: AsyncSession, user_id: int) -> Optional[Principal]:
+        """Получение полей пользователя для проверки прав (без загрузки сущности)"""
+        result = await db.execute(
+            select(User.id, User.role, User.member_of_team, User.is_active).where(User.id == user_id)
+        )
+        row = result.one_or_none()
+        return Principal(*row) if row else None
 
     @staticmethod
     async def update_user_team(db: AsyncSession, user_id: int, team_id: Optional[int]) -> Optional[User]:
@@ -203,18 +795,26 @@ class UserRepository:
         user = await UserRepository.get_user_by_id(db, user_id)
         if user:
             user.member_of_team = team_id
-            await db.commit()
-            await db.refresh(user)
+            invalidate_principal_on_commit(db, user_id)
+            await db_error_handler.save(db)
         return user
 
 
+    @staticmethod
+    async def set_calendar_feed_token_hash(db: AsyncSession, user_id: int, token_hash: Optional[str]) -> None:
+        """Выпустить (или отозвать при None) токен календарной подписки"""
+        await db.execute(
+            update(User).where(User.id == user_id).values(calendar_feed_token_hash=token_hash)
+        )
+        await db_error_handler.save(db)
+
+
 class TeamRepository:
     """Репозиторий для команд"""
     @staticmethod
-    async def get_teams(db: AsyncSession, skip: int = 0, limit: int = 100) -> Sequence[Team]:
+    async def get_teams(db: AsyncSession, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE, options: Sequence[ORMOption] = loading.NONE) -> KeysetPage:
         """Получение информации о команде"""
-        result = await db.execute(select(Team).offset(skip).limit(limit))
-        return result.scalars().all()
+        return await paginate(db, select(Team).options(*options), [Team.team_id], cursor, limit)
 
     @staticmethod
     async def get_team_by_id(db: AsyncSession, team_id: int) -> Optional[Team]:
@@ -222,6 +822,14 @@ class TeamRepository:
         result = await db.execute(select(Team).where(Team.team_id == team_id))
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def get_existing_team_ids(db: AsyncSession, team_ids: Sequence[int]) -> Set[int]:
+        """Какие из переданных id команд существуют"""
+        if not team_ids:
+            return set()
+        result = await db.execute(select(Team.team_id).where(Team.team_id.in_(set(team_ids))))
+        return set(result.scalars())
+
     @staticmethod
     async def get_team_by_invite_code(db: AsyncSession, invite_code: str) -> Optional[Team]:
         """Получение информации о команде по пригласительному коду"""
@@ -236,47 +844,85 @@ class TeamRepository:
     @staticmethod
     async def update_team(db: AsyncSession, team_id: int, team_data: dict) -> Optional[Team]:
         """Обновление данных о команде"""
-        return await db_error_handler.update_operation(
-            db, TeamRepository.get_team_by_id, team_id, team_data
-        )
+        return await db_error_handler.update_operation(db, Team, Team.team_id == team_id, team_data)
 
     @staticmethod
     async def delete_team(db: AsyncSession,team_id: int) -> bool:
-        """удаление команды"""
-        return await db_error_handler.delete_operation(db,TeamRepository.get_team_by_id,team_id)
+        """удаление команды: участники и задачи отвязываются (ON DELETE SET NULL)"""
+        members = await db.execute(select(User.id).where(User.member_of_team == team_id))
+        for user_id in members.scalars():
+            invalidate_principal_on_commit(db, user_id)
+        return await db_error_handler.delete_operation(db, Team, Team.team_id == team_id)
        
         
+# Пространство ключей pg_advisory_xact_lock для бронирования встреч
+MEETING_LOCK_NAMESPACE = 1001
+
+
+class MeetingConflict(NamedTuple):
+    """Пересекающаяся встреча и ее участник из проверяемого списка"""
+    meeting_id: int
+    meeting_name: str
+    user_id: int
+    username: Optional[str]
+
+
 class MeetingRepository:
     """Репозиторий для встреч"""
     @staticmethod
-    async def get_meetings_by_filters(db: AsyncSession,skip: int = 0,limit: int = 100,start_date: Optional[datetime] = None,end_date: Optional[datetime] = None,user_id: Optional[int] = None) -> \
-    Sequence[Meeting]:
+    def _participant_meeting_ids(user_id: int):
+        """id встреч участника: поиск идет от индекса ix_meeting_participants_user_id"""
+        return select(meeting_participants.c.meeting_id).where(meeting_participants.c.user_id == user_id)
+
+    @staticmethod
+    async def get_meetings_by_filters(db: AsyncSession,cursor: Optional[str] = None,limit: int = DEFAULT_PAGE_SIZE,start_date: Optional[datetime] = None,end_date: Optional[datetime] = None,user_id: Optional[int] = None,
+                                      options: Sequence[ORMOption] = loading.NONE,
+                                      fields: Optional[Sequence[str]] = None) -> KeysetPage:
         """ получение данных о встрече по фильтрам"""
-        query = select(Meeting)
+        query = MeetingRepository._filter_meetings(_select(Meeting, options, fields), start_date, end_date, user_id)
+        return await paginate(db, query, [Meeting.meeting_date, Meeting.meeting_id], cursor, limit)
 
+    @staticmethod
+    def _filter_meetings(query: Select, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                         user_id: Optional[int] = None) -> Select:
+        """Фильтры встреч (user_id - участник)"""
         if start_date:
             query = query.where(Meeting.meeting_date >= start_date)
         if end_date:
             query = query.where(Meeting.meeting_date <= end_date)
         if user_id:
-            query = query.where(Meeting.participants.any(id=user_id))
+            query = query.where(Meeting.meeting_id.in_(MeetingRepository._participant_meeting_ids(user_id)))
+        return query
 
-        result = await db.execute(query.offset(skip).limit(limit))
-        return result.scalars().all()
+    @staticmethod
+    def export_query(start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                     user_id: Optional[int] = None) -> Select:
+        """Колонки встреч для выгрузки в порядке даты"""
+        query = select(*Meeting.__table__.c).order_by(Meeting.meeting_date, Meeting.meeting_id)
+        return MeetingRepository._filter_meetings(query, start_date, end_date, user_id)
 
     @staticmethod
-    async def get_meeting_by_id(db: AsyncSession, meeting_id: int) -> Optional[Meeting]:
+    async def get_meeting_by_id(db: AsyncSession, meeting_id: int, options: Sequence[ORMOption] = loading.MEETING_PARTICIPANTS,
+                                fields: Optional[Sequence[str]] = None) -> Optional[Union[Meeting, Row]]:
         """Получение данных о встрече по ее id"""
-        result = await db.execute(select(Meeting).where(Meeting.meeting_id == meeting_id))
-        return result.scalar_one_or_none()
+        result = await db.execute(_select(Meeting, options, fields).where(Meeting.meeting_id == meeting_id))
+        return _one_or_none(result, fields)
 
     @staticmethod
-    async def get_user_meetings(db: AsyncSession,user_id: int) -> Sequence[Meeting]:
+    async def is_participant(db: AsyncSession, meeting_id: int, user_id: int) -> bool:
+        """Пользователь участвует во встрече (без загрузки списка участников)"""
+        return bool(await db.scalar(
+            select(meeting_participants.c.meeting_id).where(meeting_participants.c.meeting_id == meeting_id,
+                                                            meeting_participants.c.user_id == user_id)
+        ))
+
+    @staticmethod
+    async def get_user_meetings(db: AsyncSession,user_id: int,cursor: Optional[str] = None,limit: int = DEFAULT_PAGE_SIZE,
+                                fields: Optional[Sequence[str]] = None) -> KeysetPage:
         """получение назначенных встреч для пользователя"""
-        result = await db.execute(select(Meeting).
-                                  where(Meeting.participants.any(id=user_id)).
-                                  order_by(Meeting.meeting_date))
-        return result.scalars().all()
+        query = _select(Meeting, fields=fields).where(
+            Meeting.meeting_id.in_(MeetingRepository._participant_meeting_ids(user_id)))
+        return await paginate(db, query, [Meeting.meeting_date, Meeting.meeting_id], cursor, limit)
 
     @staticmethod
     async def create_meeting(db: AsyncSession, meeting_data: dict) -> Optional[Meeting]:
@@ -285,35 +931,89 @@ class MeetingRepository:
 
     @staticmethod
     async def update_meeting(db: AsyncSession,meeting_id: int,meeting_data: dict) -> Optional[Meeting]:
-        """обновление данных встречи"""
-        return await db_error_handler.update_operation(db,MeetingRepository.get_meeting_by_id,meeting_id,meeting_data)
+        """
+        обновление данных встречи запросом UPDATE ... RETURNING;
+        участники заменяются в meeting_participants без загрузки коллекции
+        """
+        meeting_data = dict(meeting_data)
+        participants = meeting_data.pop("participants", None)
+        # id читаются до операции: при повторе после отката объекты User уже expired
+        participant_ids = None if participants is None else [user.id for user in participants]
+
+        async def _update():
+            values = dict(meeting_data)
+            if "meeting_date" in values or "duration_minutes" in values:
+                if "meeting_date" not in values or "duration_minutes" not in values:
+                    current = await db.execute(
+                        select(Meeting.meeting_date, Meeting.duration_minutes).where(Meeting.meeting_id == meeting_id))
+                    current = current.one_or_none()
+                    if current is None:
+                        return None
+                    values.setdefault("meeting_date", current.meeting_date)
+                    values.setdefault("duration_minutes", current.duration_minutes)
+                values["duration_minutes"] = values["duration_minutes"] or 60
+                values["meeting_end"] = meeting_end(values["meeting_date"], values["duration_minutes"])
+
+            result = await db.execute(
+                update(Meeting).where(Meeting.meeting_id == meeting_id).values(**values).returning(Meeting)
+            )
+            meeting = result.scalar_one_or_none()
+            if meeting is None:
+                return None
+            if participant_ids is not None:
+                await db.execute(delete(meeting_participants).where(meeting_participants.c.meeting_id == meeting_id))
+                if participant_ids:
+                    await db.execute(insert(meeting_participants),
+                                     [{"meeting_id": meeting_id, "user_id": user_id} for user_id in participant_ids])
+                db.expire(meeting, ["participants"])
+            await db_error_handler.save(db)
+            return meeting
+
+        return await db_error_handler.execute_with_error_handling(db, _update)
 
 
     @staticmethod
     async def delete_meeting(db: AsyncSession,meeting_id: int) -> bool:
-        """удаление встречи"""
-        return await db_error_handler.delete_operation(db,MeetingRepository.get_meeting_by_id,meeting_id)
+        """удаление встречи (участники удаляются базой, ON DELETE CASCADE)"""
+        return await db_error_handler.delete_operation(db, Meeting, Meeting.meeting_id == meeting_id)
     
     
     @staticmethod
-    async def check_meeting_conflicts(db: AsyncSession,user_ids: List[int],meeting_date: datetime,duration_minutes: int,exclude_meeting_id: Optional[int] = None) -> List[Meeting]:
-        """проверка пересечения встреч"""
+    async def check_meeting_conflicts(db: AsyncSession,user_ids: List[int],meeting_date: datetime,duration_minutes: int,exclude_meeting_id: Optional[int] = None) -> List[MeetingConflict]:
+        """
+        проверка пересечения встреч одним запросом по индексу интервалов:
+        возвращает пересекающиеся встречи и участников, у которых конфликт.
+        На Postgres берет транзакционные advisory-блокировки участников, чтобы
+        параллельные запросы не забронировали одно время дважды до коммита
+        """
+        if not user_ids:
+            return []
         meeting_end = meeting_date + timedelta(minutes=duration_minutes)
-        query = select(Meeting).join(Meeting.participants).where(User.id.in_(user_ids))
+        is_postgres = db.get_bind().dialect.name == "postgresql"
+
+        if is_postgres:
+            for user_id in sorted(set(user_ids)):
+                await db.execute(select(func.pg_advisory_xact_lock(MEETING_LOCK_NAMESPACE, user_id)))
+
+        query = (
+            select(Meeting.meeting_id, Meeting.meeting_name, User.id, User.username)
+            .join(meeting_participants, meeting_participants.c.meeting_id == Meeting.meeting_id)
+            .join(User, User.id == meeting_participants.c.user_id)
+            .where(User.id.in_(user_ids))
+            .order_by(Meeting.meeting_date, Meeting.meeting_id, User.id)
+        )
+        if is_postgres:
+            query = query.where(
+                func.tstzrange(Meeting.meeting_date, Meeting.meeting_end).op("&&")(func.tstzrange(meeting_date, meeting_end))
+            )
+        else:
+            query = query.where(Meeting.meeting_date < meeting_end, Meeting.meeting_end > meeting_date)
 
         if exclude_meeting_id:
             query = query.where(Meeting.meeting_id != exclude_meeting_id)
 
         result = await db.execute(query)
-        all_meetings = result.scalars().all()
-
-        conflict_meetings = []
-        for meeting in all_meetings:
-            existing_end = meeting.meeting_date + timedelta(minutes=meeting.duration_minutes)
-            if meeting_date < existing_end and meeting_end > meeting.meeting_date:
-                conflict_meetings.append(meeting)
-
-        return conflict_meetings
+        return [MeetingConflict(*row) for row in result.all()]
 
 
 class CommentRepository:
@@ -324,17 +1024,89 @@ class CommentRepository:
         return await db_error_handler.create_operation(db, Comment, comment_data)
 
     @staticmethod
-    async def get_comments_by_task_id(db: AsyncSession, task_id: int) -> Sequence[Row[Any] | RowMapping | Any]:
+    async def get_comments_by_task_id(db: AsyncSession, task_id: int, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> KeysetPage:
         """Получение комментариев по id задачи"""
-        result = await db.execute(select(Comment).where(Comment.task_id == task_id))
-        return result.scalars().all()
+        query = select(Comment).where(Comment.task_id == task_id)
+        return await paginate(db, query, [Comment.comment_id], cursor, limit)
+
+
+class IndexRepository:
+    """Репозиторий главной страницы: только колонки, которые показывает шаблон"""
+    @staticmethod
+    async def get_users_overview(db: AsyncSession, limit: int) -> Sequence[Row]:
+        """Первые пользователи"""
+        result = await db.execute(
+            select(User.id, User.username, User.email, User.is_active, User.is_superuser, User.is_verified,
+                   User.role, User.member_of_team, User.created_at)
+            .order_by(User.id).limit(limit)
+        )
+        return result.all()
+
+    @staticmethod
+    async def get_teams_overview(db: AsyncSession, limit: int) -> Sequence[Row]:
+        """Первые команды с именем администратора и списком участников"""
+        admin = aliased(User)
+        member = aliased(User)
+        result = await db.execute(
+            select(Team.team_id, Team.team_name, Team.invite_code, Team.created_at,
+                   admin.username.label("admin"),
+                   func.aggregate_strings(member.username, ", ").label("members"))
+            .outerjoin(admin, admin.id == Team.team_admin)
+            .outerjoin(member, member.member_of_team == Team.team_id)
+            .group_by(Team.team_id, Team.team_name, Team.invite_code, Team.created_at, admin.username)
+            .order_by(Team.team_id).limit(limit)
+        )
+        return result.all()
+
+    @staticmethod
+    async def get_tasks_overview(db: AsyncSession, limit: int) -> Sequence[Row]:
+        """Первые задачи с исполнителем, проверяющим, командой и количеством оценок"""
+        executor = aliased(User)
+        checker = aliased(User)
+        result = await db.execute(
+            select(Task.task_id, Task.task_name, Task.status, Task.deadline,
+                   executor.username.label("executor"),
+                   checker.username.label("checker"),
+                   Team.team_name.label("team"),
+                   func.coalesce(TaskRatingTotal.rating_count, 0).label("evaluations"))
+            .outerjoin(executor, executor.id == Task.task_executor)
+            .outerjoin(checker, checker.id == Task.task_checker)
+            .outerjoin(Team, Team.team_id == Task.team_id)
+            .outerjoin(TaskRatingTotal, TaskRatingTotal.task_id == Task.task_id)
+            .order_by(Task.task_id).limit(limit)
+        )
+        return result.all()
+
+    @staticmethod
+    async def get_meetings_overview(db: AsyncSession, limit: int) -> Sequence[Row]:
+        """Ближайшие по дате встречи"""
+        result = await db.execute(
+            select(Meeting.meeting_id, Meeting.meeting_name, Meeting.meeting_admin, Meeting.meeting_date,
+                   Meeting.duration_minutes)
+            .order_by(Meeting.meeting_date, Meeting.meeting_id).limit(limit)
+        )
+        return result.all()
+
+    @staticmethod
+    async def get_meeting_counts_by_day(db: AsyncSession, start_date: date, end_date: date) -> Dict[date, int]:
+        """Количество встреч по дням за [start_date, end_date]"""
+        day = _utc_day(db, Meeting.meeting_date).label("day")
+        result = await db.execute(
+            select(day, func.count().label("meeting_count"))
+            .where(Meeting.meeting_date >= datetime.combine(start_date, time.min),
+                   Meeting.meeting_date < datetime.combine(end_date + timedelta(days=1), time.min))
+            .group_by(day)
+        )
+        return {row.day: row.meeting_count for row in result}
 
 
 # Экземпляры репозиториев
 calendar_repo = CalendarRepository()
+rating_repo = RatingRollupRepository()
 evaluation_repo = EvaluationRepository()
 task_repo = TaskRepository()
 user_repo = UserRepository()
 team_repo = TeamRepository()
 meeting_repo = MeetingRepository()
 comment_repo = CommentRepository()
+index_repo = IndexRepository()
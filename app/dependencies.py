@@ -1,12 +1,15 @@
 """Dependencies"""
-from fastapi import Depends, HTTPException, status
+from typing import Callable, Optional, Tuple, Type
+from fastapi import Depends, HTTPException, Query, status
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database.database import get_async_session
-from app.database.models import User, Team, RoleEnum
-from app.fastapi_users import current_active_user
+from app.database.models import Team, RoleEnum
+from app.fastapi_users import current_principal
+from app.services.principal import Principal
 
 
-async def get_admin_user(current_user: User = Depends(current_active_user)):
+async def get_admin_user(current_user: Principal = Depends(current_principal)):
     """getting admin user"""
     if current_user.role != RoleEnum.admin:
         raise HTTPException(
@@ -16,7 +19,7 @@ async def get_admin_user(current_user: User = Depends(current_active_user)):
     return current_user
 
 
-async def get_manager_user(current_user: User = Depends(current_active_user)):
+async def get_manager_user(current_user: Principal = Depends(current_principal)):
     """getting manager user"""
     if current_user.role not in [RoleEnum.admin,
                                  RoleEnum.team_admin,
@@ -28,7 +31,7 @@ async def get_manager_user(current_user: User = Depends(current_active_user)):
     return current_user
 
 
-async def get_team_admin_user(current_user: User = Depends(current_active_user)):
+async def get_team_admin_user(current_user: Principal = Depends(current_principal)):
     """getting team admin user"""
     if current_user.role not in [RoleEnum.admin,
                                  RoleEnum.team_admin]:
@@ -41,7 +44,7 @@ async def get_team_admin_user(current_user: User = Depends(current_active_user))
 
 async def verify_team_member(
         team_id: int,
-        current_user: User = Depends(current_active_user),
+        current_user: Principal = Depends(current_principal),
         db: AsyncSession = Depends(get_async_session)
 ):
     """Verification of team member"""
@@ -63,7 +66,7 @@ async def verify_team_member(
     return current_user
 
 
-async def get_evaluation_access_user(current_user: User = Depends(current_active_user)):
+async def get_evaluation_access_user(current_user: Principal = Depends(current_principal)):
     """Получить пользователя с доступом к оценкам"""
     if current_user.role not in [RoleEnum.admin, RoleEnum.team_admin, RoleEnum.manager]:
         raise HTTPException(
@@ -71,3 +74,28 @@ async def get_evaluation_access_user(current_user: User = Depends(current_active
             detail="Not enough permissions to access evaluations"
         )
     return current_user
+
+
+def sparse_fields(schema: Type[BaseModel]) -> Callable[..., Optional[Tuple[str, ...]]]:
+    """Зависимость ?fields=a,b: поля схемы ответа в порядке схемы (None - все поля)"""
+    def dependency(fields: Optional[str] = Query(
+            None, description=f"Поля ответа через запятую: {', '.join(schema.model_fields)}")
+    ) -> Optional[Tuple[str, ...]]:
+        if fields is None:
+            return None
+        requested = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = requested - set(schema.model_fields)
+        if not requested or unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}" if unknown else "No fields requested"
+            )
+        return tuple(field for field in schema.model_fields if field in requested)
+    return dependency
+
+
+def with_columns(fields: Optional[Tuple[str, ...]], *columns: str) -> Optional[Tuple[str, ...]]:
+    """Поля проекции и колонки, нужные для проверки прав (None - сущность целиком)"""
+    if fields is None:
+        return None
+    return fields + tuple(column for column in columns if column not in fields)
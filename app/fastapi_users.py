@@ -1,20 +1,29 @@
 """users manipulation"""
 import os
-from typing import Optional
+from typing import Optional, Any, Dict
+from fastapi.security import OAuth2PasswordRequestForm
+import jwt
 from dotenv import load_dotenv
-from fastapi import Depends, Request
+from fastapi import Depends, HTTPException, Request, status
 from fastapi_users import (BaseUserManager,
                            FastAPIUsers,
-                           IntegerIDMixin)
+                           IntegerIDMixin,
+                           exceptions,
+                           schemas)
 from fastapi_users.authentication import (AuthenticationBackend,
                                           BearerTransport,
                                           JWTStrategy)
-from fastapi_users.db import SQLAlchemyUserDatabase
-from app.database.database import get_async_session
+from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
+from fastapi_users.jwt import decode_jwt
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.database import async_session_maker, get_async_session
 from app.database.models import User
+from app.database.repository import user_repo
 from fastapi_users.exceptions import UserAlreadyExists
 from app.database.models import RoleEnum
 from app.schemas import UserCreate
+from app.services.password_pool import is_usable_password, password_pool
+from app.services.principal import Principal, invalidate_principal_on_commit, principal_cache
 
 
 
@@ -29,11 +38,65 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
     reset_password_token_secret = SECRET
     verification_token_secret = SECRET
 
+    # Логин, регистрация и смена пароля как в BaseUserManager,
+    # но хеширование и проверка пароля выполняются в password_pool, а не в event loop
+    async def authenticate(self, credentials: OAuth2PasswordRequestForm) -> Optional[User]:
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            # хеширование и для неизвестного email: время ответа не выдает существование пользователя
+            await password_pool.hash(credentials.password)
+            return None
+
+        if not is_usable_password(user.hashed_password):
+            await password_pool.hash(credentials.password)
+            return None
+
+        verified, updated_password_hash = await password_pool.verify_and_update(credentials.password,
+                                                                                user.hashed_password)
+        if not verified:
+            return None
+        if updated_password_hash is not None:
+            await self.user_db.update(user, {"hashed_password": updated_password_hash})
+        return user
+
+    async def create(self,
+                     user_create: schemas.UC,
+                     safe: bool = False,
+                     request: Optional[Request] = None) -> User:
+        await self.validate_password(user_create.password, user_create)
+
+        existing_user = await self.user_db.get_by_email(user_create.email)
+        if existing_user is not None:
+            raise exceptions.UserAlreadyExists()
+
+        user_dict = user_create.create_update_dict() if safe else user_create.create_update_dict_superuser()
+        user_dict["hashed_password"] = await password_pool.hash(user_dict.pop("password"))
+
+        created_user = await self.user_db.create(user_dict)
+        await self.on_after_register(created_user, request)
+        return created_user
+
+    async def _update(self, user: User, update_dict: Dict[str, Any]) -> User:
+        password = update_dict.get("password")
+        if password is not None:
+            await self.validate_password(password, user)
+            update_dict = {field: value for field, value in update_dict.items() if field != "password"}
+            update_dict["hashed_password"] = await password_pool.hash(password)
+        # user_db.update коммитит сам: principal сбрасывается этим коммитом, а не до него
+        invalidate_principal_on_commit(self.user_db.session, user.id)
+        return await super()._update(user, update_dict)
+
     async def on_after_register(self,
                                 user: User,
                                 request: Optional[Request] = None):
         print(f"User {user.id} has registered.")
 
+    async def on_before_delete(self,
+                               user: User,
+                               request: Optional[Request] = None):
+        invalidate_principal_on_commit(self.user_db.session, user.id)
+
 
 async def create_admin_user():
     """Создание администратора через UserManager"""
@@ -41,7 +104,8 @@ async def create_admin_user():
         print("Admin credentials not provided in .env")
         return
     try:
-        async for user_db in get_user_db():
+        async with async_session_maker() as session:
+            user_db = SQLAlchemyUserDatabase(session, User)
             async for user_manager in get_user_manager(user_db):
                 try:
                     existing_user = await user_manager.get_by_email(ADMIN_EMAIL)
@@ -53,6 +117,7 @@ async def create_admin_user():
                                 "role": RoleEnum.admin,
                                 "is_verified": True
                             }
+                            invalidate_principal_on_commit(session, existing_user.id)
                             await user_manager.user_db.update(existing_user, update_dict)
                             print(f"Updated existing user {ADMIN_EMAIL} to admin")
                         return
@@ -83,10 +148,12 @@ async def create_admin_user():
         print(f"Error creating admin user: {e}")
 
 
-async def get_user_db():
-    """getting user from db"""
-    async for session in get_async_session():
-        yield SQLAlchemyUserDatabase(session, User)
+async def get_user_db(session: AsyncSession = Depends(get_async_session)):
+    """
+    getting user from db.
+    Сессия общая с роутерами: FastAPI кэширует get_async_session в пределах запроса
+    """
+    yield SQLAlchemyUserDatabase(session, User)
 
 
 async def get_user_manager(user_db: SQLAlchemyUserDatabase = Depends(get_user_db)):
@@ -114,3 +181,31 @@ fastapi_users = FastAPIUsers[User, int](
 )
 
 current_active_user = fastapi_users.current_user(active=True)
+
+
+async def current_principal(token: Optional[str] = Depends(bearer_transport.scheme),
+                            db: AsyncSession = Depends(get_async_session)) -> Principal:
+    """
+    Аналог current_active_user без загрузки сущности User:
+    id из JWT, поля для проверки прав из кэша или одного запроса по колонкам
+    """
+    if token is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+    strategy = get_jwt_strategy()
+    try:
+        data = decode_jwt(token, strategy.decode_key, strategy.token_audience, algorithms=[strategy.algorithm])
+        user_id = int(data["sub"])
+    except (jwt.PyJWTError, KeyError, ValueError):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        principal = await user_repo.get_principal(db, user_id)
+        if principal is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+        principal_cache.set(principal)
+
+    if not principal.is_active:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+    return principal
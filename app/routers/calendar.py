@@ -1,46 +1,99 @@
 """
 геттеры календаря
 """
-from fastapi import (APIRouter,Depends)
+from fastapi import (APIRouter,Depends,Header,HTTPException,Response)
+from fastapi.responses import StreamingResponse
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, date, timedelta
 from app.database.database import get_async_session
-from app.database.models import User
-from app.schemas import CalendarEventResponse,DayCalendarResponse
-from app.fastapi_users import current_active_user
-from app.services.calendar_service import get_events_utility, get_month_utility, get_day_utility
+from app.schemas import CalendarEventResponse,DayCalendarResponse,MonthCalendarResponse
+from app.fastapi_users import current_principal
+from app.database.repository import calendar_repo, user_repo
+from app.services.principal import Principal
+from app.services.calendar_feed import (new_feed_token, hash_feed_token, feed_window, feed_etag, feed_last_modified,
+                                        is_not_modified, iter_ics_feed)
+from app.services.calendar_service import (get_events_utility, get_month_utility, get_day_utility,
+                                           get_month_summary_utility, get_month_rows_utility, iter_month_text)
 
 
 router = APIRouter(prefix="/calendar", tags=["calendar"])
 
 
 @router.get("/events", response_model=CalendarEventResponse)
-async def get_calendar_events(start_date: date,end_date: date,db: AsyncSession = Depends(get_async_session),current_user: User = Depends(current_active_user)):
+async def get_calendar_events(start_date: date,end_date: date,db: AsyncSession = Depends(get_async_session),current_user: Principal = Depends(current_principal)):
     """Получить события календаря"""
     events = await get_events_utility(db, current_user, start_date, end_date)
     return CalendarEventResponse(events=events)
 
 
 @router.get("/month/{year}/{month}")
-async def get_month_calendar(year: int,month: int,db: AsyncSession = Depends(get_async_session),current_user: User = Depends(current_active_user)):
+async def get_month_calendar(year: int,month: int,db: AsyncSession = Depends(get_async_session),current_user: Principal = Depends(current_principal)):
     """Получить календарь на месяц"""
     return await get_month_utility(year, month, db, current_user)
 
 
+@router.get("/month/{year}/{month}/summary", response_model=MonthCalendarResponse, response_model_exclude_none=True)
+async def get_month_summary(year: int,month: int,include_events: bool = False,include_text: bool = False,db: AsyncSession = Depends(get_async_session),current_user: Principal = Depends(current_principal)):
+    """Получить структурированный календарь на месяц: события по дням"""
+    return await get_month_summary_utility(year, month, db, current_user, include_events, include_text)
+
+
+@router.get("/month/{year}/{month}/text", response_class=StreamingResponse)
+async def get_month_text(year: int,month: int,db: AsyncSession = Depends(get_async_session),current_user: Principal = Depends(current_principal)):
+    """Получить текстовый календарь на месяц потоком"""
+    rows_by_day = await get_month_rows_utility(year, month, db, current_user)
+    return StreamingResponse(iter_month_text(year, month, rows_by_day), media_type="text/plain; charset=utf-8")
+
+
 @router.get("/day/{year}/{month}/{day}", response_model=DayCalendarResponse)
-async def get_day_calendar(year: int,month: int,day: int,db: AsyncSession = Depends(get_async_session),current_user: User = Depends(current_active_user)):
+async def get_day_calendar(year: int,month: int,day: int,db: AsyncSession = Depends(get_async_session),current_user: Principal = Depends(current_principal)):
     """Получить события дня"""
-    result = await get_day_utility(year, month, day, db, current_user)
-    return DayCalendarResponse(**result)
+    return await get_day_utility(year, month, day, db, current_user)
 
 @router.get("/upcoming")
-async def get_upcoming_events(days: int = 7,db: AsyncSession = Depends(get_async_session),current_user: User = Depends(current_active_user)):
+async def get_upcoming_events(days: int = 7,db: AsyncSession = Depends(get_async_session),current_user: Principal = Depends(current_principal)):
     start_date = datetime.now()
     end_date = start_date + timedelta(days=days)
-    events = await get_events_utility(db, current_user, start_date.date(), end_date.date())
-    events.sort(key=lambda x: x.start)
+    events = await get_events_utility(db, current_user, start_date.date(), end_date.date(), limit=10)
 
     return {
         "period": f"Next {days} days",
-        "events": events[:10]
+        "events": events
     }
+
+
+@router.post("/feed-token")
+async def create_feed_token(db: AsyncSession = Depends(get_async_session),current_user: Principal = Depends(current_principal)):
+    """Выпустить токен подписки на календарь (предыдущий токен перестает работать)"""
+    token = new_feed_token()
+    await user_repo.set_calendar_feed_token_hash(db, current_user.id, hash_feed_token(token))
+    return {"token": token, "feed_url": router.url_path_for("get_calendar_feed", token=token)}
+
+
+@router.delete("/feed-token")
+async def revoke_feed_token(db: AsyncSession = Depends(get_async_session),current_user: Principal = Depends(current_principal)):
+    """Отозвать токен подписки на календарь"""
+    await user_repo.set_calendar_feed_token_hash(db, current_user.id, None)
+    return {"message": "Calendar feed token revoked"}
+
+
+@router.get("/feed/{token}.ics", response_class=StreamingResponse)
+async def get_calendar_feed(token: str,if_none_match: Optional[str] = Header(None),db: AsyncSession = Depends(get_async_session)):
+    """Подписка на календарь (.ics): без изменений - 304 после одного запроса водяного знака"""
+    start_date, end_date = feed_window()
+    watermark = await calendar_repo.get_feed_watermark(db, hash_feed_token(token), start_date, end_date)
+    if watermark.user_id is None:
+        raise HTTPException(status_code=404, detail="Calendar feed not found")
+
+    etag = feed_etag(watermark.user_id, watermark.event_count, watermark.last_modified, start_date)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    last_modified = feed_last_modified(watermark.last_modified)
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+
+    if is_not_modified(etag, if_none_match):
+        return Response(status_code=304, headers=headers)
+
+    rows = await calendar_repo.get_user_events(db, watermark.user_id, start_date, end_date)
+    return StreamingResponse(iter_ics_feed(rows), media_type="text/calendar; charset=utf-8", headers=headers)
@@ -0,0 +1,54 @@
+"""
+диагностика сервиса
+"""
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.database import get_async_session
+from app.database.models import RoleEnum
+from app.database.pool import pool_status
+from app.fastapi_users import current_principal
+from app.services.database_error_handler import db_error_handler
+from app.services.password_pool import password_pool
+from app.services.principal import Principal
+
+
+router = APIRouter(prefix="/diagnostics", tags=["diagnostics"])
+
+
+@router.get("/pool")
+async def get_pool_status(
+        db: AsyncSession = Depends(get_async_session),
+        current_user: Principal = Depends(current_principal)
+):
+    """Состояние пула соединений: занятые, overflow, гистограмма ожидания"""
+    if current_user.role != RoleEnum.admin:
+        raise HTTPException(
+            status_code=403,
+            detail="Not enough permissions"
+        )
+
+    return pool_status(db.bind.sync_engine.pool)
+
+
+@router.get("/retries")
+async def get_retry_stats(current_user: Principal = Depends(current_principal)):
+    """Счетчики повторов операций после временных ошибок базы"""
+    if current_user.role != RoleEnum.admin:
+        raise HTTPException(
+            status_code=403,
+            detail="Not enough permissions"
+        )
+
+    return db_error_handler.stats.snapshot()
+
+
+@router.get("/passwords")
+async def get_password_pool_stats(current_user: Principal = Depends(current_principal)):
+    """Пул хеширования паролей: занятые потоки, глубина очереди, ожидание слота"""
+    if current_user.role != RoleEnum.admin:
+        raise HTTPException(
+            status_code=403,
+            detail="Not enough permissions"
+        )
+
+    return password_pool.snapshot()
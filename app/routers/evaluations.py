@@ -1,104 +1,164 @@
 """маршруты для оценок"""
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import Optional, Tuple
+from sqlalchemy import Row
 from app.database.database import get_async_session
-from app.database.models import Evaluation, User, RoleEnum
-from app.database.repository import evaluation_repo, task_repo
-from app.dependencies import get_evaluation_access_user
-from app.fastapi_users import current_active_user
-from app.schemas import EvaluationCreate, EvaluationRead
+from app.database.models import RoleEnum, TaskStatusEnum
+from app.database.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.database.repository import evaluation_repo, task_repo, rating_repo
+from app.dependencies import get_evaluation_access_user, sparse_fields
+from app.fastapi_users import current_principal
+from app.services.fast_json import item_response, page_response
+from app.services.principal import Principal
+from app.schemas import (EvaluationCreate, EvaluationRead, Page, EvaluationBatchCreate, EvaluationBatchReport,
+                         EvaluationBatchResult)
 
 
 router = APIRouter(prefix="/evaluations", tags=["evaluations"])
 
 
+def _evaluation_error(target: Optional[Row],
+                      evaluation: EvaluationCreate,
+                      current_user: Principal) -> Optional[Tuple[int, str]]:
+    """Код и причина отказа по строке get_evaluation_targets (None - оценку можно ставить)"""
+    if target is None:
+        return 404, "Task not found"
+    if target.status != TaskStatusEnum.completed:
+        return 400, "Can only evaluate completed tasks"
+    if target.task_checker != current_user.id and current_user.role != RoleEnum.admin:
+        return 403, "Not task checker"
+    if not 1 <= evaluation.evaluation_value <= 5:
+        return 400, "Evaluation value must be between 1 and 5"
+    return None
+
+
+def _evaluation_data(evaluation: EvaluationCreate, current_user: Principal) -> dict:
+    """Поля оценки"""
+    return {
+        "evaluation_value": evaluation.evaluation_value,
+        "evaluation_name": evaluation.evaluation_name,
+        "evaluation_comment": evaluation.evaluation_comment,
+        "task_id": evaluation.task_id,
+        "evaluator_id": current_user.id
+    }
+
+
 @router.post("/", response_model=EvaluationRead)
 async def create_evaluation(
         evaluation: EvaluationCreate,
-        current_user: User = Depends(get_evaluation_access_user),
+        current_user: Principal = Depends(get_evaluation_access_user),
         db: AsyncSession = Depends(get_async_session)
 ):
-    """создание оценки"""
-    # получение задачи через репозиторий
-    task = await task_repo.get_task_by_id(db, evaluation.task_id)
-    # TODO вынести в отдельный handler
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    # бизнес-логика
-    if task.status != "completed":
-        raise HTTPException(status_code=400, detail="Can only evaluate completed tasks")
-
-    if task.task_checker != current_user.id and current_user.role != RoleEnum.admin:
-        raise HTTPException(status_code=403, detail="Not task checker")
+    """создание оценки (задача, права и прежняя оценка - одним запросом)"""
+    targets = await evaluation_repo.get_evaluation_targets(db, [evaluation.task_id], current_user.id)
+    target = targets.get(evaluation.task_id)
+    error = _evaluation_error(target, evaluation, current_user)
+    if error:
+        raise HTTPException(status_code=error[0], detail=error[1])
+
+    if target.evaluation_value is not None:
+        raise HTTPException(status_code=400, detail="Task already evaluated by this user")
 
-    # проверка дублей через репозиторий
-    if await evaluation_repo.check_duplicate_evaluations(db, evaluation.task_id, current_user.id):
+    # ON CONFLICT DO NOTHING: параллельная оценка того же пользователя не создаст дубль
+    evaluations = await evaluation_repo.upsert_evaluations(db, [_evaluation_data(evaluation, current_user)], targets)
+    if evaluations is None:
+        raise HTTPException(status_code=500, detail="Failed to create evaluation")
+    if not evaluations:
         raise HTTPException(status_code=400, detail="Task already evaluated by this user")
 
-    # создание оценки через репозиторий
-    evaluation_data = {
-        "evaluation_value": evaluation.evaluation_value,
-        "evaluation_name": evaluation.evaluation_name,
-        "evaluation_comment": evaluation.evaluation_comment,
-        "task_id": evaluation.task_id,
-        "evaluator_id": current_user.id
-    }
+    return EvaluationRead.model_validate(evaluations[0])
 
-    db_evaluation = await evaluation_repo.create_evaluation(db, evaluation_data)
-    if not db_evaluation:
-        raise HTTPException(status_code=500, detail="Failed to create evaluation")
 
-    return EvaluationRead.model_validate(db_evaluation)
+@router.post("/batch", response_model=EvaluationBatchReport)
+async def create_evaluations(
+        data: EvaluationBatchCreate,
+        current_user: Principal = Depends(get_evaluation_access_user),
+        db: AsyncSession = Depends(get_async_session)
+):
+    """
+    оценка пачки задач: проверки одним запросом, запись одним INSERT ... ON CONFLICT
+    (on_conflict=skip - существующие оценки не меняются, update - перезаписываются)
+    """
+    targets = await evaluation_repo.get_evaluation_targets(
+        db, [evaluation.task_id for evaluation in data.evaluations], current_user.id)
+
+    results = [EvaluationBatchResult(task_id=evaluation.task_id, result="error") for evaluation in data.evaluations]
+    accepted = {}
+    for result, evaluation in zip(results, data.evaluations):
+        error = _evaluation_error(targets.get(evaluation.task_id), evaluation, current_user)
+        if error:
+            result.error = error[1]
+        elif evaluation.task_id in accepted:
+            result.error = "Duplicate task in batch"
+        else:
+            accepted[evaluation.task_id] = (result, evaluation)
+
+    evaluations = await evaluation_repo.upsert_evaluations(
+        db, [_evaluation_data(evaluation, current_user) for _, evaluation in accepted.values()],
+        targets, update_existing=data.on_conflict == "update")
+    if evaluations is None:
+        raise HTTPException(status_code=500, detail="Failed to save evaluations")
+
+    written = {evaluation.task_id: evaluation for evaluation in evaluations}
+    for task_id, (result, _) in accepted.items():
+        if task_id in written:
+            result.result = "created" if targets[task_id].evaluation_value is None else "updated"
+            result.evaluation = EvaluationRead.model_validate(written[task_id])
+        else:
+            result.result = "skipped"
+
+    counts = {name: sum(result.result == name for result in results) for name in ("created", "updated", "skipped")}
+    return EvaluationBatchReport(**counts, failed=len(results) - sum(counts.values()), results=results)
 
 
-@router.get("/", response_model=List[EvaluationRead])
+@router.get("/", response_model=Page[EvaluationRead])
 async def get_evaluations(
-        skip: int = 0,
-        limit: int = 100,
+        cursor: Optional[str] = None,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
         task_id: Optional[int] = None,
         user_id: Optional[int] = None,
-        current_user: User = Depends(current_active_user),
+        fields: Optional[Tuple[str, ...]] = Depends(sparse_fields(EvaluationRead)),
+        current_user: Principal = Depends(current_principal),
         db: AsyncSession = Depends(get_async_session)
 ):
-    # получение оценки через репозиторий
-    evaluations = await evaluation_repo.get_evaluations_by_filters(db, skip, limit, task_id, user_id)
-
-    # проверка прав доступа
+    # проверка прав доступа: обычный пользователь видит оценки своих задач
     if current_user.role in [RoleEnum.admin, RoleEnum.team_admin, RoleEnum.manager]:
-        user_evaluations = evaluations
+        participant_id = None
     else:
-        user_evaluations = [
-            evaluation for evaluation in evaluations
-            if (evaluation.task.task_executor == current_user.id or
-                evaluation.task.task_checker == current_user.id)
-        ]
+        participant_id = current_user.id
 
-    if not user_evaluations:
+    # получение оценки через репозиторий
+    page = await evaluation_repo.get_evaluations_by_filters(db, cursor, limit, task_id, user_id, participant_id,
+                                                            fields=fields)
+
+    if not page.items and not cursor:
         if current_user.role in [RoleEnum.admin, RoleEnum.team_admin, RoleEnum.manager]:
             raise HTTPException(status_code=404, detail="У вас нет задач для оценивания")
         else:
             raise HTTPException(status_code=404, detail="У вас нет оценок")
 
-    return [EvaluationRead.model_validate(ev) for ev in user_evaluations]
+    return page_response(EvaluationRead, page.items, page.next_cursor, fields)
 
 
-@router.get("/my-evaluations", response_model=List[EvaluationRead])
+@router.get("/my-evaluations", response_model=Page[EvaluationRead])
 async def get_my_evaluations(
-        current_user: User = Depends(current_active_user),
+        cursor: Optional[str] = None,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        fields: Optional[Tuple[str, ...]] = Depends(sparse_fields(EvaluationRead)),
+        current_user: Principal = Depends(current_principal),
         db: AsyncSession = Depends(get_async_session)
 ):
     """Получить оценки текущего пользователя"""
-    evaluations = await evaluation_repo.get_user_evaluations(db, current_user.id)
-    return [EvaluationRead.model_validate(ev) for ev in evaluations]
+    page = await evaluation_repo.get_user_evaluations(db, current_user.id, cursor, limit, fields=fields)
+    return page_response(EvaluationRead, page.items, page.next_cursor, fields)
 
 
 @router.get("/user/{user_id}/average")
 async def get_user_average_rating(
     user_id: int,
     period_days: Optional[int] = 30,
-    current_user: User = Depends(current_active_user),
+    current_user: Principal = Depends(current_principal),
     db: AsyncSession = Depends(get_async_session)
 ):
     """Получить средний рейтинг пользователя за период"""
@@ -112,13 +172,33 @@ async def get_user_average_rating(
     return result
 
 
+@router.get("/task/{task_id}/average")
+async def get_task_average_rating(
+    task_id: int,
+    current_user: Principal = Depends(current_principal),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """Получить среднюю оценку задачи"""
+    task = await task_repo.get_task_by_id(db, task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    if (current_user.role not in [RoleEnum.admin, RoleEnum.team_admin, RoleEnum.manager] and
+            task.task_executor != current_user.id and task.task_checker != current_user.id):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    return {"task_id": task_id, "average_rating": await rating_repo.get_task_average_rating(db, task_id)}
+
+
 @router.get("/{evaluation_id}", response_model=EvaluationRead)
 async def get_evaluation(
         evaluation_id: int,
-        current_user: User = Depends(current_active_user),
+        fields: Optional[Tuple[str, ...]] = Depends(sparse_fields(EvaluationRead)),
+        current_user: Principal = Depends(current_principal),
+        db: AsyncSession = Depends(get_async_session)
 ):
-    """получение оценки"""
-    evaluation = await evaluation_repo.get_evaluation_by_id(Evaluation, evaluation_id)
+    """получение оценки (fields - только эти колонки)"""
+    evaluation = await evaluation_repo.get_evaluation_by_id(db, evaluation_id, fields=fields)
 
     # TODO вынести в отдельный handler
     if not evaluation:
@@ -127,7 +207,8 @@ async def get_evaluation(
             detail="Evaluation not found"
         )
 
-    task = evaluation.task
+    # строка проекции несет исполнителя и проверяющего задачи рядом с полями оценки
+    task = evaluation.task if fields is None else evaluation
     if (current_user.role not in [RoleEnum.admin, RoleEnum.team_admin, RoleEnum.manager] and
             task.task_executor != current_user.id and task.task_checker != current_user.id):
         raise HTTPException(
@@ -135,7 +216,7 @@ async def get_evaluation(
             detail="Not enough permissions"
         )
 
-    return EvaluationRead.model_validate(evaluation)
+    return item_response(EvaluationRead, evaluation, fields)
 
 @router.put("/{evaluation_id}", response_model=EvaluationRead)
 async def update_evaluation(
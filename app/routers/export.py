@@ -0,0 +1,93 @@
+"""
+выгрузка задач, оценок и встреч потоком (NDJSON или CSV)
+"""
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Type
+from pydantic import BaseModel
+from app.database.database import get_async_session
+from app.database.models import RoleEnum, TaskStatusEnum
+from app.database.repository import evaluation_repo, meeting_repo, task_repo
+from app.fastapi_users import current_principal
+from app.services.export import MEDIA_TYPES, ExportFormat, stream_export
+from app.services.principal import Principal
+from app.schemas import EvaluationRead, MeetingRead, TaskRead
+
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+TEAM_ROLES = [RoleEnum.team_admin, RoleEnum.manager]
+
+
+def _team_scope(current_user: Principal) -> Optional[int]:
+    """Команда, которой ограничена выгрузка менеджера или админа команды (None - без ограничения)"""
+    if current_user.role not in TEAM_ROLES:
+        return None
+    if not current_user.member_of_team:
+        raise HTTPException(status_code=403, detail="Not a member of any team")
+    return current_user.member_of_team
+
+
+def _export_response(db: AsyncSession, name: str, query: Select, schema: Type[BaseModel],
+                     export_format: ExportFormat) -> StreamingResponse:
+    """Ответ, читающий query серверным курсором по мере отправки"""
+    return StreamingResponse(
+        stream_export(db.bind, query, schema, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{export_format}"'},
+    )
+
+
+@router.get("/tasks", response_class=StreamingResponse)
+async def export_tasks(
+        status: Optional[TaskStatusEnum] = None,
+        team_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        export_format: ExportFormat = Query("ndjson", alias="format"),
+        current_user: Principal = Depends(current_principal),
+        db: AsyncSession = Depends(get_async_session)
+):
+    """выгрузка задач: администратор - все, менеджер и админ команды - своей команды, остальные - свои"""
+    participant_id = None
+    if current_user.role in TEAM_ROLES:
+        team_id = _team_scope(current_user)
+    elif current_user.role != RoleEnum.admin:
+        participant_id = current_user.id
+
+    query = task_repo.export_query(status, team_id, user_id, participant_id)
+    return _export_response(db, "tasks", query, TaskRead, export_format)
+
+
+@router.get("/evaluations", response_class=StreamingResponse)
+async def export_evaluations(
+        task_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        export_format: ExportFormat = Query("ndjson", alias="format"),
+        current_user: Principal = Depends(current_principal),
+        db: AsyncSession = Depends(get_async_session)
+):
+    """выгрузка оценок: администратор - все, менеджер и админ команды - по задачам своей команды,
+    остальные - оценки своих задач"""
+    team_id = _team_scope(current_user)
+    participant_id = None if current_user.role == RoleEnum.admin or team_id else current_user.id
+
+    query = evaluation_repo.export_query(task_id, user_id, participant_id, team_id)
+    return _export_response(db, "evaluations", query, EvaluationRead, export_format)
+
+
+@router.get("/meetings", response_class=StreamingResponse)
+async def export_meetings(
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        export_format: ExportFormat = Query("ndjson", alias="format"),
+        current_user: Principal = Depends(current_principal),
+        db: AsyncSession = Depends(get_async_session)
+):
+    """выгрузка встреч: администратор - все, остальные - где участвуют"""
+    user_id = None if current_user.role == RoleEnum.admin else current_user.id
+
+    query = meeting_repo.export_query(start_date, end_date, user_id)
+    return _export_response(db, "meetings", query, MeetingRead, export_format)
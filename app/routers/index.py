@@ -1,20 +1,34 @@
+import asyncio
 from fastapi import APIRouter, Request, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database.database import get_async_session
-from app.database.repository import user_repo, task_repo, meeting_repo, team_repo
+from app.database.repository import index_repo
+from app.services.fragment_cache import index_cache
 from fastapi.templating import Jinja2Templates
+from markupsafe import Markup
 from datetime import datetime, date
 from calendar import monthrange, month_name
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple
 
 templates = Jinja2Templates(directory="app/templates")
 
 index_router = APIRouter()
 
+INDEX_LIST_SIZE = 10
 
-def generate_calendar_weeks(year: int, month: int, meeting_dates: set, meeting_counts: dict, current_day: int) -> List[
-    List[Dict[str, Any]]]:
-    """Генерирует данные для отображения календаря"""
+# секция -> (запрос, шаблон фрагмента)
+INDEX_LIST_SECTIONS = {
+    "users": (index_repo.get_users_overview, "index/users.html"),
+    "teams": (index_repo.get_teams_overview, "index/teams.html"),
+    "tasks": (index_repo.get_tasks_overview, "index/tasks.html"),
+    "meetings": (index_repo.get_meetings_overview, "index/meetings.html"),
+}
+
+
+@lru_cache(maxsize=32)
+def month_grid(year: int, month: int) -> Tuple[Tuple[Tuple[int, int], ...], ...]:
+    """Сетка месяца по неделям: пары (день, месяц) с днями соседних месяцев по краям"""
     first_day = date(year, month, 1)
     days_in_month = monthrange(year, month)[1]
     first_weekday = first_day.weekday()
@@ -25,90 +39,109 @@ def generate_calendar_weeks(year: int, month: int, meeting_dates: set, meeting_c
     prev_month_days = monthrange(prev_year, prev_month)[1]
 
     for i in range(first_weekday):
-        day_number = prev_month_days - first_weekday + i + 1
-        week.append({
-            'day': day_number,
-            'month': prev_month,
-            'has_meeting': False,
-            'is_today': False
-        })
+        week.append((prev_month_days - first_weekday + i + 1, prev_month))
     for day in range(1, days_in_month + 1):
-        current_date = date(year, month, day)
-        has_meeting = current_date in meeting_dates
-        meeting_count = meeting_counts.get(current_date, 0)
-        week.append({
-            'day': day,
-            'month': month,
-            'has_meeting': has_meeting,
-            'meeting_count': meeting_count,
-            'is_today': (day == current_day)
-        })
+        week.append((day, month))
 
         if len(week) == 7:
-            weeks.append(week)
+            weeks.append(tuple(week))
             week = []
 
     next_month = month + 1 if month < 12 else 1
     next_day = 1
 
     while len(week) < 7:
-        week.append({
-            'day': next_day,
-            'month': next_month,
-            'has_meeting': False,
-            'is_today': False
-        })
+        week.append((next_day, next_month))
         next_day += 1
 
     if week:
+        weeks.append(tuple(week))
+
+    return tuple(weeks)
+
+
+def generate_calendar_weeks(year: int, month: int, meeting_dates: set, meeting_counts: dict, current_day: int) -> List[
+    List[Dict[str, Any]]]:
+    """Генерирует данные для отображения календаря"""
+    weeks = []
+    for grid_week in month_grid(year, month):
+        week = []
+        for day, day_month in grid_week:
+            if day_month != month:
+                week.append({
+                    'day': day,
+                    'month': day_month,
+                    'has_meeting': False,
+                    'is_today': False
+                })
+                continue
+
+            current_date = date(year, month, day)
+            week.append({
+                'day': day,
+                'month': month,
+                'has_meeting': current_date in meeting_dates,
+                'meeting_count': meeting_counts.get(current_date, 0),
+                'is_today': (day == current_day)
+            })
         weeks.append(week)
 
     return weeks
 
 
+async def _in_session(bind, query, *args):
+    """Запрос секции в отдельной сессии, чтобы секции читались параллельно"""
+    async with AsyncSession(bind, expire_on_commit=False) as session:
+        return await query(session, *args)
+
+
+def _render_fragment(template_name: str, **context) -> Markup:
+    """Отрендерить фрагмент главной страницы"""
+    return Markup(templates.get_template(template_name).render(**context))
+
+
 @index_router.get("/")
 async def root_page(
         request: Request,
         db: AsyncSession = Depends(get_async_session),
 ):
-    # информация из базы
-    users = await user_repo.get_users(db, skip=0, limit=10)
-    teams = await team_repo.get_teams(db, skip=0, limit=10)
-    tasks = await task_repo.get_tasks_by_filters(db, skip=0, limit=10)
-    meetings = await meeting_repo.get_meetings_by_filters(db, skip=0, limit=10)
-
     # текущие значения
     today = datetime.now()
     current_year = today.year
     current_month = today.month
     current_day = today.day
+    calendar_key = (current_year, current_month, current_day)
+
+    # готовые фрагменты из кэша, недостающие секции читаются параллельно
+    sections = {name: index_cache.get(name) for name in INDEX_LIST_SECTIONS}
+    sections["calendar"] = index_cache.get("calendar", calendar_key)
+    missing = [name for name, fragment in sections.items() if fragment is None]
 
-    # порядок отображения
     first_day = date(current_year, current_month, 1)
-    _, last_day = monthrange(current_year, current_month)
-    last_date = date(current_year, current_month, last_day)
-
-    # отображение количества встреч
-    meeting_dates = set()
-    meeting_counts = {}
-    for meeting in meetings:
-        if meeting.meeting_date:
-            meeting_date = meeting.meeting_date.date()
-            if first_day <= meeting_date <= last_date:
-                meeting_dates.add(meeting_date)
-                meeting_counts[meeting_date] = meeting_counts.get(meeting_date, 0) + 1
-
-    calendar_weeks = generate_calendar_weeks(
-        current_year, current_month, meeting_dates, meeting_counts, current_day
-    )
+    last_date = date(current_year, current_month, monthrange(current_year, current_month)[1])
+    queries = [
+        _in_session(db.bind, index_repo.get_meeting_counts_by_day, first_day, last_date) if name == "calendar"
+        else _in_session(db.bind, INDEX_LIST_SECTIONS[name][0], INDEX_LIST_SIZE)
+        for name in missing
+    ]
+
+    for name, result in zip(missing, await asyncio.gather(*queries)):
+        if name == "calendar":
+            # отображение количества встреч
+            calendar_weeks = generate_calendar_weeks(
+                current_year, current_month, set(result), result, current_day
+            )
+            fragment = _render_fragment("index/calendar.html", calendar_weeks=calendar_weeks,
+                                        current_month=current_month)
+            index_cache.set(name, fragment, calendar_key)
+        else:
+            fragment = _render_fragment(INDEX_LIST_SECTIONS[name][1], **{name: result})
+            index_cache.set(name, fragment)
+        sections[name] = fragment
 
     context = {
         "request": request,
-        "users": users,
-        "tasks": tasks,
-        "teams": teams,
-        "meetings": meetings,
-        "calendar_weeks": calendar_weeks,
+        "sections": sections,
         "current_year": current_year,
         "current_month": current_month,
         "current_month_name": month_name[current_month],
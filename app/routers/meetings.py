@@ -1,22 +1,38 @@
 """роутеры для встреч"""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
+from app.database import loading
 from app.database.database import get_async_session
-from app.database.models import User, RoleEnum
-from app.fastapi_users import current_active_user
-from app.schemas import MeetingCreate, MeetingRead
-from app.database.repository import meeting_repo, user_repo
+from app.database.models import RoleEnum
+from app.dependencies import sparse_fields
+from app.fastapi_users import current_principal
+from app.services.fast_json import item_response, page_response
+from app.services.principal import Principal
+from app.schemas import MeetingCreate, MeetingRead, Page
+from app.database.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.database.repository import meeting_repo, user_repo, MeetingConflict
 
 
 router = APIRouter(prefix="/meetings", tags=["meetings"])
 
 
+def format_conflicts(conflicts: List[MeetingConflict]) -> str:
+    """Сообщение о конфликтах: по одному участнику на пересекающуюся встречу"""
+    conflict_info = {}
+    for conflict in conflicts:
+        conflict_info.setdefault(
+            conflict.meeting_id,
+            f"User {conflict.username} has conflict meeting: {conflict.meeting_name}"
+        )
+    return "; ".join(conflict_info.values())
+
+
 @router.post("/", response_model=MeetingRead)
 async def create_meeting(
         meeting: MeetingCreate,
-        current_user: User = Depends(current_active_user),
+        current_user: Principal = Depends(current_principal),
         db: AsyncSession = Depends(get_async_session)
 ):
     """создание встречи"""
@@ -26,18 +42,15 @@ async def create_meeting(
             detail="Not enough permissions"
         )
 
-    # проверка участников
-    participants = []
+    # проверка участников (организатор загружается тем же запросом)
+    users = await user_repo.get_users_by_ids(db, [*meeting.participant_ids, current_user.id])
     for user_id in meeting.participant_ids:
-        user = await user_repo.get_user_by_id(db, user_id)
-
-        if not user:
+        if user_id not in users:
             raise HTTPException(
                 status_code=404,
                 detail=f"User {user_id} not found"
             )
-
-        participants.append(user)
+    participants = [users[user_id] for user_id in dict.fromkeys(meeting.participant_ids)]
 
     # проверка конфликтующих встреч
     conflict_meetings = await meeting_repo.check_meeting_conflicts(
@@ -48,24 +61,15 @@ async def create_meeting(
     )
 
     if conflict_meetings:
-        conflict_info = []
-
-        for conflict in conflict_meetings:
-            for user in conflict.participants:
-                if user.id in meeting.participant_ids:
-                    conflict_info.append(f"User {user.username} has conflict meeting: {conflict.meeting_name}")
-                    break
         raise HTTPException(
             status_code=400,
-            detail="; ".join(conflict_info)
+            detail=format_conflicts(conflict_meetings)
         )
 
     # добавление организатора в список участников
     creator_in_list = any(user.id == current_user.id for user in participants)
-    if not creator_in_list:
-        creator = await user_repo.get_user_by_id(db, current_user.id)
-        if creator:
-            participants.append(creator)
+    if not creator_in_list and current_user.id in users:
+        participants.append(users[current_user.id])
 
     # создание встречи
     meeting_data = {
@@ -80,66 +84,76 @@ async def create_meeting(
     db_meeting = await meeting_repo.create_meeting(db, meeting_data)
     return MeetingRead.model_validate(db_meeting)
 
-@router.get("/", response_model=List[MeetingRead])
+@router.get("/", response_model=Page[MeetingRead])
 async def get_meetings(
-        skip: int = 0,
-        limit: int = 100,
+        cursor: Optional[str] = None,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
-        current_user: User = Depends(current_active_user),
+        fields: Optional[Tuple[str, ...]] = Depends(sparse_fields(MeetingRead)),
+        current_user: Principal = Depends(current_principal),
         db: AsyncSession = Depends(get_async_session)
 ):
-    """получение информации о встрече"""
+    """получение информации о встрече (fields - только эти колонки)"""
     if current_user.role in [RoleEnum.admin]:
-        meetings = await meeting_repo.get_meetings_by_filters(db, skip, limit, start_date, end_date)
+        page = await meeting_repo.get_meetings_by_filters(db, cursor, limit, start_date, end_date, fields=fields)
     else:
-        meetings = await meeting_repo.get_meetings_by_filters(db, skip, limit, start_date, end_date, current_user.id)
+        page = await meeting_repo.get_meetings_by_filters(db, cursor, limit, start_date, end_date, current_user.id,
+                                                          fields=fields)
 
-    return [MeetingRead.model_validate(meeting) for meeting in meetings]
+    return page_response(MeetingRead, page.items, page.next_cursor, fields)
 
 
-@router.get("/my-meetings", response_model=List[MeetingRead])
+@router.get("/my-meetings", response_model=Page[MeetingRead])
 async def get_my_meetings(
-        current_user: User = Depends(current_active_user),
+        cursor: Optional[str] = None,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        fields: Optional[Tuple[str, ...]] = Depends(sparse_fields(MeetingRead)),
+        current_user: Principal = Depends(current_principal),
         db: AsyncSession = Depends(get_async_session)
 ):
     """Получить встречи текущего пользователя"""
-    meetings = await meeting_repo.get_user_meetings(db, current_user.id)
-    return [MeetingRead.model_validate(meeting) for meeting in meetings]
+    page = await meeting_repo.get_user_meetings(db, current_user.id, cursor, limit, fields=fields)
+    return page_response(MeetingRead, page.items, page.next_cursor, fields)
 
 
 @router.get("/{meeting_id}", response_model=MeetingRead)
 async def get_meeting(
         meeting_id: int,
-        current_user: User = Depends(current_active_user),
+        fields: Optional[Tuple[str, ...]] = Depends(sparse_fields(MeetingRead)),
+        current_user: Principal = Depends(current_principal),
         db: AsyncSession = Depends(get_async_session)
 ):
-    """получение встречи по id"""
-    meeting = await meeting_repo.get_meeting_by_id(db, meeting_id)
+    """получение встречи по id (fields - только эти колонки, участие проверяется отдельным запросом)"""
+    meeting = await meeting_repo.get_meeting_by_id(db, meeting_id, fields=fields)
     if not meeting:
         raise HTTPException(
             status_code=404,
             detail="Meeting not found"
         )
 
-    if (current_user.role not in [RoleEnum.admin, RoleEnum.team_admin, RoleEnum.manager] and
-            current_user not in meeting.participants):
-        raise HTTPException(
-            status_code=403,
-            detail="Not enough permissions"
-        )
-    return MeetingRead.model_validate(meeting)
+    if current_user.role not in [RoleEnum.admin, RoleEnum.team_admin, RoleEnum.manager]:
+        if fields is None:
+            participant = any(user.id == current_user.id for user in meeting.participants)
+        else:
+            participant = await meeting_repo.is_participant(db, meeting_id, current_user.id)
+        if not participant:
+            raise HTTPException(
+                status_code=403,
+                detail="Not enough permissions"
+            )
+    return item_response(MeetingRead, meeting, fields)
 
 
 @router.put("/{meeting_id}", response_model=MeetingRead)
 async def update_meeting(
         meeting_id: int,
         meeting_update: MeetingCreate,
-        current_user: User = Depends(current_active_user),
+        current_user: Principal = Depends(current_principal),
         db: AsyncSession = Depends(get_async_session)
 ):
     """ обновление встречи """
-    meeting = await meeting_repo.get_meeting_by_id(db, meeting_id)
+    meeting = await meeting_repo.get_meeting_by_id(db, meeting_id, options=loading.NONE)
     if not meeting:
         raise HTTPException(
             status_code=404,
@@ -153,15 +167,14 @@ async def update_meeting(
         )
 
     # проверка участников
-    participants = []
+    users = await user_repo.get_users_by_ids(db, meeting_update.participant_ids)
     for user_id in meeting_update.participant_ids:
-        user = await user_repo.get_user_by_id(db, user_id)
-        if not user:
+        if user_id not in users:
             raise HTTPException(
                 status_code=404,
                 detail=f"User {user_id} not found"
             )
-        participants.append(user)
+    participants = [users[user_id] for user_id in dict.fromkeys(meeting_update.participant_ids)]
 
     # проверка конфликтов
     conflict_meetings = await meeting_repo.check_meeting_conflicts(
@@ -173,15 +186,9 @@ async def update_meeting(
     )
 
     if conflict_meetings:
-        conflict_info = []
-        for conflict in conflict_meetings:
-            for user in conflict.participants:
-                if user.id in meeting_update.participant_ids:
-                    conflict_info.append(f"User {user.username} has conflict meeting: {conflict.meeting_name}")
-                    break
         raise HTTPException(
             status_code=400,
-            detail="; ".join(conflict_info)
+            detail=format_conflicts(conflict_meetings)
         )
 
     # обновление встречи
@@ -200,11 +207,11 @@ async def update_meeting(
 @router.delete("/{meeting_id}")
 async def delete_meeting(
         meeting_id: int,
-        current_user: User = Depends(current_active_user),
+        current_user: Principal = Depends(current_principal),
         db: AsyncSession = Depends(get_async_session)
 ):
     """удаление встречи"""
-    meeting = await meeting_repo.get_meeting_by_id(db, meeting_id)
+    meeting = await meeting_repo.get_meeting_by_id(db, meeting_id, options=loading.NONE)
     if not meeting:
         raise HTTPException(
             status_code=404,
@@ -224,11 +231,11 @@ async def delete_meeting(
 @router.post("/{meeting_id}/cancel")
 async def cancel_meeting(
         meeting_id: int,
-        current_user: User = Depends(current_active_user),
+        current_user: Principal = Depends(current_principal),
         db: AsyncSession = Depends(get_async_session)
 ):
     """отмена встерчи"""
-    meeting = await meeting_repo.get_meeting_by_id(db, meeting_id)
+    meeting = await meeting_repo.get_meeting_by_id(db, meeting_id, options=loading.NONE)
     if not meeting:
         raise HTTPException(
             status_code=404,
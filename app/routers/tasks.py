@@ -1,23 +1,55 @@
 """
 
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import Optional, Tuple
 from app.database.database import get_async_session
-from app.database.models import User, RoleEnum, TaskStatusEnum
+from app.database.models import RoleEnum, TaskStatusEnum
+from app.database.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from app.database.repository import user_repo, task_repo, comment_repo
-from app.fastapi_users import current_active_user
-from app.schemas import TaskCreate, TaskRead, CommentCreate, CommentRead
+from app.dependencies import sparse_fields, with_columns
+from app.fastapi_users import current_principal
+from app.services.fast_json import item_response, page_response
+from app.services.principal import Principal
+from app.schemas import (TaskCreate, TaskRead, CommentCreate, CommentRead, Page, TaskBulkCreate, TaskBulkReport,
+                         TaskBulkResult, TaskStatusBulkUpdate, TaskStatusBulkResult)
 
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 
+def _executor_id(task: TaskCreate) -> Optional[int]:
+    """id исполнителя (0 и отрицательные - без исполнителя)"""
+    return task.task_executor if task.task_executor and task.task_executor > 0 else None
+
+
+def _executor_error(current_user: Principal, executor_team: Optional[int]) -> Optional[str]:
+    """Исполнитель из чужой команды (администратору можно)"""
+    if (current_user.member_of_team and
+            executor_team != current_user.member_of_team and
+            current_user.role != RoleEnum.admin):
+        return "Executor is not in your team"
+    return None
+
+
+def _task_data(task: TaskCreate, current_user: Principal) -> dict:
+    """Поля новой задачи"""
+    return {
+        "task_name": task.task_name,
+        "task_description": task.task_description,
+        "task_executor": _executor_id(task),
+        "task_checker": current_user.id,
+        "team_id": current_user.member_of_team,
+        "deadline": task.deadline,
+        "status": TaskStatusEnum.open
+    }
+
+
 @router.post("/", response_model=TaskRead)
 async def create_task(
         task: TaskCreate,
-        current_user: User = Depends(current_active_user),
+        current_user: Principal = Depends(current_principal),
         db: AsyncSession = Depends(get_async_session)
 ):
     """создание задачи"""
@@ -28,62 +60,92 @@ async def create_task(
         )
 
     # проверка исполнителя
-    if task.task_executor and task.task_executor > 0:
+    if _executor_id(task):
         executor = await user_repo.get_user_by_id(db, task.task_executor)
         if not executor:
             raise HTTPException(
                 status_code=404,
                 detail="Executor not found"
             )
-        if (current_user.member_of_team and
-                executor.member_of_team != current_user.member_of_team and
-                current_user.role != RoleEnum.admin):
+        error = _executor_error(current_user, executor.member_of_team)
+        if error:
             raise HTTPException(
                 status_code=403,
-                detail="Executor is not in your team"
+                detail=error
             )
     # создание задачи
-    task_data = {
-        "task_name": task.task_name,
-        "task_description": task.task_description,
-        "task_executor": task.task_executor if task.task_executor and task.task_executor > 0 else None,
-        "task_checker": current_user.id,
-        "team_id": current_user.member_of_team,
-        "deadline": task.deadline,
-        "status": TaskStatusEnum.open
-    }
-
-    db_task = await task_repo.creaate_task(db,task_data)
+    db_task = await task_repo.creaate_task(db, _task_data(task, current_user))
     return TaskRead.model_validate(db_task)
 
 
-@router.get("/", response_model=List[TaskRead])
+@router.post("/bulk", response_model=TaskBulkReport)
+async def create_tasks(
+        data: TaskBulkCreate,
+        current_user: Principal = Depends(current_principal),
+        db: AsyncSession = Depends(get_async_session)
+):
+    """массовое создание задач: исполнители проверяются одним запросом, задачи - одним INSERT"""
+    if current_user.role not in [RoleEnum.admin, RoleEnum.team_admin, RoleEnum.manager]:
+        raise HTTPException(
+            status_code=403,
+            detail="Not enough permissions"
+        )
+
+    executor_teams = await user_repo.get_team_memberships(
+        db, [_executor_id(task) for task in data.tasks if _executor_id(task)])
+
+    results = [TaskBulkResult(item=index) for index in range(len(data.tasks))]
+    valid = []
+    for result, task in zip(results, data.tasks):
+        executor_id = _executor_id(task)
+        if executor_id and executor_id not in executor_teams:
+            result.error = "Executor not found"
+        elif executor_id:
+            result.error = _executor_error(current_user, executor_teams[executor_id])
+        if result.error is None:
+            valid.append(result)
+
+    tasks = await task_repo.create_tasks(db, [_task_data(data.tasks[result.item], current_user) for result in valid])
+    for result, db_task in zip(valid, tasks or [None] * len(valid)):
+        if db_task is None:
+            result.error = "Database error, nothing was created"
+        else:
+            result.task = TaskRead.model_validate(db_task)
+
+    created = sum(result.task is not None for result in results)
+    return TaskBulkReport(created=created, failed=len(results) - created, results=results)
+
+
+@router.get("/", response_model=Page[TaskRead])
 async def get_tasks(
-        skip: int = 0,
-        limit: int = 100,
+        cursor: Optional[str] = None,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
         status: Optional[TaskStatusEnum] = None,
-        current_user: User = Depends(current_active_user),
+        fields: Optional[Tuple[str, ...]] = Depends(sparse_fields(TaskRead)),
+        current_user: Principal = Depends(current_principal),
         db: AsyncSession = Depends(get_async_session)
 ):
-    """получение списка задач"""
+    """получение списка задач (fields - только эти колонки)"""
     if current_user.role in [RoleEnum.admin]:
-        tasks = await task_repo.get_tasks_by_filters(db, skip, limit,status)
+        page = await task_repo.get_tasks_by_filters(db, cursor, limit, status, fields=fields)
     elif current_user.role in [RoleEnum.team_admin, RoleEnum.manager]:
-        tasks = await task_repo.get_tasks_by_filters(db, skip, limit, status, current_user.member_of_team)
+        page = await task_repo.get_tasks_by_filters(db, cursor, limit, status, current_user.member_of_team,
+                                                    fields=fields)
     else:
-        tasks = await task_repo.get_user_tasks(db, current_user.id)
+        page = await task_repo.get_user_tasks(db, current_user.id, cursor, limit, fields=fields)
 
-    return [TaskRead.model_validate(task) for task in tasks]
+    return page_response(TaskRead, page.items, page.next_cursor, fields)
 
 
 @router.get("/{task_id}", response_model=TaskRead)
 async def get_task(
         task_id: int,
-        current_user: User = Depends(current_active_user),
+        fields: Optional[Tuple[str, ...]] = Depends(sparse_fields(TaskRead)),
+        current_user: Principal = Depends(current_principal),
         db: AsyncSession = Depends(get_async_session)
 ):
-    """получение задачи по id"""
-    task = await task_repo.get_task_by_id(db, task_id)
+    """получение задачи по id (fields - только эти колонки)"""
+    task = await task_repo.get_task_by_id(db, task_id, fields=with_columns(fields, "task_executor", "task_checker"))
     if not task:
         raise HTTPException(
             status_code=404,
@@ -97,7 +159,7 @@ async def get_task(
             detail="Not enough permissions"
         )
 
-    return TaskRead.model_validate(task)
+    return item_response(TaskRead, task, fields)
 
 
 @router.put("/{task_id}", response_model=TaskRead)
@@ -115,23 +177,40 @@ async def update_task(
     return TaskRead.model_validate(updated_task)
 
 
+@router.patch("/status", response_model=TaskStatusBulkResult)
+async def update_task_statuses(
+        data: TaskStatusBulkUpdate,
+        current_user: Principal = Depends(current_principal),
+        db: AsyncSession = Depends(get_async_session)
+):
+    """смена статусов списка задач одним UPDATE (при повторе id действует последний статус)"""
+    statuses = {change.task_id: change.status for change in data.changes}
+    updated = await task_repo.update_task_statuses(db, statuses, current_user)
+    if updated is None:
+        raise HTTPException(status_code=500, detail="Failed to update task statuses")
+
+    changed = set(updated)
+    return TaskStatusBulkResult(updated=sorted(changed),
+                                rejected=sorted(task_id for task_id in statuses if task_id not in changed))
+
+
 @router.patch("/{task_id}/status")
 async def update_task_status(
         task_id: int,
         status: TaskStatusEnum,
-        current_user: User = Depends(current_active_user),
+        current_user: Principal = Depends(current_principal),
         db: AsyncSession = Depends(get_async_session)
 ):
-    """обновление статуса задачи"""
-    task = await task_repo.get_task_by_id(db, task_id)
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+    """обновление статуса задачи (проверка прав - в условии того же UPDATE)"""
+    updated_task = await task_repo.update_task_status(db, task_id, status, current_user.id)
+    if not updated_task:
+        task = await task_repo.get_task_by_id(db, task_id)
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
 
-    if task.task_executor != current_user.id and task.task_checker != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+        if task.task_executor != current_user.id and task.task_checker != current_user.id:
+            raise HTTPException(status_code=403, detail="Not enough permissions")
 
-    updated_task = await task_repo.update_task_status(db, task_id, status)
-    if not updated_task:
         raise HTTPException(status_code=500, detail="Failed to update task status")
 
     return {"message": f"Task status updated to {status}"}
@@ -154,7 +233,7 @@ async def delete_task(
 async def add_comment(
         task_id: int,
         comment: CommentCreate,
-        current_user: User = Depends(current_active_user),
+        current_user: Principal = Depends(current_principal),
         db: AsyncSession = Depends(get_async_session)
 ):
     """добавление комментариев"""
@@ -183,10 +262,12 @@ async def add_comment(
     return CommentRead.model_validate(db_comment)
 
 
-@router.get("/{task_id}/comments", response_model=List[CommentRead])
+@router.get("/{task_id}/comments", response_model=Page[CommentRead])
 async def get_task_comments(
         task_id: int,
-        current_user: User = Depends(current_active_user),
+        cursor: Optional[str] = None,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        current_user: Principal = Depends(current_principal),
         db: AsyncSession = Depends(get_async_session)
 ):
     """получение комментария к задаче"""
@@ -205,5 +286,5 @@ async def get_task_comments(
             detail="Not enough permissions"
         )
 
-    comments = await comment_repo.get_comments_by_task_id(db, task_id)
-    return [CommentRead.model_validate(comment) for comment in comments]
+    page = await comment_repo.get_comments_by_task_id(db, task_id, cursor, limit)
+    return page_response(CommentRead, page.items, page.next_cursor)
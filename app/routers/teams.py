@@ -1,15 +1,18 @@
 """
 
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import Optional
 import secrets
 from app.database.database import get_async_session
-from app.database.models import User, RoleEnum
+from app.database.models import RoleEnum
+from app.database.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from app.database.repository import team_repo, user_repo
-from app.fastapi_users import current_active_user
-from app.schemas import TeamCreate, TeamRead
+from app.fastapi_users import current_principal
+from app.services.fast_json import page_response
+from app.services.principal import Principal
+from app.schemas import TeamCreate, TeamRead, Page
 from app.dependencies import get_team_admin_user
 
 
@@ -23,7 +26,7 @@ def generate_invite_code():
 @router.post("/", response_model=TeamRead)
 async def create_team(
         team: TeamCreate,
-        current_user: User = Depends(get_team_admin_user),
+        current_user: Principal = Depends(get_team_admin_user),
         db: AsyncSession = Depends(get_async_session)
 ):
     """создание команды"""
@@ -47,30 +50,32 @@ async def create_team(
     return TeamRead.model_validate(db_team)
 
 
-@router.get("/", response_model=List[TeamRead])
+@router.get("/", response_model=Page[TeamRead])
 async def get_teams(
-        skip: int = 0,
-        limit: int = 100,
-        current_user: User = Depends(current_active_user),
+        cursor: Optional[str] = None,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        current_user: Principal = Depends(current_principal),
         db: AsyncSession = Depends(get_async_session)
 ):
     """получение списка комманд"""
     if current_user.role == RoleEnum.admin:
-        teams = await team_repo.get_teams(db, skip, limit)
+        page = await team_repo.get_teams(db, cursor, limit)
+        teams, next_cursor = page.items, page.next_cursor
     else:
+        next_cursor = None
         if current_user.member_of_team:
             team = await team_repo.get_team_by_id(db, current_user.member_of_team)
             teams = [team] if team else []
         else:
             teams = []
 
-    return [TeamRead.model_validate(team) for team in teams]
+    return page_response(TeamRead, teams, next_cursor)
 
 
 @router.get("/{team_id}", response_model=TeamRead)
 async def get_team(
         team_id: int,
-        current_user: User = Depends(current_active_user),
+        current_user: Principal = Depends(current_principal),
         db: AsyncSession = Depends(get_async_session)
 ):
     """ получение команды по id"""
@@ -98,7 +103,7 @@ async def get_team(
 async def update_team(
         team_id: int,
         team_update: TeamCreate,
-        current_user: User = Depends(current_active_user),
+        current_user: Principal = Depends(current_principal),
         db: AsyncSession = Depends(get_async_session)
 ):
     """обновление команды"""
@@ -122,14 +127,14 @@ async def update_team(
         "team_name": team_update.team_name
     }
 
-    updated_team = await team_repo.update_team(db, team_data)
+    updated_team = await team_repo.update_team(db, team_id, team_data)
     return TeamRead.model_validate(updated_team)
 
 
 @router.delete("/{team_id}")
 async def delete_team(
         team_id: int,
-        current_user: User = Depends(current_active_user),
+        current_user: Principal = Depends(current_principal),
         db: AsyncSession = Depends(get_async_session)
 ):
     """удаление команды"""
@@ -148,14 +153,14 @@ async def delete_team(
             detail="Not team admin"
         )
 
-    await team_repo.delete(db, team_id)
+    await team_repo.delete_team(db, team_id)
     return {"message": "Team deleted successfully"}
 
 
 @router.post("/{team_id}/generate-invite")
 async def generate_new_invite(
         team_id: int,
-        current_user: User = Depends(current_active_user),
+        current_user: Principal = Depends(current_principal),
         db: AsyncSession = Depends(get_async_session)
 ):
     """генерация нового приглашения"""
@@ -193,7 +198,7 @@ async def generate_new_invite(
 async def remove_user_from_team(
         team_id: int,
         user_id: int,
-        current_user: User = Depends(current_active_user),
+        current_user: Principal = Depends(current_principal),
         db: AsyncSession = Depends(get_async_session)
 ):
     """исключение пользователя из команды"""
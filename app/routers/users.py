@@ -1,25 +1,29 @@
 """
 
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import Optional
 from app.database.database import get_async_session
-from app.database.models import User, RoleEnum
+from app.database.models import RoleEnum
+from app.database.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from app.database.repository import user_repo, team_repo
-from app.fastapi_users import current_active_user
-from app.schemas import UserRead, UserUpdate
+from app.fastapi_users import current_principal
+from app.services.fast_json import page_response
+from app.services.principal import Principal
+from app.services.user_provisioning import TooManyUsers, parse_users_csv, provision_users
+from app.schemas import UserRead, UserUpdate, Page, UserBulkCreate, UserProvisionReport
 
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
 
-@router.get("/", response_model=List[UserRead])
+@router.get("/", response_model=Page[UserRead])
 async def get_users(
-        skip: int = 0,
-        limit: int = 100,
+        cursor: Optional[str] = None,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
         db: AsyncSession = Depends(get_async_session),
-        current_user: User = Depends(current_active_user)
+        current_user: Principal = Depends(current_principal)
 ):
     """ получение пользователей"""
     if current_user.role not in [RoleEnum.admin, RoleEnum.team_admin, RoleEnum.manager]:
@@ -28,15 +32,53 @@ async def get_users(
             detail="Not enough permissions"
         )
 
-    users = await user_repo.get_users(db, skip, limit)
-    return [UserRead.model_validate(user) for user in users]
+    page = await user_repo.get_users(db, cursor, limit)
+    return page_response(UserRead, page.items, page.next_cursor)
+
+
+@router.post("/bulk", response_model=UserProvisionReport)
+async def bulk_create_users(
+        data: UserBulkCreate,
+        db: AsyncSession = Depends(get_async_session),
+        current_user: Principal = Depends(current_principal)
+):
+    """массовое создание пользователей с привязкой к командам"""
+    if current_user.role != RoleEnum.admin:
+        raise HTTPException(
+            status_code=403,
+            detail="Not enough permissions"
+        )
+
+    return await provision_users(db, data.users)
+
+
+@router.post("/bulk/csv", response_model=UserProvisionReport)
+async def bulk_create_users_csv(
+        file: UploadFile = File(...),
+        db: AsyncSession = Depends(get_async_session),
+        current_user: Principal = Depends(current_principal)
+):
+    """массовое создание пользователей из CSV (email, username, password, role, team_id)"""
+    if current_user.role != RoleEnum.admin:
+        raise HTTPException(
+            status_code=403,
+            detail="Not enough permissions"
+        )
+
+    try:
+        rows = parse_users_csv(await file.read())
+    except TooManyUsers as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="CSV must be UTF-8")
+    return await provision_users(db, rows)
 
 
 @router.post("/join-team/{invite_code}")
 async def join_team(
         invite_code: str,
         db: AsyncSession = Depends(get_async_session),
-        current_user: User = Depends(current_active_user)
+        current_user: Principal = Depends(current_principal)
 ):
     """присоединить к группе"""
     team = await team_repo.get_team_by_invite_code(db, invite_code)
@@ -53,7 +95,7 @@ async def join_team(
 @router.post("/leave-team")
 async def leave_team(
         db: AsyncSession = Depends(get_async_session),
-        current_user: User = Depends(current_active_user)
+        current_user: Principal = Depends(current_principal)
 ):
     """покинуть группу"""
     if not current_user.member_of_team:
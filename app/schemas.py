@@ -1,8 +1,18 @@
 """pydantic схемы"""
-from typing import Optional, List, Union
+from typing import Optional, List, Literal, Union, Generic, TypeVar
 from datetime import datetime
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from fastapi_users import schemas
+from app.database.models import RoleEnum, TaskStatusEnum
+
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """Страница списка и курсор следующей страницы"""
+    items: List[T]
+    next_cursor: Optional[str] = None
 
 
 class UserRead(schemas.BaseUser[int]):
@@ -22,6 +32,38 @@ class UserUpdate(schemas.BaseUserUpdate):
     username: Optional[str] = None
 
 
+MAX_BULK_USERS = 10000
+
+
+class UserProvision(BaseModel):
+    """Строка массового создания пользователей (без пароля - вход после forgot-password)"""
+    email: EmailStr
+    username: Optional[str] = None
+    password: Optional[str] = None
+    role: RoleEnum = RoleEnum.user
+    team_id: Optional[int] = None
+
+
+class UserBulkCreate(BaseModel):
+    """Список пользователей для массового создания"""
+    users: List[UserProvision] = Field(max_length=MAX_BULK_USERS)
+
+
+class UserProvisionResult(BaseModel):
+    """Результат по строке: id созданного пользователя или ошибка"""
+    row: int
+    email: Optional[str] = None
+    user_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class UserProvisionReport(BaseModel):
+    """Итог массового создания пользователей"""
+    created: int
+    failed: int
+    results: List[UserProvisionResult]
+
+
 class TeamBase(BaseModel):
     """Verification team base model"""
     team_name: str
@@ -56,6 +98,14 @@ class TaskCreate(TaskBase):
     task_executor: Optional[int] = None
 
 
+MAX_BULK_TASKS = 1000
+
+
+class TaskBulkCreate(BaseModel):
+    """Список задач для массового создания"""
+    tasks: List[TaskCreate] = Field(max_length=MAX_BULK_TASKS)
+
+
 class TaskRead(TaskBase):
     """Verification task"""
     task_id: int
@@ -118,6 +168,63 @@ class EvaluationRead(EvaluationBase):
         from_attributes = True
 
 
+MAX_BATCH_EVALUATIONS = 1000
+
+
+class EvaluationBatchCreate(BaseModel):
+    """Оценки пачкой: существующая оценка пропускается (skip) или перезаписывается (update)"""
+    evaluations: List[EvaluationCreate] = Field(max_length=MAX_BATCH_EVALUATIONS)
+    on_conflict: Literal["skip", "update"] = "skip"
+
+
+class EvaluationBatchResult(BaseModel):
+    """Результат по задаче: created, updated, skipped или error"""
+    task_id: int
+    result: str
+    evaluation: Optional[EvaluationRead] = None
+    error: Optional[str] = None
+
+
+class EvaluationBatchReport(BaseModel):
+    """Итог оценки пачкой"""
+    created: int
+    updated: int
+    skipped: int
+    failed: int
+    results: List[EvaluationBatchResult]
+
+
+class TaskBulkResult(BaseModel):
+    """Результат по элементу: созданная задача или ошибка"""
+    item: int
+    task: Optional[TaskRead] = None
+    error: Optional[str] = None
+
+
+class TaskBulkReport(BaseModel):
+    """Итог массового создания задач"""
+    created: int
+    failed: int
+    results: List[TaskBulkResult]
+
+
+class TaskStatusChange(BaseModel):
+    """Новый статус задачи"""
+    task_id: int
+    status: TaskStatusEnum
+
+
+class TaskStatusBulkUpdate(BaseModel):
+    """Список смен статусов"""
+    changes: List[TaskStatusChange] = Field(max_length=MAX_BULK_TASKS)
+
+
+class TaskStatusBulkResult(BaseModel):
+    """Измененные задачи и отклоненные (не найдены или нет прав)"""
+    updated: List[int]
+    rejected: List[int]
+
+
 class CommentBase(BaseModel):
     """Verification comment base model"""
     content: str
@@ -192,3 +299,21 @@ class DayCalendarResponse(BaseModel):
     """Схема ответа для календаря дня"""
     date: str
     events: List[DayEventResponse]
+
+
+class MonthDayBucket(BaseModel):
+    """Схема дня в календаре месяца"""
+    date: str
+    task_count: int = 0
+    meeting_count: int = 0
+    events: Optional[List[Union[TaskEvent, MeetingEvent]]] = None
+
+
+class MonthCalendarResponse(BaseModel):
+    """Схема ответа для структурированного календаря месяца"""
+    year: int
+    month: int
+    task_count: int
+    meeting_count: int
+    days: List[MonthDayBucket]
+    calendar: Optional[str] = None
@@ -0,0 +1,118 @@
+"""Подписка на календарь в формате iCalendar (.ics) по отзываемому токену"""
+import hashlib
+import os
+import secrets
+from datetime import date, datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Iterable, Iterator, Optional, Tuple
+from dotenv import load_dotenv
+from sqlalchemy import Row
+
+
+load_dotenv()
+CALENDAR_FEED_PAST_DAYS = int(os.getenv("CALENDAR_FEED_PAST_DAYS", "30"))
+CALENDAR_FEED_FUTURE_DAYS = int(os.getenv("CALENDAR_FEED_FUTURE_DAYS", "365"))
+CALENDAR_FEED_UID_DOMAIN = os.getenv("CALENDAR_FEED_UID_DOMAIN", "task-manager")
+
+
+def new_feed_token() -> str:
+    """Новый токен подписки (в базе хранится только его хэш)"""
+    return secrets.token_urlsafe(32)
+
+
+def hash_feed_token(token: str) -> str:
+    """Хэш токена подписки для поиска пользователя"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def feed_window(today: Optional[date] = None) -> Tuple[date, date]:
+    """Диапазон дат событий в подписке"""
+    today = today or datetime.now(timezone.utc).date()
+    return today - timedelta(days=CALENDAR_FEED_PAST_DAYS), today + timedelta(days=CALENDAR_FEED_FUTURE_DAYS)
+
+
+def _as_utc(moment: datetime) -> datetime:
+    """Время из базы в UTC (naive считается UTC)"""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def feed_etag(user_id: int, event_count: int, last_modified: Optional[datetime], window_start: date) -> str:
+    """ETag подписки по водяному знаку: меняется при изменении, удалении событий и сдвиге окна"""
+    stamp = _as_utc(last_modified).isoformat() if last_modified else "-"
+    digest = hashlib.sha1(f"{user_id}:{event_count}:{stamp}:{window_start.isoformat()}".encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def feed_last_modified(last_modified: Optional[datetime]) -> Optional[str]:
+    """Значение заголовка Last-Modified"""
+    if last_modified is None:
+        return None
+    return format_datetime(_as_utc(last_modified).replace(microsecond=0), usegmt=True)
+
+
+def is_not_modified(etag: str, if_none_match: Optional[str]) -> bool:
+    """Условный GET только по ETag: If-Modified-Since не видит удаленных событий и сдвига окна,
+    поэтому 304 по одной дате вернул бы устаревшую подписку"""
+    if if_none_match is None:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _escape(text: str) -> str:
+    """Экранирование значения TEXT (RFC 5545, 3.3.11)"""
+    return (text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _fold(line: str) -> str:
+    """Перенос строки длиннее 75 октетов (RFC 5545, 3.1)"""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+
+    parts = []
+    current = ""
+    limit = 75
+    for char in line:
+        if len((current + char).encode()) > limit:
+            parts.append(current)
+            current = ""
+            limit = 74
+        current += char
+    parts.append(current)
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _timestamp(moment: datetime) -> str:
+    """Дата-время в формате UTC iCalendar"""
+    return _as_utc(moment).strftime("%Y%m%dT%H%M%SZ")
+
+
+def iter_ics_feed(rows: Iterable[Row]) -> Iterator[str]:
+    """Календарь VCALENDAR построчно: VEVENT для задач с дедлайном и встреч"""
+    yield "BEGIN:VCALENDAR\r\n"
+    yield "VERSION:2.0\r\n"
+    yield f"PRODID:-//{CALENDAR_FEED_UID_DOMAIN}//calendar feed//EN\r\n"
+    yield "CALSCALE:GREGORIAN\r\n"
+
+    for row in rows:
+        yield "BEGIN:VEVENT\r\n"
+        yield f"UID:{row.kind}-{row.id}@{CALENDAR_FEED_UID_DOMAIN}\r\n"
+        yield f"DTSTAMP:{_timestamp(row.updated_at)}\r\n"
+        yield f"LAST-MODIFIED:{_timestamp(row.updated_at)}\r\n"
+        yield f"DTSTART:{_timestamp(row.start)}\r\n"
+        if row.kind == "meeting":
+            yield f"DTEND:{_timestamp(row.end)}\r\n"
+            yield "CATEGORIES:MEETING\r\n"
+            yield _fold(f"SUMMARY:{_escape(row.title)}")
+        else:
+            yield "CATEGORIES:TASK\r\n"
+            yield _fold(f"SUMMARY:{_escape(f'Task: {row.title} ({row.status})')}")
+        if row.description:
+            yield _fold(f"DESCRIPTION:{_escape(row.description)}")
+        yield "END:VEVENT\r\n"
+
+    yield "END:VCALENDAR\r\n"
@@ -1,90 +1,140 @@
-from datetime import date, timedelta, datetime
-from typing import List, Union, Dict
+from datetime import date, timedelta
+from itertools import groupby
+from operator import attrgetter
+from typing import List, Optional, Union, Dict, Iterable, Iterator, Tuple
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database.models import User
 from app.database.repository import calendar_repo
-from app.schemas import TaskEvent, MeetingEvent, DayEventResponse, DayCalendarResponse
+from app.services.principal import Principal
+from app.schemas import (TaskEvent, MeetingEvent, DayEventResponse, DayCalendarResponse, MonthDayBucket,
+                         MonthCalendarResponse)
 from calendar import monthrange
 
-async def get_events_utility(db: AsyncSession,current_user: User,start_date: date,end_date: date) -> List[Union[TaskEvent, MeetingEvent]]:
-    """Утилита для получения событий календаря"""
-    events = []
 
-    # Получаем задачи через репозиторий
-    tasks = await calendar_repo.get_user_tasks_by_date_range(db, current_user.id, start_date, end_date)
-    for task in tasks:
-        events.append(TaskEvent(id=f"task_{task.task_id}",title=task.task_name,start=task.deadline.isoformat() if task.deadline else None,type="task",status=task.status,description=task.task_description))
+def event_from_row(row: Row) -> Union[TaskEvent, MeetingEvent]:
+    """Строка проекции календаря -> событие календаря"""
+    if row.kind == "task":
+        return TaskEvent(id=f"task_{row.id}",title=row.title,start=row.start.isoformat(),type="task",status=row.status,description=row.description)
+    return MeetingEvent(id=f"meeting_{row.id}",title=row.title,start=row.start.isoformat(),end=row.end.isoformat(),type="meeting",description=row.description)
 
-    # Получаем встречи через репозиторий
-    meetings = await calendar_repo.get_user_meetings_by_date_range(db, current_user.id, start_date, end_date)
-    for meeting in meetings:
-        end_time = meeting.meeting_date + timedelta(minutes=meeting.duration_minutes)
-        events.append(MeetingEvent(id=f"meeting_{meeting.meeting_id}",title=meeting.meeting_name,start=meeting.meeting_date.isoformat(),end=end_time.isoformat(),type="meeting",description=meeting.meeting_description))
 
-    return events
+def day_event_from_row(row: Row) -> DayEventResponse:
+    """Строка проекции календаря -> событие дня"""
+    if row.kind == "task":
+        return DayEventResponse(type="task",id=row.id,title=row.title,time=row.start.strftime("%H:%M"),status=row.status,description=row.description)
+    return DayEventResponse(type="meeting",id=row.id,title=row.title,time=row.start.strftime("%H:%M"),duration=f"{row.duration}min",description=row.description)
 
 
+async def get_events_utility(db: AsyncSession,current_user: Principal,start_date: date,end_date: date,limit: Optional[int] = None) -> List[Union[TaskEvent, MeetingEvent]]:
+    """Утилита для получения событий календаря (отсортированы по началу)"""
+    rows = await calendar_repo.get_user_events(db, current_user.id, start_date, end_date, limit)
+    return [event_from_row(row) for row in rows]
 
-async def get_month_utility(year: int,month: int,db: AsyncSession,current_user: User):
+
+
+def month_bounds(year: int, month: int) -> Tuple[date, date]:
+    """Первый и последний день месяца"""
     _, last_day = monthrange(year, month)
-    start_date = date(year, month, 1)
-    end_date = date(year, month, last_day)
+    return date(year, month, 1), date(year, month, last_day)
 
-    events = await get_events_utility(db, current_user, start_date, end_date)
 
-    events_by_day: Dict[date, List[Union[TaskEvent, MeetingEvent]]] = {}
+def group_rows_by_day(rows: Iterable[Row]) -> Dict[date, List[Row]]:
+    """Разложить строки проекции (отсортированные по началу) по дням"""
+    return {day: list(day_rows) for day, day_rows in groupby(rows, key=attrgetter("day"))}
 
-    for event in events:
-        event_date = datetime.fromisoformat(event.start.replace('Z', '+00:00')).date()
-        if event_date not in events_by_day:
-            events_by_day[event_date] = []
-        events_by_day[event_date].append(event)
 
-    calendar_text = f"Calendar for {year}-{month:02d}\n"
-    calendar_text += "=" * 30 + "\n"
+def iter_month_text(year: int, month: int, rows_by_day: Dict[date, List[Row]]) -> Iterator[str]:
+    """Текстовый календарь месяца построчно"""
+    start_date, end_date = month_bounds(year, month)
+
+    yield f"Calendar for {year}-{month:02d}\n"
+    yield "=" * 30 + "\n"
 
     current_day = start_date
     while current_day <= end_date:
-        day_events = events_by_day.get(current_day, [])
-        calendar_text += f"\n{current_day.strftime('%Y-%m-%d %A')}:\n"
+        yield f"\n{current_day.strftime('%Y-%m-%d %A')}:\n"
 
-        if not day_events:
-            calendar_text += "  No events\n"
+        day_rows = rows_by_day.get(current_day)
+        if not day_rows:
+            yield "  No events\n"
         else:
-            for event in day_events:
-                event_type = "Task" if event.type == "task" else "Meeting"
-                calendar_text += f"{event_type} {event.title}\n"
+            for row in day_rows:
+                event_type = "Task" if row.kind == "task" else "Meeting"
+                yield f"{event_type} {row.title}\n"
 
         current_day += timedelta(days=1)
 
-    return {"calendar": calendar_text.strip()}
-
 
-
-async def get_day_utility(year: int,month: int,day: int,db: AsyncSession,current_user: User):
+async def get_month_rows_utility(year: int,month: int,db: AsyncSession,current_user: Principal) -> Dict[date, List[Row]]:
+    """События месяца, разложенные по дням"""
+    start_date, end_date = month_bounds(year, month)
+    rows = await calendar_repo.get_user_events(db, current_user.id, start_date, end_date)
+    return group_rows_by_day(rows)
+
+
+async def get_month_utility(year: int,month: int,db: AsyncSession,current_user: Principal):
+    rows_by_day = await get_month_rows_utility(year, month, db, current_user)
+    return {"calendar": "".join(iter_month_text(year, month, rows_by_day)).strip()}
+
+
+async def get_month_summary_utility(year: int,month: int,db: AsyncSession,current_user: Principal,include_events: bool = False,include_text: bool = False) -> MonthCalendarResponse:
+    """
+    Структурированный календарь месяца: корзины по дням с количеством задач и встреч.
+    Без событий и текста считается одним GROUP BY в базе
+    """
+    start_date, end_date = month_bounds(year, month)
+    buckets = {
+        start_date + timedelta(days=offset): MonthDayBucket(date=(start_date + timedelta(days=offset)).isoformat(),
+                                                            events=[] if include_events else None)
+        for offset in range(end_date.day)
+    }
+    calendar_text = None
+
+    if include_events or include_text:
+        rows_by_day = await get_month_rows_utility(year, month, db, current_user)
+        for day, day_rows in rows_by_day.items():
+            bucket = buckets.get(day)
+            if bucket is None:
+                continue
+            bucket.task_count = sum(1 for row in day_rows if row.kind == "task")
+            bucket.meeting_count = len(day_rows) - bucket.task_count
+            if include_events:
+                bucket.events = [event_from_row(row) for row in day_rows]
+        if include_text:
+            calendar_text = "".join(iter_month_text(year, month, rows_by_day)).strip()
+    else:
+        for row in await calendar_repo.get_user_event_counts_by_day(db, current_user.id, start_date, end_date):
+            bucket = buckets.get(row.day)
+            if bucket is None:
+                continue
+            bucket.task_count = row.task_count
+            bucket.meeting_count = row.meeting_count
+
+    days = list(buckets.values())
+    return MonthCalendarResponse(
+        year=year,
+        month=month,
+        task_count=sum(day.task_count for day in days),
+        meeting_count=sum(day.meeting_count for day in days),
+        days=days,
+        calendar=calendar_text,
+    )
+
+
+
+async def get_day_utility(year: int,month: int,day: int,db: AsyncSession,current_user: Principal):
     """Получить события дня"""
     target_date = date(year, month, day)
 
-    events = []
-
-    # Получаем задачи через репозиторий
-    tasks = await calendar_repo.get_user_tasks_by_date_range(db, current_user.id, target_date, target_date)
-    for task in tasks:
-        events.append(DayEventResponse(type="task",id=task.task_id,title=task.task_name,time=task.deadline.strftime("%H:%M") if task.deadline else "All day",status=task.status,description=task.task_description))
-
-    # Получаем встречи через репозиторий
-    meetings = await calendar_repo.get_user_meetings_by_date_range(db, current_user.id, target_date, target_date)
-    for meeting in meetings:
-        events.append(DayEventResponse(type="meeting",id=meeting.meeting_id,title=meeting.meeting_name,time=meeting.meeting_date.strftime("%H:%M"),duration=f"{meeting.duration_minutes}min",description=meeting.meeting_description))
-
-    events.sort(key=lambda x: x.time)
+    rows = await calendar_repo.get_user_events(db, current_user.id, target_date, target_date)
+    events = [day_event_from_row(row) for row in rows]
 
     return DayCalendarResponse(date=target_date.isoformat(),events=events)
 
 #
 # async def get_upcoming_events_utility(
 #         db: AsyncSession,
-#         current_user: User,
+#         current_user: Principal,
 #         days: int = 7
 # ) -> List[Union[TaskEvent, MeetingEvent]]:
 #     """Получить предстоящие события для главной страницы"""
@@ -1,12 +1,114 @@
 """try/except обработчик для различных операций"""
-from typing import Any, Optional, Callable
+import asyncio
+import os
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Callable
+from dotenv import load_dotenv
+from sqlalchemy import delete, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.database.database import UNIT_OF_WORK
+
+
+load_dotenv()
+DB_RETRY_ATTEMPTS = int(os.getenv("DB_RETRY_ATTEMPTS", "4"))
+DB_RETRY_BUDGET = float(os.getenv("DB_RETRY_BUDGET", "2.0"))
+DB_RETRY_BASE_DELAY = float(os.getenv("DB_RETRY_BASE_DELAY", "0.02"))
+DB_RETRY_MAX_DELAY = float(os.getenv("DB_RETRY_MAX_DELAY", "0.5"))
+
+# SQLSTATE временных ошибок: повтор транзакции может пройти
+TRANSIENT_SQLSTATES = {
+    "40001": "serialization_failure",
+    "40P01": "deadlock",
+    "55P03": "lock_not_available",
+    "57P01": "admin_shutdown",
+    "08000": "connection_exception",
+    "08003": "connection_does_not_exist",
+    "08006": "connection_failure",
+}
+
+
+def transient_reason(error: BaseException) -> Optional[str]:
+    """Причина временной ошибки (None - ошибка не временная и повтор не поможет)"""
+    if not isinstance(error, DBAPIError):
+        return None
+    if error.connection_invalidated:
+        return "connection_reset"
+    orig = error.orig
+    sqlstate = getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
+    if sqlstate in TRANSIENT_SQLSTATES:
+        return TRANSIENT_SQLSTATES[sqlstate]
+    if sqlstate and sqlstate.startswith("08"):
+        return "connection_exception"
+    # SQLite: блокировка файла базы другой транзакцией
+    if "database is locked" in str(orig):
+        return "database_locked"
+    return None
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Сколько раз и как долго повторять операцию после временной ошибки"""
+    attempts: int = DB_RETRY_ATTEMPTS
+    budget: float = DB_RETRY_BUDGET
+    base_delay: float = DB_RETRY_BASE_DELAY
+    max_delay: float = DB_RETRY_MAX_DELAY
+
+    def backoff(self, retry: int) -> float:
+        """Пауза перед повтором: экспоненциальная с полным джиттером"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+    def allows(self, retry: int, elapsed: float, delay: float) -> bool:
+        """Остались попытки, и пауза укладывается в бюджет времени"""
+        return retry + 1 < self.attempts and elapsed + delay <= self.budget
+
+
+class RetryStats:
+    """Счетчики повторов операций"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """Обнулить счетчики"""
+        self.retries = 0
+        self.recovered = 0
+        self.exhausted = 0
+        self.not_retryable = 0
+        self.reasons: Counter = Counter()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Счетчики для диагностики"""
+        return {
+            "retries": self.retries,
+            "recovered": self.recovered,
+            "exhausted": self.exhausted,
+            "not_retryable": self.not_retryable,
+            "reasons": dict(self.reasons),
+        }
 
 
 class DatabaseErrorHandler:
     """Обработчик ошибок"""
 
+    @staticmethod
+    async def save(db: AsyncSession) -> None:
+        """
+        Зафиксировать изменения: внутри unit of work только flush (коммит делает запрос),
+        вне его (CLI, тесты, фоновые задачи) - commit
+        """
+        if db.info.get(UNIT_OF_WORK):
+            await db.flush()
+        else:
+            await db.commit()
+
+    retry_policy = RetryPolicy()
+    stats = RetryStats()
+
     # try/except для баз данных
     @staticmethod
     async def execute_with_error_handling(db: AsyncSession,
@@ -14,19 +116,55 @@ class DatabaseErrorHandler:
                                           *args,
                                           **kwargs) -> Any:
         """
-        передаем базу, тип операции и арги с кваргами
+        передаем базу, тип операции и арги с кваргами.
+        Временные ошибки (deadlock, serialization failure, обрыв соединения) повторяются
+        здесь с паузой в пределах бюджета времени, только если транзакцию начала сама
+        операция: иначе откат теряет чтения, блокировки (FOR UPDATE, advisory) и записи,
+        на которых запрос уже принял решения. Тогда внутри unit of work ошибка
+        пробрасывается, и TransactionRetryMiddleware повторяет запрос целиком.
+        Остальные ошибки дают None, только если откат затронул одну эту операцию:
+        внутри unit of work после чужих записей они тоже пробрасываются, чтобы запрос
+        не отчитался об успехе с откаченными изменениями
         """
-        try:
-            result = await operation(*args, **kwargs)
-            return result
-        except SQLAlchemyError as e:
-            await db.rollback()
-            print(f"Database error in {operation.__name__}: {e}")
-            return None
-        except Exception as e:
-            await db.rollback()
-            print(f"Unexpected error in {operation.__name__}: {e}")
-            return None
+        policy = DatabaseErrorHandler.retry_policy
+        stats = DatabaseErrorHandler.stats
+        started = time.monotonic()
+        retry = 0
+        while True:
+            retryable = not db.in_transaction()
+            try:
+                result = await operation(*args, **kwargs)
+                if retry:
+                    stats.recovered += 1
+                return result
+            except SQLAlchemyError as e:
+                await db.rollback()
+                if not retryable and db.info.get(UNIT_OF_WORK):
+                    raise
+                reason = transient_reason(e)
+                if reason is None:
+                    print(f"Database error in {operation.__name__}: {e}")
+                    return None
+
+                delay = policy.backoff(retry)
+                if not retryable:
+                    stats.not_retryable += 1
+                elif policy.allows(retry, time.monotonic() - started, delay):
+                    retry += 1
+                    stats.retries += 1
+                    stats.reasons[reason] += 1
+                    await asyncio.sleep(delay)
+                    continue
+                else:
+                    stats.exhausted += 1
+                print(f"Database error in {operation.__name__} ({reason}, {retry} retries): {e}")
+                return None
+            except Exception as e:
+                await db.rollback()
+                if not retryable and db.info.get(UNIT_OF_WORK):
+                    raise
+                print(f"Unexpected error in {operation.__name__}: {e}")
+                return None
 
 
     # crud-операций
@@ -40,43 +178,43 @@ class DatabaseErrorHandler:
         async def _create():
             obj = model_class(**data)
             db.add(obj)
-            await db.commit()
-            await db.refresh(obj)
+            await DatabaseErrorHandler.save(db)
             return obj
 
         return await DatabaseErrorHandler.execute_with_error_handling(db, _create)
 
     @staticmethod
     async def update_operation(db: AsyncSession,
-                               get_method: Callable,
-                               object_id: int,
+                               model_class: Any,
+                               criteria: Any,
                                update_data: dict) -> Any:
         """
-        Операция обновления для передачи в execute_with_error_handling
+        Операция обновления одним запросом UPDATE ... WHERE ... RETURNING,
+        без предварительной загрузки объекта. None - если строка не найдена
         """
         async def _update():
-            obj = await get_method(db, object_id)
-            if obj:
-                for key, value in update_data.items():
-                    setattr(obj, key, value)
-                await db.commit()
-                await db.refresh(obj)
+            result = await db.execute(
+                update(model_class).where(criteria).values(**update_data).returning(model_class)
+            )
+            obj = result.scalar_one_or_none()
+            if obj is not None:
+                await DatabaseErrorHandler.save(db)
             return obj
 
         return await DatabaseErrorHandler.execute_with_error_handling(db, _update)
 
     @staticmethod
     async def delete_operation(db: AsyncSession,
-                               get_method: Callable,
-                               object_id: int) -> bool:
+                               model_class: Any,
+                               criteria: Any) -> bool:
         """
-        Операция удаления для передачи в execute_with_error_handling
+        Операция удаления одним запросом DELETE ... WHERE.
+        Дочерние строки удаляет база (ON DELETE CASCADE / SET NULL)
         """
         async def _delete():
-            obj = await get_method(db, object_id)
-            if obj:
-                await db.delete(obj)
-                await db.commit()
+            result = await db.execute(delete(model_class).where(criteria))
+            if result.rowcount:
+                await DatabaseErrorHandler.save(db)
                 return True
             return False
 
@@ -86,3 +224,60 @@ class DatabaseErrorHandler:
 
 # Создаем экземпляр для использования
 db_error_handler = DatabaseErrorHandler()
+
+
+class TransactionRetryMiddleware:
+    """
+    Повтор всего запроса после временной ошибки базы: чтения, блокировки, записи
+    и коммит unit of work выполняются заново в новой транзакции. Тело запроса
+    буферизуется для повтора; после начала ответа запрос не повторяется
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        body = []
+        while True:
+            message = await receive()
+            body.append(message)
+            if message["type"] != "http.request" or not message.get("more_body", False):
+                break
+
+        policy = DatabaseErrorHandler.retry_policy
+        stats = DatabaseErrorHandler.stats
+        started = time.monotonic()
+        retry = 0
+        while True:
+            pending = list(body)
+            response_started = False
+
+            async def replay() -> Message:
+                return pending.pop(0) if pending else await receive()
+
+            async def tracking_send(message: Message) -> None:
+                nonlocal response_started
+                response_started = response_started or message["type"] == "http.response.start"
+                await send(message)
+
+            try:
+                await self.app(dict(scope), replay, tracking_send)
+                if retry:
+                    stats.recovered += 1
+                return
+            except DBAPIError as e:
+                reason = transient_reason(e)
+                if reason is None or response_started:
+                    raise
+                delay = policy.backoff(retry)
+                if not policy.allows(retry, time.monotonic() - started, delay):
+                    stats.exhausted += 1
+                    raise
+                retry += 1
+                stats.retries += 1
+                stats.reasons[reason] += 1
+                await asyncio.sleep(delay)
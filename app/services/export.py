@@ -0,0 +1,51 @@
+"""Потоковая выгрузка строк запроса в NDJSON или CSV"""
+import csv
+import io
+import os
+from typing import AsyncIterator, Literal, Type
+from dotenv import load_dotenv
+from pydantic import BaseModel
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+
+load_dotenv()
+# строк в одной пачке серверного курсора (и в одном куске ответа)
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _csv_chunk(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue()
+
+
+async def stream_export(bind: AsyncEngine,
+                        query: Select,
+                        schema: Type[BaseModel],
+                        export_format: ExportFormat,
+                        batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[str]:
+    """
+    Строки query через серверный курсор пачками по batch_size: в памяти одна пачка
+    при любом объеме. Сессия своя - сессия запроса закрывается до отправки тела ответа,
+    а соединение курсора занято из пула, пока клиент читает выгрузку
+    """
+    fields = list(schema.model_fields)
+    async with AsyncSession(bind) as session:
+        result = await session.stream(query.execution_options(yield_per=batch_size))
+        if export_format == "csv":
+            yield _csv_chunk([fields])
+
+        async for partition in result.partitions():
+            items = [schema.model_validate(row) for row in partition]
+            if export_format == "csv":
+                yield _csv_chunk([item.model_dump(mode="json").values() for item in items])
+            else:
+                yield "".join(item.model_dump_json() + "\n" for item in items)
@@ -0,0 +1,43 @@
+"""Быстрый путь ответа списков: одна валидация страницы и сериализация в pydantic-core"""
+from functools import lru_cache
+from typing import Any, Iterable, Optional, Tuple, Type
+from fastapi.responses import Response
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from app.schemas import Page
+
+
+@lru_cache(maxsize=None)
+def projected_schema(schema: Type[BaseModel], fields: Optional[Tuple[str, ...]] = None) -> Type[BaseModel]:
+    """Схема только с полями fields (None - схема целиком), одна на набор полей"""
+    if fields is None:
+        return schema
+    return create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **{field: (schema.model_fields[field].annotation, schema.model_fields[field]) for field in fields},
+    )
+
+
+@lru_cache(maxsize=None)
+def page_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    """TypeAdapter страницы схемы: схема валидации собирается один раз на процесс"""
+    return TypeAdapter(Page[schema])
+
+
+def page_response(schema: Type[BaseModel], items: Iterable[Any], next_cursor: Optional[str] = None,
+                  fields: Optional[Tuple[str, ...]] = None) -> Response:
+    """
+    Страница одним вызовом валидации (ORM-объекты или строки-отображения читаются
+    from_attributes) и сразу в JSON-байты. Возвращенный Response FastAPI отдает как есть:
+    response_model остается только для OpenAPI, повторной валидации и jsonable_encoder нет.
+    fields - разреженный набор полей ответа
+    """
+    adapter = page_adapter(projected_schema(schema, fields))
+    page = adapter.validate_python({"items": list(items), "next_cursor": next_cursor}, from_attributes=True)
+    return Response(adapter.dump_json(page), media_type="application/json")
+
+
+def item_response(schema: Type[BaseModel], item: Any, fields: Optional[Tuple[str, ...]] = None) -> Response:
+    """Один объект с разреженным набором полей тем же путем"""
+    model = projected_schema(schema, fields).model_validate(item, from_attributes=True)
+    return Response(model.model_dump_json(), media_type="application/json")
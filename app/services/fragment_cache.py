@@ -0,0 +1,108 @@
+"""Кэш отрендеренных фрагментов страниц со сбросом при записи в связанные таблицы"""
+import os
+import time
+from typing import Dict, Hashable, Iterable, Optional, Set, Tuple
+from dotenv import load_dotenv
+from markupsafe import Markup
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+
+load_dotenv()
+INDEX_CACHE_TTL = float(os.getenv("INDEX_CACHE_TTL", "30"))
+
+# таблица -> секции главной страницы, которые ее показывают
+INDEX_SECTION_TABLES: Dict[str, Tuple[str, ...]] = {
+    "users": ("users", "teams", "tasks"),
+    "teams": ("teams", "tasks"),
+    "tasks": ("tasks",),
+    "evaluations": ("tasks",),
+    "task_rating_totals": ("tasks",),
+    "meetings": ("meetings", "calendar"),
+}
+
+
+class FragmentCache:
+    """
+    TTL кэш фрагментов в памяти процесса. Ключ - (секция, параметры);
+    сброс секции удаляет все ее ключи
+    """
+
+    def __init__(self, ttl: float = INDEX_CACHE_TTL):
+        self.ttl = ttl
+        self._items: Dict[Tuple[str, Hashable], Tuple[float, Markup]] = {}
+
+    def get(self, section: str, key: Hashable = None) -> Optional[Markup]:
+        """Получить фрагмент, если он есть и не устарел"""
+        item = self._items.get((section, key))
+        if item is None:
+            return None
+
+        expires_at, fragment = item
+        if expires_at < time.monotonic():
+            self._items.pop((section, key), None)
+            return None
+        return fragment
+
+    def set(self, section: str, fragment: Markup, key: Hashable = None) -> None:
+        """Положить фрагмент в кэш"""
+        if self.ttl <= 0:
+            return
+        self._items[(section, key)] = (time.monotonic() + self.ttl, fragment)
+
+    def invalidate(self, sections: Iterable[str]) -> None:
+        """Сбросить все ключи секций"""
+        sections = set(sections)
+        for cache_key in [cache_key for cache_key in self._items if cache_key[0] in sections]:
+            self._items.pop(cache_key, None)
+
+    def clear(self) -> None:
+        """Очистить кэш"""
+        self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+# Создаем экземпляр для использования
+index_cache = FragmentCache()
+
+
+def _touched_sections(session: Session) -> Set[str]:
+    """Секции, которые нужно сбросить после коммита транзакции сессии"""
+    return session.info.setdefault("index_sections_touched", set())
+
+
+def _mark_tables(session: Session, tables: Iterable[str]) -> None:
+    """Отметить секции, показывающие измененные таблицы"""
+    for table in tables:
+        _touched_sections(session).update(INDEX_SECTION_TABLES.get(table, ()))
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_tables(session: Session, flush_context) -> None:
+    """Запомнить таблицы, измененные при flush"""
+    _mark_tables(session, (obj.__table__.name for obj in (*session.new, *session.dirty, *session.deleted)))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_statement_tables(orm_execute_state: ORMExecuteState) -> None:
+    """Запомнить таблицы из ORM-запросов insert/update/delete"""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            _mark_tables(orm_execute_state.session, [mapper.local_table.name])
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    """После коммита сбросить секции, показывающие измененные таблицы"""
+    sections = session.info.pop("index_sections_touched", None)
+    if sections:
+        index_cache.invalidate(sections)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session: Session) -> None:
+    """Откат: изменений для сброса нет"""
+    session.info.pop("index_sections_touched", None)
@@ -0,0 +1,34 @@
+"""ASGI-приложение, собираемое при первом запросе"""
+from typing import Callable, List, Optional
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class LazyApp:
+    """
+    Обертка для Mount: фабрика вызывается при первом запросе (или первом url_for
+    по имени маршрута внутри), а не при старте воркера
+    """
+
+    def __init__(self, factory: Callable[[], ASGIApp]):
+        self._factory = factory
+        self._app: Optional[ASGIApp] = None
+
+    @property
+    def app(self) -> ASGIApp:
+        """Собранное приложение"""
+        if self._app is None:
+            self._app = self._factory()
+        return self._app
+
+    @property
+    def is_built(self) -> bool:
+        return self._app is not None
+
+    @property
+    def routes(self) -> List[BaseRoute]:
+        """Маршруты для url_for("admin:...") через Mount"""
+        return getattr(self.app, "routes", [])
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.app(scope, receive, send)
@@ -0,0 +1,142 @@
+"""Хеширование и проверка паролей в пуле потоков, вне event loop"""
+import asyncio
+import os
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from dotenv import load_dotenv
+from fastapi_users.password import PasswordHelper
+from app.database.pool import PoolMetrics
+
+
+load_dotenv()
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+# потоки для массового создания пользователей: отдельно от логинов, по числу ядер
+PASSWORD_BULK_WORKERS = int(os.getenv("PASSWORD_BULK_WORKERS", "0")) or os.cpu_count() or 1
+
+# префикс хеша, с которым вход невозможен (пароль задается через forgot-password)
+UNUSABLE_PASSWORD_PREFIX = "!"
+
+
+def unusable_password() -> str:
+    """Значение hashed_password без пароля: не совпадает ни с одним хешем"""
+    return UNUSABLE_PASSWORD_PREFIX + secrets.token_urlsafe(16)
+
+
+def is_usable_password(hashed_password: str) -> bool:
+    return not hashed_password.startswith(UNUSABLE_PASSWORD_PREFIX)
+
+
+class PasswordPoolBusy(Exception):
+    """Очередь хеширования переполнена: запрос лучше повторить позже"""
+
+
+class PasswordPool:
+    """
+    Argon2/bcrypt отпускают GIL, поэтому хватает потоков: одновременно выполняется
+    не больше workers операций, остальные ждут в очереди не длиннее max_queue.
+    Всплеск логинов занимает потоки пула, а не event loop с остальными запросами
+    """
+
+    def __init__(self,
+                 workers: int = PASSWORD_HASH_WORKERS,
+                 max_queue: int = PASSWORD_HASH_MAX_QUEUE,
+                 helper: Optional[PasswordHelper] = None):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.helper = helper or PasswordHelper()
+        self.metrics = PoolMetrics()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.reset()
+
+    def reset(self) -> None:
+        """Обнулить метрики"""
+        self.metrics.reset()
+        self.in_flight = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.rejected = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password")
+        return self._executor
+
+    @property
+    def slots(self) -> asyncio.Semaphore:
+        """Семафор слотов, созданный в работающем event loop (новый loop - новый семафор)"""
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.workers)
+            self._slots_loop = loop
+        return self._slots
+
+    async def _run(self, func: Callable, *args) -> Any:
+        """Дождаться слота и выполнить func в потоке пула"""
+        slots = self.slots
+        if slots.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise PasswordPoolBusy()
+
+        started = time.perf_counter()
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            await slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.metrics.observe(time.perf_counter() - started)
+
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self.in_flight -= 1
+            slots.release()
+
+    async def hash(self, password: str) -> str:
+        """Хеш пароля"""
+        return await self._run(self.helper.hash, password)
+
+    def _hash_chunk(self, passwords: Sequence[str]) -> List[str]:
+        return [self.helper.hash(password) for password in passwords]
+
+    async def hash_many(self, passwords: Sequence[str]) -> List[str]:
+        """Хеши списка паролей: по одной пачке на поток, пачки хешируются параллельно"""
+        if not passwords:
+            return []
+        size = -(-len(passwords) // self.workers)
+        chunks = [passwords[i:i + size] for i in range(0, len(passwords), size)]
+        results = await asyncio.gather(*(self._run(self._hash_chunk, chunk) for chunk in chunks))
+        return [hashed for chunk in results for hashed in chunk]
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Проверка пароля и, если схема хеша устарела, новый хеш"""
+        return await self._run(self.helper.verify_and_update, plain_password, hashed_password)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Метрики для диагностики: глубина очереди и ожидание слота"""
+        wait = self.metrics.snapshot()
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "rejected": self.rejected,
+            "operations": wait["checkouts"],
+            "wait_seconds_avg": wait["wait_seconds_avg"],
+            "wait_seconds_max": wait["wait_seconds_max"],
+            "wait_seconds_p95": wait["wait_seconds_p95"],
+            "wait_seconds_histogram": wait["wait_seconds_histogram"],
+        }
+
+
+# Создаем экземпляры для использования
+password_pool = PasswordPool()
+bulk_password_pool = PasswordPool(workers=PASSWORD_BULK_WORKERS)
@@ -0,0 +1,94 @@
+"""Легковесный аутентифицированный пользователь (principal) и его кэш"""
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.database.models import RoleEnum
+
+
+load_dotenv()
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024"))
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Поля пользователя, которые нужны роутерам для проверки прав"""
+    id: int
+    role: RoleEnum
+    member_of_team: Optional[int]
+    is_active: bool
+
+
+class PrincipalCache:
+    """
+    TTL/LRU кэш principal по id пользователя в памяти процесса.
+    Записи сбрасываются при изменении пользователя, а TTL ограничивает
+    устаревание между воркерами
+    """
+
+    def __init__(self, maxsize: int = PRINCIPAL_CACHE_SIZE, ttl: float = PRINCIPAL_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items: OrderedDict[int, tuple[float, Principal]] = OrderedDict()
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        """Получить principal, если запись есть и не устарела"""
+        item = self._items.get(user_id)
+        if item is None:
+            return None
+
+        expires_at, principal = item
+        if expires_at < time.monotonic():
+            del self._items[user_id]
+            return None
+
+        self._items.move_to_end(user_id)
+        return principal
+
+    def set(self, principal: Principal) -> None:
+        """Положить principal в кэш, вытеснив самую старую запись"""
+        if self.maxsize <= 0:
+            return
+        self._items[principal.id] = (time.monotonic() + self.ttl, principal)
+        self._items.move_to_end(principal.id)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        """Сбросить запись после изменения пользователя"""
+        self._items.pop(user_id, None)
+
+    def clear(self) -> None:
+        """Очистить кэш"""
+        self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+# Создаем экземпляр для использования
+principal_cache = PrincipalCache()
+
+
+def invalidate_principal_on_commit(db: AsyncSession, user_id: int) -> None:
+    """Сбросить principal пользователя после коммита транзакции, изменившей его"""
+    db.info.setdefault("principals_touched", set()).add(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    """После коммита сбросить principal измененных пользователей"""
+    for user_id in session.info.pop("principals_touched", ()):
+        principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session: Session) -> None:
+    """Откат: пользователи не изменились"""
+    session.info.pop("principals_touched", None)
@@ -0,0 +1,106 @@
+"""Массовое создание пользователей: проверки пачкой, параллельное хеширование, один INSERT"""
+import csv
+import io
+from typing import Dict, List, Sequence, Tuple, Union
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.repository import team_repo, user_repo
+from app.schemas import MAX_BULK_USERS, UserProvision, UserProvisionReport, UserProvisionResult
+from app.services.password_pool import bulk_password_pool, unusable_password
+
+
+CSV_FIELDS = ("email", "username", "password", "role", "team_id")
+
+# строка CSV, не прошедшая валидацию: email и ошибка
+RowError = Tuple[str, str]
+
+
+class TooManyUsers(ValueError):
+    """Файл длиннее MAX_BULK_USERS строк"""
+
+
+def parse_users_csv(content: bytes) -> List[Union[UserProvision, RowError]]:
+    """
+    CSV с заголовком (email обязателен; username, password, role, team_id - по желанию).
+    Невалидная строка не прерывает разбор, а становится ошибкой этой строки
+    """
+    reader = csv.DictReader(io.StringIO(content.decode("utf-8-sig")))
+    rows: List[Union[UserProvision, RowError]] = []
+    for record in reader:
+        if len(rows) >= MAX_BULK_USERS:
+            raise TooManyUsers(f"At most {MAX_BULK_USERS} users per import")
+        values = {field: (record.get(field) or "").strip() for field in CSV_FIELDS}
+        try:
+            rows.append(UserProvision.model_validate({field: value for field, value in values.items() if value}))
+        except ValidationError as e:
+            error = e.errors()[0]
+            rows.append((values["email"], f"{'.'.join(map(str, error['loc']))}: {error['msg']}"))
+    return rows
+
+
+async def provision_users(db: AsyncSession, rows: Sequence[Union[UserProvision, RowError]]) -> UserProvisionReport:
+    """
+    Проверки уникальности и команд - по одному запросу на пачку, пароли хешируются
+    параллельно в bulk_password_pool, пользователи вставляются одним INSERT ... RETURNING
+    с уже заполненным member_of_team. Результат - по каждой строке
+    """
+    results = [UserProvisionResult(row=number) for number in range(1, len(rows) + 1)]
+    valid: Dict[int, UserProvision] = {}
+    for index, row in enumerate(rows):
+        if isinstance(row, UserProvision):
+            results[index].email = row.email
+            valid[index] = row
+        else:
+            results[index].email, results[index].error = row
+
+    taken_emails, taken_usernames = await user_repo.get_taken_logins(
+        db,
+        [row.email.lower() for row in valid.values()],
+        [row.username for row in valid.values() if row.username],
+    )
+    team_ids = await team_repo.get_existing_team_ids(db, [row.team_id for row in valid.values() if row.team_id])
+
+    seen_emails, seen_usernames = set(), set()
+    for index, row in list(valid.items()):
+        email = row.email.lower()
+        error = None
+        if email in taken_emails:
+            error = "Email already registered"
+        elif email in seen_emails:
+            error = "Duplicate email in import"
+        elif row.username and row.username in taken_usernames:
+            error = "Username already taken"
+        elif row.username and row.username in seen_usernames:
+            error = "Duplicate username in import"
+        elif row.team_id is not None and row.team_id not in team_ids:
+            error = f"Team {row.team_id} not found"
+        seen_emails.add(email)
+        if row.username:
+            seen_usernames.add(row.username)
+        if error:
+            results[index].error = error
+            del valid[index]
+
+    with_password = [index for index, row in valid.items() if row.password]
+    hashes = dict(zip(with_password, await bulk_password_pool.hash_many([valid[i].password for i in with_password])))
+
+    users_data = [
+        {
+            "email": row.email,
+            "username": row.username,
+            "hashed_password": hashes.get(index) or unusable_password(),
+            "role": row.role,
+            "member_of_team": row.team_id,
+        }
+        for index, row in valid.items()
+    ]
+    user_ids = await user_repo.create_users(db, users_data)
+
+    for index, row in valid.items():
+        if user_ids is None:
+            results[index].error = "Database error, nothing was created"
+        else:
+            results[index].user_id = user_ids[row.email.lower()]
+
+    created = sum(result.user_id is not None for result in results)
+    return UserProvisionReport(created=created, failed=len(results) - created, results=results)
@@ -1,45 +1,42 @@
 """
 Основной скрипт создания и запуска приложения + админка
 """
+import argparse
 import os
 from contextlib import asynccontextmanager
 import uvicorn
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from starlette.middleware.sessions import SessionMiddleware
-from sqladmin import Admin
 from app.database.database import (engine,create_db_and_tables)
+from app.database.migrations import verify_schema_version
+from app.database.pagination import InvalidCursorError
 from app.fastapi_users import fastapi_users,auth_backend, create_admin_user
 from app.schemas import (UserRead,UserCreate,UserUpdate)
-from app.admin import (SimpleAuth,UserAdmin,TeamAdmin,TaskAdmin,MeetingAdmin,EvaluationAdmin)
-from app.routers import (users,teams,tasks,meetings,evaluations,calendar,index)
+from app.routers import (users,teams,tasks,meetings,evaluations,calendar,index,diagnostics,export)
+from app.services.lazy_app import LazyApp
+from app.services.database_error_handler import TransactionRetryMiddleware
+from app.services.password_pool import PasswordPoolBusy
 
 
 load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY")
-
-
-admin = None
+# production: схема только сверяется с Alembic, администратор создается командой
+# `python -m app.cli create-admin`; development: create_all и создание администратора при старте
+STARTUP_MODE = os.getenv("STARTUP_MODE", "development")
 
 
 @asynccontextmanager
 async def lifespan(application: FastAPI):
     """Основной цикл"""
-    global admin
-
-    await create_db_and_tables()
+    if STARTUP_MODE == "production":
+        await verify_schema_version(engine)
+    else:
+        await create_db_and_tables()
 
-    # Инициализация админки
-    admin = Admin(app=application,engine=engine,authentication_backend=SimpleAuth(SECRET_KEY),base_url="/admin")
-
-    admin.add_view(UserAdmin)
-    admin.add_view(TeamAdmin)
-    admin.add_view(TaskAdmin)
-    admin.add_view(MeetingAdmin)
-    admin.add_view(EvaluationAdmin)
-
-    # Создание администратора через UserManager
-    await create_admin_user()
+        # Создание администратора через UserManager
+        await create_admin_user()
 
     yield
 
@@ -50,6 +47,21 @@ app = FastAPI(lifespan=lifespan)
 
 # Middleware
 app.add_middleware(SessionMiddleware,secret_key=SECRET_KEY,session_cookie="session")
+app.add_middleware(TransactionRetryMiddleware)
+
+
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    """Поврежденный курсор пагинации"""
+    return JSONResponse(status_code=400, content={"detail": "Invalid cursor"})
+
+
+@app.exception_handler(PasswordPoolBusy)
+async def password_pool_busy_handler(request: Request, exc: PasswordPoolBusy):
+    """Очередь хеширования паролей переполнена"""
+    return JSONResponse(status_code=503, content={"detail": "Too many password operations, retry later"},
+                        headers={"Retry-After": "1"})
+
 
 # Аутентификация fastapi-users
 app.include_router(fastapi_users.get_auth_router(auth_backend),prefix="/auth/jwt",tags=["auth"])
@@ -65,15 +77,77 @@ app.include_router(tasks.router)
 app.include_router(meetings.router)
 app.include_router(evaluations.router)
 app.include_router(calendar.router)
+app.include_router(diagnostics.router)
+app.include_router(export.router)
 
 # Роутер главной страницы
 app.include_router(index.index_router)
 
 
+def build_admin():
+    """Админка собирается при первом запросе к /admin: sqladmin не импортируется при старте"""
+    from app.admin import create_admin
+    return create_admin(engine, SECRET_KEY)
+
+
+# Админка
+admin = LazyApp(build_admin)
+app.mount("/admin", admin, name="admin")
+
+
+
+# Параметры production-сервера
+WEB_HOST = os.getenv("WEB_HOST", "0.0.0.0")
+WEB_PORT = int(os.getenv("WEB_PORT", "8000"))
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", "0"))
+WEB_KEEPALIVE = int(os.getenv("WEB_KEEPALIVE", "5"))
+WEB_BACKLOG = int(os.getenv("WEB_BACKLOG", "2048"))
+WEB_GRACEFUL_TIMEOUT = int(os.getenv("WEB_GRACEFUL_TIMEOUT", "30"))
+
+
+def server_options(**overrides) -> dict:
+    """
+    Параметры uvicorn для production: несколько воркеров (по умолчанию по числу ядер),
+    uvloop и httptools, keep-alive и backlog из окружения. По SIGTERM воркеры перестают
+    принимать соединения и дожидаются текущих запросов не дольше WEB_GRACEFUL_TIMEOUT
+    """
+    options = {
+        "host": WEB_HOST,
+        "port": WEB_PORT,
+        "workers": WEB_WORKERS or os.cpu_count() or 1,
+        "loop": "uvloop",
+        "http": "httptools",
+        "timeout_keep_alive": WEB_KEEPALIVE,
+        "backlog": WEB_BACKLOG,
+        "timeout_graceful_shutdown": WEB_GRACEFUL_TIMEOUT,
+        "proxy_headers": True,
+        "access_log": False,
+    }
+    options.update(overrides)
+    return options
+
+
+def serve(args: argparse.Namespace):
+    """Production: несколько воркеров без перезагрузки"""
+    overrides = {"workers": args.workers} if args.workers else {}
+    uvicorn.run("main:app", **server_options(**overrides))
+
+
+def dev(args: argparse.Namespace):
+    """Разработка: один процесс с перезагрузкой при изменении кода"""
+    uvicorn.run("main:app", host=WEB_HOST, port=WEB_PORT, reload=True)
+
+
+def main(argv=None):
+    """Запуск сервера: python main.py [dev|serve]"""
+    parser = argparse.ArgumentParser(prog="python main.py")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("dev", help=dev.__doc__)
+    serve_parser = subparsers.add_parser("serve", help=serve.__doc__)
+    serve_parser.add_argument("--workers", type=int, default=0)
 
-def main():
-    """Запуск сервера"""
-    uvicorn.run("main:app",host="0.0.0.0",port=8000,reload=True)
+    args = parser.parse_args(argv)
+    {"serve": serve}.get(args.command, dev)(args)
 
 
 if __name__ == "__main__":
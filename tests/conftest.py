@@ -4,14 +4,17 @@ from typing import AsyncGenerator, Generator
 
 import pytest_asyncio
 from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from main import app
-from app.database.database import Base, get_async_session
+from app.database.database import Base, get_async_session, unit_of_work
 from app.database.models import User
-from app.fastapi_users import get_user_db
-from fastapi_users.db import SQLAlchemyUserDatabase
+from app.fastapi_users import get_jwt_strategy
+from app.services.principal import principal_cache
+from app.services.fragment_cache import index_cache
 from fastapi_users.password import PasswordHelper
 
 # Тестовая база данных SQLite
@@ -32,15 +35,8 @@ password_helper = PasswordHelper()
 
 async def override_get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with TestAsyncSessionLocal() as session:
-        try:
+        async with unit_of_work(session):
             yield session
-        finally:
-            await session.close()
-
-
-async def override_get_user_db():
-    async with TestAsyncSessionLocal() as session:
-        yield SQLAlchemyUserDatabase(session, User)
 
 
 @pytest.fixture(scope="session")
@@ -61,6 +57,22 @@ async def setup_database():
         await conn.run_sync(Base.metadata.drop_all)
 
 
+@pytest.fixture(scope="function", autouse=True)
+def clear_principal_cache():
+    """id пользователей повторяются между тестами - кэш не должен их пережить"""
+    principal_cache.clear()
+    yield
+    principal_cache.clear()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def clear_index_cache():
+    """Фрагменты главной страницы не должны переживать тестовую базу"""
+    index_cache.clear()
+    yield
+    index_cache.clear()
+
+
 @pytest_asyncio.fixture(scope="function")
 async def test_session() -> AsyncGenerator[AsyncSession, None]:
     """Create a test database session."""
@@ -75,7 +87,6 @@ async def test_session() -> AsyncGenerator[AsyncSession, None]:
 def test_client() -> TestClient:
     """Create a test client with overridden dependencies."""
     app.dependency_overrides[get_async_session] = override_get_async_session
-    app.dependency_overrides[get_user_db] = override_get_user_db
 
     with TestClient(app) as client:
         yield client
@@ -83,6 +94,36 @@ def test_client() -> TestClient:
     app.dependency_overrides.clear()
 
 
+@pytest_asyncio.fixture(scope="function")
+async def async_client() -> AsyncGenerator[AsyncClient, None]:
+    """Асинхронный клиент без lifespan: запросы идут только в тестовую базу"""
+    app.dependency_overrides[get_async_session] = override_get_async_session
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="function")
+def sql_statements() -> Generator:
+    """Список SQL-запросов, выполненных тестовым engine"""
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", _record)
+    yield statements
+    event.remove(test_engine.sync_engine, "before_cursor_execute", _record)
+
+
+async def auth_headers(user: User) -> dict:
+    """Заголовок с JWT для пользователя"""
+    token = await get_jwt_strategy().write_token(user)
+    return {"Authorization": f"Bearer {token}"}
+
+
 @pytest_asyncio.fixture(scope="function")
 async def test_admin_user(test_session: AsyncSession):
     """Создает тестового админа"""
@@ -0,0 +1,180 @@
+from datetime import datetime, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+
+from app.database.models import Task, TaskStatusEnum, Team, User
+from app.services.fragment_cache import index_cache
+from tests.conftest import TestAsyncSessionLocal, auth_headers, password_helper
+
+
+@pytest_asyncio.fixture(scope="function")
+async def team_members(test_session):
+    """Менеджер с исполнителем своей команды и пользователь чужой команды"""
+    core, other = Team(team_name="Core"), Team(team_name="Other")
+    test_session.add_all([core, other])
+    await test_session.commit()
+
+    def member(name, team, role="user"):
+        return User(email=f"{name}@test.com", username=name, hashed_password=password_helper.hash(name),
+                    role=role, member_of_team=team.team_id)
+
+    manager, executor, stranger = member("manager", core, "manager"), member("executor", core), member("stranger", other)
+    test_session.add_all([manager, executor, stranger])
+    await test_session.commit()
+    return manager, executor, stranger
+
+
+class TestBulkTasks:
+    """Тесты массового создания задач"""
+
+    @pytest.mark.asyncio
+    async def test_permissions(self, async_client, test_regular_user):
+        """Тест: обычный пользователь не создает задачи"""
+        response = await async_client.post("/tasks/bulk", headers=await auth_headers(test_regular_user),
+                                           json={"tasks": [{"task_name": "Release"}]})
+        assert response.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_per_item_errors(self, async_client, team_members):
+        """Тест: чужие и несуществующие исполнители - ошибки своих элементов"""
+        manager, executor, stranger = team_members
+
+        response = await async_client.post("/tasks/bulk", headers=await auth_headers(manager), json={"tasks": [
+            {"task_name": "Plan", "task_executor": executor.id},
+            {"task_name": "Spy", "task_executor": stranger.id},
+            {"task_name": "Ghost", "task_executor": 999},
+            {"task_name": "Backlog", "task_executor": 0},
+        ]})
+
+        assert response.status_code == 200
+        report = response.json()
+        assert (report["created"], report["failed"]) == (2, 2)
+        assert [item["error"] for item in report["results"]] == [
+            None, "Executor is not in your team", "Executor not found", None]
+
+        plan, backlog = report["results"][0]["task"], report["results"][3]["task"]
+        assert plan["task_name"] == "Plan" and plan["task_executor"] == executor.id
+        assert plan["task_checker"] == manager.id and plan["team_id"] == manager.member_of_team
+        assert plan["status"] == "open" and plan["created_at"]
+        assert backlog["task_name"] == "Backlog" and backlog["task_executor"] is None
+
+    @pytest.mark.asyncio
+    async def test_executors_checked_in_one_query(self, async_client, sql_statements, team_members):
+        """Тест: 200 задач - один запрос пользователей, порядок результатов совпадает с запросом"""
+        manager, executor, _ = team_members
+        headers = await auth_headers(manager)
+        await async_client.get("/tasks/my-tasks", headers=headers)
+        sql_statements.clear()
+
+        response = await async_client.post("/tasks/bulk", headers=headers, json={"tasks": [
+            {"task_name": f"Task {i}", "task_executor": executor.id} for i in range(200)]})
+
+        assert response.json()["created"] == 200
+        assert [item["task"]["task_name"] for item in response.json()["results"]] == [f"Task {i}" for i in range(200)]
+        user_selects = [s for s in sql_statements if s.lstrip().startswith("SELECT") and "FROM users" in s]
+        assert len(user_selects) == 1, user_selects
+        assert not any(s.lstrip().startswith("SELECT") and "FROM tasks" in s for s in sql_statements)
+
+        async with TestAsyncSessionLocal() as session:
+            assert await session.scalar(select(func.count()).select_from(Task)) == 200
+
+
+@pytest_asyncio.fixture(scope="function")
+async def sprint_tasks(test_session, team_members, test_admin_user):
+    """Задачи исполнителя, задача команды без исполнителя и задача чужой команды"""
+    manager, executor, stranger = team_members
+    long_ago = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    tasks = [
+        Task(task_name="Own", task_executor=executor.id, team_id=executor.member_of_team, updated_at=long_ago),
+        Task(task_name="Checked", task_checker=executor.id, updated_at=long_ago),
+        Task(task_name="Team", team_id=executor.member_of_team, updated_at=long_ago),
+        Task(task_name="Foreign", task_executor=stranger.id, team_id=stranger.member_of_team, updated_at=long_ago),
+    ]
+    test_session.add_all(tasks)
+    await test_session.commit()
+    return [task.task_id for task in tasks]
+
+
+async def statuses(task_ids):
+    async with TestAsyncSessionLocal() as session:
+        result = await session.execute(select(Task.task_id, Task.status, Task.updated_at)
+                                       .where(Task.task_id.in_(task_ids)).order_by(Task.task_id))
+        return result.all()
+
+
+class TestBulkStatus:
+    """Тесты смены статусов списка задач"""
+
+    @pytest.mark.asyncio
+    async def test_executor_rights(self, async_client, sql_statements, team_members, sprint_tasks):
+        """Тест: исполнитель меняет только свои задачи, одним UPDATE"""
+        _, executor, _ = team_members
+        own, checked, team, foreign = sprint_tasks
+        headers = await auth_headers(executor)
+        await async_client.get("/tasks/my-tasks", headers=headers)
+        sql_statements.clear()
+
+        response = await async_client.patch("/tasks/status", headers=headers, json={"changes": [
+            {"task_id": own, "status": "in_progress"},
+            {"task_id": checked, "status": "completed"},
+            {"task_id": team, "status": "completed"},
+            {"task_id": foreign, "status": "completed"},
+            {"task_id": 999, "status": "completed"},
+        ]})
+
+        assert response.status_code == 200
+        assert response.json() == {"updated": [own, checked], "rejected": [team, foreign, 999]}
+        assert len(sql_statements) == 1, sql_statements
+        assert sql_statements[0].startswith("UPDATE tasks") and "RETURNING" in sql_statements[0]
+
+        rows = await statuses(sprint_tasks)
+        assert [row.status for row in rows] == [TaskStatusEnum.in_progress, TaskStatusEnum.completed,
+                                                TaskStatusEnum.open, TaskStatusEnum.open]
+        assert rows[0].updated_at.year > 2020 and rows[2].updated_at.year == 2020
+
+    @pytest.mark.asyncio
+    async def test_manager_and_admin(self, async_client, team_members, sprint_tasks, test_admin_user):
+        """Тест: менеджер меняет задачи своей команды, администратор - любые"""
+        manager, _, _ = team_members
+        own, checked, team, foreign = sprint_tasks
+        changes = {"changes": [{"task_id": task_id, "status": "completed"} for task_id in sprint_tasks]}
+
+        response = await async_client.patch("/tasks/status", headers=await auth_headers(manager), json=changes)
+        assert response.json() == {"updated": [own, team], "rejected": [checked, foreign]}
+
+        response = await async_client.patch("/tasks/status", headers=await auth_headers(test_admin_user), json=changes)
+        assert response.json() == {"updated": sprint_tasks, "rejected": []}
+
+    @pytest.mark.asyncio
+    async def test_single_status_executor_or_checker(self, async_client, team_members, sprint_tasks,
+                                                     test_admin_user):
+        """Тест: статус одной задачи меняют только исполнитель и проверяющий, роли не расширяют права"""
+        manager, executor, _ = team_members
+        own, checked, team, foreign = sprint_tasks
+
+        headers = await auth_headers(executor)
+        for task_id, expected in [(own, 200), (checked, 200), (team, 403), (foreign, 403), (999, 404)]:
+            response = await async_client.patch(f"/tasks/{task_id}/status?status=completed", headers=headers)
+            assert response.status_code == expected, (task_id, response.text)
+
+        for user in [manager, test_admin_user]:
+            response = await async_client.patch(f"/tasks/{team}/status?status=in_progress",
+                                                headers=await auth_headers(user))
+            assert response.status_code == 403
+
+        rows = await statuses(sprint_tasks)
+        assert [row.status for row in rows] == [TaskStatusEnum.completed, TaskStatusEnum.completed,
+                                                TaskStatusEnum.open, TaskStatusEnum.open]
+
+    @pytest.mark.asyncio
+    async def test_invalidates_index_cache(self, async_client, team_members, sprint_tasks):
+        """Тест: после смены статусов секция задач главной страницы сбрасывается"""
+        _, executor, _ = team_members
+        index_cache.set("tasks", "cached")
+
+        await async_client.patch("/tasks/status", headers=await auth_headers(executor),
+                                 json={"changes": [{"task_id": sprint_tasks[0], "status": "completed"}]})
+
+        assert index_cache.get("tasks") is None
@@ -0,0 +1,109 @@
+import pytest
+import pytest_asyncio
+from datetime import datetime
+
+from app.database.models import Task, Meeting, TaskStatusEnum
+from tests.conftest import auth_headers
+
+
+@pytest_asyncio.fixture(scope="function")
+async def calendar_events(test_session, test_admin_user, test_regular_user):
+    """Задачи и встречи пользователя в мае 2030"""
+    test_session.add_all([
+        Task(task_name="Report", status=TaskStatusEnum.in_progress, task_executor=test_regular_user.id,
+             deadline=datetime(2030, 5, 10, 18, 0)),
+        Task(task_name="Late", task_executor=test_regular_user.id, deadline=datetime(2030, 5, 11, 9, 0)),
+        Task(task_name="Foreign", task_executor=test_admin_user.id, deadline=datetime(2030, 5, 10, 12, 0)),
+        Meeting(meeting_name="Standup", meeting_date=datetime(2030, 5, 10, 9, 30), duration_minutes=15,
+                meeting_admin=test_admin_user.id, participants=[test_regular_user]),
+        Meeting(meeting_name="Private", meeting_date=datetime(2030, 5, 10, 11, 0),
+                meeting_admin=test_admin_user.id, participants=[test_admin_user]),
+    ])
+    await test_session.commit()
+
+
+class TestCalendar:
+    """Тесты выборки событий календаря"""
+
+    @pytest.mark.asyncio
+    async def test_events(self, async_client, calendar_events, test_regular_user):
+        """Тест: задачи и встречи пользователя, отсортированные по началу"""
+        response = await async_client.get(
+            "/calendar/events",
+            params={"start_date": "2030-05-10", "end_date": "2030-05-10"},
+            headers=await auth_headers(test_regular_user),
+        )
+
+        assert response.status_code == 200
+        events = response.json()["events"]
+        assert [event["title"] for event in events] == ["Standup", "Report"]
+        assert events[0]["type"] == "meeting"
+        assert events[0]["end"].startswith("2030-05-10T09:45")
+        assert events[1]["type"] == "task"
+        assert events[1]["status"] == "in_progress"
+
+    @pytest.mark.asyncio
+    async def test_day(self, async_client, calendar_events, test_regular_user):
+        """Тест: события дня с учетом времени внутри дня"""
+        response = await async_client.get("/calendar/day/2030/5/10", headers=await auth_headers(test_regular_user))
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["date"] == "2030-05-10"
+        assert [(event["type"], event["time"]) for event in body["events"]] == [("meeting", "09:30"), ("task", "18:00")]
+        assert body["events"][0]["duration"] == "15min"
+
+    @pytest.mark.asyncio
+    async def test_month(self, async_client, calendar_events, test_regular_user):
+        """Тест: текстовый календарь месяца"""
+        response = await async_client.get("/calendar/month/2030/5", headers=await auth_headers(test_regular_user))
+
+        assert response.status_code == 200
+        calendar_text = response.json()["calendar"]
+        assert "Meeting Standup" in calendar_text
+        assert "Task Late" in calendar_text
+        assert "Private" not in calendar_text
+
+    @pytest.mark.asyncio
+    async def test_month_summary_counts(self, async_client, sql_statements, calendar_events, test_regular_user):
+        """Тест: количество событий по дням считается одним запросом"""
+        headers = await auth_headers(test_regular_user)
+        sql_statements.clear()
+
+        response = await async_client.get("/calendar/month/2030/5/summary", headers=headers)
+
+        assert response.status_code == 200
+        assert len(sql_statements) == 2
+        body = response.json()
+        assert (body["task_count"], body["meeting_count"]) == (2, 1)
+        assert len(body["days"]) == 31
+        assert body["days"][9] == {"date": "2030-05-10", "task_count": 1, "meeting_count": 1}
+        assert body["days"][10] == {"date": "2030-05-11", "task_count": 1, "meeting_count": 0}
+        assert "calendar" not in body
+
+    @pytest.mark.asyncio
+    async def test_month_summary_events_and_text(self, async_client, calendar_events, test_regular_user):
+        """Тест: события дня и текстовый календарь в структурированном ответе"""
+        headers = await auth_headers(test_regular_user)
+
+        summary = await async_client.get("/calendar/month/2030/5/summary",
+                                         params={"include_events": True, "include_text": True}, headers=headers)
+        text = await async_client.get("/calendar/month/2030/5", headers=headers)
+
+        body = summary.json()
+        assert [event["title"] for event in body["days"][9]["events"]] == ["Standup", "Report"]
+        assert body["days"][0]["events"] == []
+        assert body["calendar"] == text.json()["calendar"]
+
+    @pytest.mark.asyncio
+    async def test_month_text_stream(self, async_client, calendar_events, test_regular_user):
+        """Тест: текстовый календарь потоком совпадает с JSON-версией"""
+        headers = await auth_headers(test_regular_user)
+
+        stream = await async_client.get("/calendar/month/2030/5/text", headers=headers)
+        text = await async_client.get("/calendar/month/2030/5", headers=headers)
+
+        assert stream.status_code == 200
+        assert stream.headers["content-type"].startswith("text/plain")
+        assert stream.text.strip() == text.json()["calendar"]
+        assert stream.text.count("No events") == 29
@@ -0,0 +1,105 @@
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+
+from app.database.models import Task, Meeting
+from tests.conftest import auth_headers
+
+
+@pytest_asyncio.fixture(scope="function")
+async def feed_events(test_session, test_admin_user, test_regular_user):
+    """Задача с дедлайном и встреча пользователя"""
+    now = datetime.now()
+    task = Task(task_name="Report, final", task_description="Line one\nLine two",
+                task_executor=test_regular_user.id, deadline=now + timedelta(days=2))
+    meeting = Meeting(meeting_name="Retro", meeting_date=now + timedelta(days=1), duration_minutes=30,
+                      meeting_admin=test_admin_user.id, participants=[test_regular_user])
+    test_session.add_all([task, meeting])
+    await test_session.commit()
+    return {"task": task, "meeting": meeting}
+
+
+@pytest_asyncio.fixture(scope="function")
+async def feed_url(async_client, test_regular_user):
+    """Выпущенный токен подписки"""
+    response = await async_client.post("/calendar/feed-token", headers=await auth_headers(test_regular_user))
+    assert response.status_code == 200
+    return response.json()["feed_url"]
+
+
+class TestCalendarFeed:
+    """Тесты подписки на календарь (.ics)"""
+
+    @pytest.mark.asyncio
+    async def test_feed_body(self, async_client, feed_events, feed_url):
+        """Тест: VEVENT для задачи и встречи, экранирование текста"""
+        response = await async_client.get(feed_url)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/calendar")
+        assert response.headers["etag"]
+        assert response.headers["last-modified"]
+        body = response.text
+        assert body.startswith("BEGIN:VCALENDAR\r\n")
+        assert body.count("BEGIN:VEVENT") == 2
+        assert f"UID:meeting-{feed_events['meeting'].meeting_id}@" in body
+        assert "SUMMARY:Task: Report\\, final (open)" in body
+        assert "DESCRIPTION:Line one\\nLine two" in body
+
+    @pytest.mark.asyncio
+    async def test_not_modified(self, async_client, sql_statements, feed_events, feed_url):
+        """Тест: неизмененная подписка - 304 после одного запроса"""
+        first = await async_client.get(feed_url)
+        sql_statements.clear()
+
+        response = await async_client.get(feed_url, headers={"If-None-Match": first.headers["etag"]})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert len(sql_statements) == 1
+
+
+    @pytest.mark.asyncio
+    async def test_etag_changes(self, async_client, test_session, feed_events, feed_url):
+        """Тест: изменение и удаление события меняют ETag"""
+        etag = (await async_client.get(feed_url)).headers["etag"]
+
+        feed_events["task"].task_name = "Report v2"
+        await test_session.commit()
+        response = await async_client.get(feed_url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert "Report v2" in response.text
+
+        etag = response.headers["etag"]
+        await test_session.delete(feed_events["meeting"])
+        await test_session.commit()
+        response = await async_client.get(feed_url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.text.count("BEGIN:VEVENT") == 1
+
+    @pytest.mark.asyncio
+    async def test_deletion_not_hidden_by_if_modified_since(self, async_client, test_session, feed_events, feed_url):
+        """Тест: после удаления события If-Modified-Since не дает 304 со старой подпиской"""
+        first = await async_client.get(feed_url)
+        await test_session.delete(feed_events["meeting"])
+        await test_session.commit()
+
+        response = await async_client.get(feed_url, headers={"If-Modified-Since": first.headers["last-modified"]})
+        assert response.status_code == 200
+        assert response.text.count("BEGIN:VEVENT") == 1
+
+        response = await async_client.get(feed_url, headers={"If-None-Match": first.headers["etag"],
+                                                             "If-Modified-Since": first.headers["last-modified"]})
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_token_revocation(self, async_client, feed_events, feed_url, test_regular_user):
+        """Тест: отозванный и перевыпущенный токены больше не работают"""
+        headers = await auth_headers(test_regular_user)
+
+        rotated = await async_client.post("/calendar/feed-token", headers=headers)
+        assert (await async_client.get(feed_url)).status_code == 404
+        assert (await async_client.get(rotated.json()["feed_url"])).status_code == 200
+
+        await async_client.delete("/calendar/feed-token", headers=headers)
+        assert (await async_client.get(rotated.json()["feed_url"])).status_code == 404
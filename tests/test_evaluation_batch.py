@@ -0,0 +1,123 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+
+from app.database.models import Evaluation, Task, TaskStatusEnum
+from app.database.repository import evaluation_repo, rating_repo
+from tests.conftest import TestAsyncSessionLocal, auth_headers
+
+
+@pytest_asyncio.fixture(scope="function")
+async def sprint(test_session, test_admin_user, test_regular_user):
+    """Завершенные задачи обычного пользователя, проверяющий - администратор, и одна открытая"""
+    tasks = [
+        Task(task_name=f"Done {i}", status=TaskStatusEnum.completed,
+             task_executor=test_regular_user.id, task_checker=test_admin_user.id)
+        for i in range(3)
+    ]
+    tasks.append(Task(task_name="Open", task_executor=test_regular_user.id, task_checker=test_admin_user.id))
+    test_session.add_all(tasks)
+    await test_session.commit()
+    return [task.task_id for task in tasks]
+
+
+async def rating(user_id):
+    async with TestAsyncSessionLocal() as session:
+        return await evaluation_repo.get_user_average_rating(session, user_id, 30)
+
+
+class TestEvaluationUpsert:
+    """Тесты оценки задач с ON CONFLICT"""
+
+    @pytest.mark.asyncio
+    async def test_single_duplicate(self, async_client, sql_statements, sprint, test_admin_user):
+        """Тест: повторная оценка - 400 без отдельного запроса проверки дублей"""
+        headers = await auth_headers(test_admin_user)
+        await async_client.get("/evaluations/my-evaluations", headers=headers)
+        sql_statements.clear()
+
+        response = await async_client.post("/evaluations/", headers=headers,
+                                           json={"task_id": sprint[0], "evaluation_value": 4})
+        assert response.status_code == 200
+        assert response.json()["evaluation_value"] == 4
+        assert not any(s.lstrip().startswith("SELECT") and "FROM evaluations" in s and "JOIN" not in s
+                       for s in sql_statements), sql_statements
+
+        response = await async_client.post("/evaluations/", headers=headers,
+                                           json={"task_id": sprint[0], "evaluation_value": 5})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Task already evaluated by this user"
+
+    @pytest.mark.asyncio
+    async def test_single_validation(self, async_client, sprint, test_admin_user):
+        """Тест: несуществующая, незавершенная задача и оценка вне диапазона"""
+        headers = await auth_headers(test_admin_user)
+
+        for task_id, value, code in [(999, 4, 404), (sprint[3], 4, 400), (sprint[0], 9, 400)]:
+            response = await async_client.post("/evaluations/", headers=headers,
+                                               json={"task_id": task_id, "evaluation_value": value})
+            assert response.status_code == code
+
+    @pytest.mark.asyncio
+    async def test_batch_statements(self, async_client, sql_statements, sprint, test_admin_user, test_regular_user):
+        """Тест: пачка - проверка, upsert оценок и по одному upsert сводных таблиц"""
+        headers = await auth_headers(test_admin_user)
+        await async_client.get("/evaluations/my-evaluations", headers=headers)
+        sql_statements.clear()
+
+        response = await async_client.post("/evaluations/batch", headers=headers, json={"evaluations": [
+            {"task_id": sprint[0], "evaluation_value": 5},
+            {"task_id": sprint[1], "evaluation_value": 3},
+            {"task_id": sprint[1], "evaluation_value": 1},
+            {"task_id": sprint[3], "evaluation_value": 4},
+            {"task_id": 999, "evaluation_value": 4},
+        ]})
+
+        report = response.json()
+        assert (report["created"], report["updated"], report["skipped"], report["failed"]) == (2, 0, 0, 3)
+        assert [row["error"] for row in report["results"]] == [
+            None, None, "Duplicate task in batch", "Can only evaluate completed tasks", "Task not found"]
+        assert len(sql_statements) == 4, sql_statements
+        assert "ON CONFLICT" in sql_statements[1]
+
+        assert await rating(test_regular_user.id) == {"average_rating": 4, "total_evaluations": 2, "period_days": 30}
+
+    @pytest.mark.asyncio
+    async def test_batch_skip_and_update(self, async_client, sprint, test_admin_user, test_regular_user):
+        """Тест: skip не меняет существующие оценки, update перезаписывает и правит сводные суммы"""
+        headers = await auth_headers(test_admin_user)
+        await async_client.post("/evaluations/", headers=headers, json={"task_id": sprint[0], "evaluation_value": 5})
+
+        batch = [{"task_id": sprint[0], "evaluation_value": 1, "evaluation_comment": "redo"},
+                 {"task_id": sprint[1], "evaluation_value": 3}]
+        response = await async_client.post("/evaluations/batch", headers=headers, json={"evaluations": batch})
+        assert [row["result"] for row in response.json()["results"]] == ["skipped", "created"]
+        assert await rating(test_regular_user.id) == {"average_rating": 4, "total_evaluations": 2, "period_days": 30}
+
+        batch[1]["evaluation_value"] = 3
+        response = await async_client.post("/evaluations/batch", headers=headers,
+                                           json={"evaluations": batch, "on_conflict": "update"})
+        results = response.json()["results"]
+        assert [row["result"] for row in results] == ["updated", "updated"]
+        assert results[0]["evaluation"]["evaluation_comment"] == "redo"
+        assert await rating(test_regular_user.id) == {"average_rating": 2, "total_evaluations": 2, "period_days": 30}
+
+        async with TestAsyncSessionLocal() as session:
+            assert await rating_repo.get_task_average_rating(session, sprint[0]) == 1
+            values = await session.scalars(select(Evaluation.evaluation_value).order_by(Evaluation.task_id))
+            assert list(values) == [1, 3]
+
+    @pytest.mark.asyncio
+    async def test_batch_checker_only(self, async_client, sprint, test_session, test_admin_user):
+        """Тест: проверяющий чужой задачи получает ошибку по этой задаче"""
+        task = await test_session.get(Task, sprint[2])
+        task.task_checker = None
+        await test_session.commit()
+        test_admin_user.role = "manager"
+        await test_session.commit()
+
+        response = await async_client.post("/evaluations/batch", headers=await auth_headers(test_admin_user),
+                                           json={"evaluations": [{"task_id": sprint[0], "evaluation_value": 4},
+                                                                 {"task_id": sprint[2], "evaluation_value": 4}]})
+
+        assert [row["error"] for row in response.json()["results"]] == [None, "Not task checker"]
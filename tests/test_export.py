@@ -0,0 +1,137 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+
+from app.database.models import Evaluation, Meeting, Task, Team, User
+from app.database.repository import task_repo
+from app.schemas import TaskRead
+from app.services.export import stream_export
+from tests.conftest import auth_headers, password_helper, test_engine
+
+
+@pytest_asyncio.fixture(scope="function")
+async def export_data(test_session, test_admin_user, test_regular_user):
+    """Две команды с задачами, оценка и встреча"""
+    core, other = Team(team_name="Core"), Team(team_name="Other")
+    test_session.add_all([core, other])
+    await test_session.commit()
+
+    manager = User(email="manager@test.com", username="manager", hashed_password=password_helper.hash("manager"),
+                   role="manager", member_of_team=core.team_id)
+    test_regular_user.member_of_team = core.team_id
+    test_session.add(manager)
+    await test_session.commit()
+
+    tasks = [
+        Task(task_name="Mine", task_executor=test_regular_user.id, team_id=core.team_id),
+        Task(task_name="Team", task_executor=manager.id, team_id=core.team_id),
+        Task(task_name="Foreign", task_executor=test_admin_user.id, team_id=other.team_id),
+    ]
+    test_session.add_all(tasks)
+    await test_session.commit()
+
+    test_session.add_all([
+        Evaluation(evaluation_value=5, task_id=tasks[0].task_id, evaluator_id=manager.id, evaluation_comment="a, \"b\""),
+        Evaluation(evaluation_value=3, task_id=tasks[2].task_id, evaluator_id=test_admin_user.id),
+        Meeting(meeting_name="Sync", meeting_date=datetime(2030, 1, 1, 10, 0), meeting_admin=test_admin_user.id,
+                participants=[test_admin_user, test_regular_user]),
+        Meeting(meeting_name="Board", meeting_date=datetime(2030, 1, 2, 10, 0), meeting_admin=test_admin_user.id,
+                participants=[test_admin_user]),
+    ])
+    await test_session.commit()
+    return manager
+
+
+def ndjson(response) -> list:
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+class TestExport:
+    """Тесты потоковой выгрузки"""
+
+    @pytest.mark.asyncio
+    async def test_tasks_ndjson_scoped_by_role(self, async_client, export_data, test_admin_user, test_regular_user):
+        """Тест: администратор выгружает все задачи, менеджер - своей команды, пользователь - свои"""
+        response = await async_client.get("/export/tasks", headers=await auth_headers(test_admin_user))
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert response.headers["content-disposition"] == 'attachment; filename="tasks.ndjson"'
+        assert [task["task_name"] for task in ndjson(response)] == ["Mine", "Team", "Foreign"]
+
+        response = await async_client.get("/export/tasks", headers=await auth_headers(export_data))
+        assert [task["task_name"] for task in ndjson(response)] == ["Mine", "Team"]
+
+        headers = await auth_headers(test_regular_user)
+        response = await async_client.get("/export/tasks", headers=headers)
+        assert [task["task_name"] for task in ndjson(response)] == ["Mine"]
+
+        response = await async_client.get("/export/tasks", headers=headers, params={"team_id": 999})
+        assert ndjson(response) == []
+
+    @pytest.mark.asyncio
+    async def test_evaluations_csv(self, async_client, export_data, test_admin_user, test_regular_user):
+        """Тест: CSV с заголовком и экранированием, пользователь видит оценки своих задач"""
+        response = await async_client.get("/export/evaluations", headers=await auth_headers(test_admin_user),
+                                          params={"format": "csv", "user_id": export_data.id})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 1
+        assert rows[0]["evaluation_value"] == "5"
+        assert rows[0]["evaluation_comment"] == 'a, "b"'
+
+        response = await async_client.get("/export/evaluations", headers=await auth_headers(test_regular_user))
+        assert [evaluation["evaluation_value"] for evaluation in ndjson(response)] == [5]
+
+    @pytest.mark.asyncio
+    async def test_team_roles_scoped_to_team(self, async_client, test_session, export_data, test_admin_user):
+        """Тест: менеджер выгружает оценки только своей команды, менеджер без команды получает 403"""
+        team_task = await test_session.scalar(select(Task.task_id).where(Task.task_name == "Team"))
+        test_session.add(Evaluation(evaluation_value=4, task_id=team_task, evaluator_id=test_admin_user.id))
+        await test_session.commit()
+
+        response = await async_client.get("/export/evaluations", headers=await auth_headers(export_data))
+        assert [evaluation["evaluation_value"] for evaluation in ndjson(response)] == [5, 4]
+
+        response = await async_client.get("/export/evaluations", headers=await auth_headers(export_data),
+                                          params={"user_id": test_admin_user.id})
+        assert [evaluation["evaluation_value"] for evaluation in ndjson(response)] == [4]
+
+        loner = User(email="loner@test.com", username="loner", hashed_password=password_helper.hash("loner"),
+                     role="team_admin")
+        test_session.add(loner)
+        await test_session.commit()
+        headers = await auth_headers(loner)
+        for path in ["/export/tasks", "/export/evaluations"]:
+            response = await async_client.get(path, headers=headers)
+            assert response.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_meetings(self, async_client, export_data, test_admin_user, test_regular_user):
+        """Тест: встречи фильтруются по дате, пользователь видит только свои"""
+        response = await async_client.get("/export/meetings", headers=await auth_headers(test_admin_user),
+                                          params={"start_date": "2030-01-02T00:00:00"})
+        assert [meeting["meeting_name"] for meeting in ndjson(response)] == ["Board"]
+
+        response = await async_client.get("/export/meetings", headers=await auth_headers(test_regular_user))
+        assert [meeting["meeting_name"] for meeting in ndjson(response)] == ["Sync"]
+
+    @pytest.mark.asyncio
+    async def test_invalid_format(self, async_client, test_admin_user):
+        """Тест: неизвестный формат - 422"""
+        response = await async_client.get("/export/tasks", headers=await auth_headers(test_admin_user),
+                                          params={"format": "xml"})
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_stream_in_batches(self, export_data):
+        """Тест: строки читаются пачками, каждая пачка - отдельный кусок ответа"""
+        chunks = [chunk async for chunk in stream_export(test_engine, task_repo.export_query(), TaskRead, "ndjson",
+                                                         batch_size=2)]
+
+        assert [chunk.count("\n") for chunk in chunks] == [2, 1]
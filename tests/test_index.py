@@ -0,0 +1,97 @@
+import pytest
+from datetime import date, datetime, timedelta
+
+from app.database.models import Task, Team, Meeting, TaskStatusEnum
+from app.routers.index import generate_calendar_weeks, month_grid
+from app.services.fragment_cache import FragmentCache
+
+
+class TestMonthGrid:
+    """Тесты сетки месяца"""
+
+    def test_grid_memoized(self):
+        """Тест: сетка месяца строится один раз на (год, месяц)"""
+        month_grid.cache_clear()
+
+        first = month_grid(2030, 5)
+        second = month_grid(2030, 5)
+
+        assert first is second
+        assert month_grid.cache_info().hits == 1
+        assert all(len(week) == 7 for week in first)
+        assert first[0][0] == (29, 4)
+
+    def test_weeks_with_meetings(self):
+        """Тест: количество встреч и текущий день в сетке"""
+        counts = {date(2030, 5, 10): 2}
+
+        weeks = generate_calendar_weeks(2030, 5, set(counts), counts, 10)
+
+        days = {(day["day"], day["month"]): day for week in weeks for day in week}
+        assert days[(10, 5)]["meeting_count"] == 2
+        assert days[(10, 5)]["is_today"] is True
+        assert days[(11, 5)]["has_meeting"] is False
+        assert days[(29, 4)]["has_meeting"] is False
+
+
+class TestFragmentCache:
+    """Тесты кэша фрагментов"""
+
+    def test_ttl_and_invalidate(self):
+        """Тест: устаревание по TTL и сброс секции со всеми ключами"""
+        cache = FragmentCache(ttl=60)
+        cache.set("users", "<p>users</p>")
+        cache.set("calendar", "<p>may</p>", (2030, 5, 10))
+
+        assert cache.get("users") == "<p>users</p>"
+        assert cache.get("calendar", (2030, 5, 10)) == "<p>may</p>"
+
+        cache.invalidate(["calendar"])
+        assert cache.get("calendar", (2030, 5, 10)) is None
+        assert cache.get("users") == "<p>users</p>"
+
+        expired = FragmentCache(ttl=-1)
+        expired.set("users", "<p>users</p>")
+        assert expired.get("users") is None
+
+
+class TestIndexPage:
+    """Тесты главной страницы"""
+
+    @pytest.mark.asyncio
+    async def test_sections_rendered(self, async_client, test_session, test_admin_user, test_regular_user):
+        """Тест: секции показывают имена связанных сущностей и количество оценок"""
+        team = Team(team_name="Core", team_admin=test_admin_user.id)
+        test_session.add(team)
+        await test_session.commit()
+        test_regular_user.member_of_team = team.team_id
+        task = Task(task_name="Index task", status=TaskStatusEnum.completed, task_executor=test_regular_user.id,
+                    task_checker=test_admin_user.id, team_id=team.team_id)
+        test_session.add(task)
+        await test_session.commit()
+
+        response = await async_client.get("/")
+
+        assert response.status_code == 200
+        assert "<td>Core</td>" in response.text
+        assert f"<td>{test_regular_user.username}</td>" in response.text
+        assert "Index task" in response.text
+
+    @pytest.mark.asyncio
+    async def test_cached_until_write(self, async_client, sql_statements, test_session, test_admin_user):
+        """Тест: повторный заход без запросов, запись сбрасывает секцию"""
+        await async_client.get("/")
+        sql_statements.clear()
+
+        response = await async_client.get("/")
+        assert response.status_code == 200
+        assert sql_statements == []
+
+        test_session.add(Meeting(meeting_name="Fresh sync", meeting_date=datetime.now() + timedelta(minutes=5),
+                                 meeting_admin=test_admin_user.id))
+        await test_session.commit()
+        sql_statements.clear()
+
+        response = await async_client.get("/")
+        assert "Fresh sync" in response.text
+        assert len(sql_statements) == 2
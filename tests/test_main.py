@@ -1,4 +1,6 @@
+import os
 from fastapi.testclient import TestClient
+import main
 from main import app
 
 
@@ -44,4 +46,35 @@ class TestBasicFunctionality:
         """Тест что OpenAPI schema генерируется"""
         client = TestClient(app)
         response = client.get("/openapi.json")
-        assert response.status_code == 200
\ No newline at end of file
+        assert response.status_code == 200
+
+
+class TestLauncher:
+    """Тесты команд запуска сервера"""
+
+    def test_serve_production_options(self, monkeypatch):
+        """Тест: serve - несколько воркеров, uvloop и httptools, без перезагрузки"""
+        calls = []
+        monkeypatch.setattr(main.uvicorn, "run", lambda app, **options: calls.append(options))
+
+        main.main(["serve", "--workers", "4"])
+
+        options = calls[0]
+        assert options["workers"] == 4
+        assert options["loop"] == "uvloop" and options["http"] == "httptools"
+        assert options["timeout_graceful_shutdown"] == main.WEB_GRACEFUL_TIMEOUT
+        assert "reload" not in options
+
+    def test_dev_reload(self, monkeypatch):
+        """Тест: без команды - режим разработки с перезагрузкой"""
+        calls = []
+        monkeypatch.setattr(main.uvicorn, "run", lambda app, **options: calls.append(options))
+
+        main.main([])
+        main.main(["dev"])
+
+        assert [options["reload"] for options in calls] == [True, True]
+
+    def test_default_workers(self):
+        """Тест: по умолчанию воркеров по числу ядер"""
+        assert main.server_options()["workers"] == (main.WEB_WORKERS or os.cpu_count() or 1)
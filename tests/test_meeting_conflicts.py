@@ -0,0 +1,80 @@
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+
+from app.database.models import Meeting
+from app.database.repository import meeting_repo
+from tests.conftest import auth_headers
+
+
+START = datetime(2030, 5, 10, 10, 0)
+
+
+@pytest_asyncio.fixture(scope="function")
+async def booked_meeting(test_session, test_admin_user, test_regular_user):
+    """Встреча 10:00-11:00 обоих пользователей"""
+    meeting = Meeting(meeting_name="Planning", meeting_date=START, duration_minutes=60,
+                      meeting_admin=test_admin_user.id, participants=[test_admin_user, test_regular_user])
+    test_session.add(meeting)
+    await test_session.commit()
+    return meeting
+
+
+class TestMeetingConflicts:
+    """Тесты поиска пересекающихся встреч в базе"""
+
+    @pytest.mark.asyncio
+    async def test_meeting_end_maintained(self, test_session, booked_meeting):
+        """Тест: конец встречи пересчитывается при изменении длительности"""
+        assert booked_meeting.meeting_end == START + timedelta(minutes=60)
+
+        booked_meeting.duration_minutes = 90
+        await test_session.commit()
+        assert booked_meeting.meeting_end == START + timedelta(minutes=90)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("offset, duration, conflict", [
+        (timedelta(minutes=30), 60, True),
+        (timedelta(minutes=-30), 45, True),
+        (timedelta(minutes=60), 30, False),
+        (timedelta(minutes=-30), 30, False),
+    ])
+    async def test_overlap(self, test_session, booked_meeting, test_regular_user, offset, duration, conflict):
+        """Тест: пересечение интервалов, смежные встречи не конфликтуют"""
+        conflicts = await meeting_repo.check_meeting_conflicts(
+            test_session, [test_regular_user.id], START + offset, duration)
+
+        assert bool(conflicts) is conflict
+        if conflict:
+            assert conflicts[0].meeting_id == booked_meeting.meeting_id
+            assert conflicts[0].user_id == test_regular_user.id
+
+    @pytest.mark.asyncio
+    async def test_conflicting_users_only(self, test_session, booked_meeting, test_admin_user, test_regular_user):
+        """Тест: возвращаются только участники из проверяемого списка"""
+        conflicts = await meeting_repo.check_meeting_conflicts(test_session, [test_regular_user.id], START, 60)
+        assert [conflict.user_id for conflict in conflicts] == [test_regular_user.id]
+
+        conflicts = await meeting_repo.check_meeting_conflicts(
+            test_session, [test_admin_user.id, test_regular_user.id], START, 60)
+        assert {conflict.user_id for conflict in conflicts} == {test_admin_user.id, test_regular_user.id}
+
+    @pytest.mark.asyncio
+    async def test_exclude_meeting(self, test_session, booked_meeting, test_regular_user):
+        """Тест: обновляемая встреча не конфликтует сама с собой"""
+        conflicts = await meeting_repo.check_meeting_conflicts(
+            test_session, [test_regular_user.id], START, 60, booked_meeting.meeting_id)
+        assert conflicts == []
+
+    @pytest.mark.asyncio
+    async def test_create_meeting_conflict(self, async_client, booked_meeting, test_admin_user, test_regular_user):
+        """Тест: POST /meetings отклоняет двойное бронирование"""
+        response = await async_client.post("/meetings/", headers=await auth_headers(test_admin_user), json={
+            "meeting_name": "Overlap",
+            "meeting_date": (START + timedelta(minutes=15)).isoformat(),
+            "duration_minutes": 30,
+            "participant_ids": [test_regular_user.id],
+        })
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "User testuser has conflict meeting: Planning"
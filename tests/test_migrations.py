@@ -0,0 +1,34 @@
+from pathlib import Path
+
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+
+from app.database.database import Base
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class TestMigrations:
+    """Тесты цепочки миграций Alembic"""
+
+    def test_single_linear_head(self):
+        """Тест: цепочка без ветвлений"""
+        script = ScriptDirectory.from_config(Config(str(ROOT / "alembic.ini")))
+
+        assert len(script.get_heads()) == 1
+        revisions = list(script.walk_revisions())
+        assert revisions[-1].down_revision is None
+        assert all(not isinstance(revision.down_revision, tuple) for revision in revisions)
+
+    def test_model_indexes_migrated(self):
+        """Тест: каждый индекс моделей создается миграцией"""
+        sources = "".join(path.read_text(encoding="utf-8") for path in (ROOT / "alembic" / "versions").glob("*.py"))
+
+        missing = [
+            index.name
+            for table in Base.metadata.tables.values()
+            for index in table.indexes
+            if f'"{index.name}"' not in sources
+        ]
+        assert missing == []
@@ -0,0 +1,147 @@
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+
+from app.database.models import Task, Meeting, Evaluation, TaskStatusEnum
+from app.database.pagination import (encode_cursor, decode_cursor, InvalidCursorError, MAX_PAGE_SIZE)
+from app.schemas import Page, TaskRead
+from app.services.fast_json import page_adapter, page_response
+from tests.conftest import auth_headers
+
+
+class TestCursor:
+    """Тесты кодирования курсора"""
+
+    def test_roundtrip(self):
+        """Тест: курсор восстанавливает значения ключей"""
+        created = datetime(2025, 1, 2, 3, 4, 5)
+        cursor = encode_cursor([created, 42])
+
+        assert decode_cursor(cursor, [Evaluation.created_at, Evaluation.evaluation_id]) == [created, 42]
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor([1, 2]), encode_cursor(["x"])])
+    def test_invalid_cursor(self, cursor):
+        """Тест: поврежденный или чужой курсор отклоняется"""
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor, [Task.task_id])
+
+
+@pytest_asyncio.fixture(scope="function")
+async def many_tasks(test_session, test_admin_user, test_regular_user):
+    """Семь задач обычного пользователя с оценками админа"""
+    tasks = [
+        Task(task_name=f"Task {i}", status=TaskStatusEnum.completed,
+             task_executor=test_regular_user.id, task_checker=test_admin_user.id)
+        for i in range(7)
+    ]
+    test_session.add_all(tasks)
+    await test_session.commit()
+
+    start = datetime(2025, 1, 1)
+    test_session.add_all([
+        Evaluation(evaluation_value=3, task_id=task.task_id, evaluator_id=test_admin_user.id,
+                   created_at=start + timedelta(days=i % 3))
+        for i, task in enumerate(tasks)
+    ])
+    test_session.add_all([
+        Meeting(meeting_name=f"Meeting {i}", meeting_date=start + timedelta(hours=7 - i),
+                participants=[test_regular_user])
+        for i in range(7)
+    ])
+    await test_session.commit()
+    return tasks
+
+
+async def collect_pages(client, url, headers, limit):
+    """Пройти все страницы списка, вернуть элементы и число страниц"""
+    items, pages, cursor = [], 0, None
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get(url, params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        items.extend(body["items"])
+        pages += 1
+        cursor = body["next_cursor"]
+        if not cursor:
+            return items, pages
+
+
+class TestKeysetPagination:
+    """Тесты курсорной пагинации списков"""
+
+    @pytest.mark.asyncio
+    async def test_tasks_pages(self, async_client, many_tasks, test_admin_user):
+        """Тест: страницы задач идут по возрастанию id без пропусков и повторов"""
+        headers = await auth_headers(test_admin_user)
+
+        items, pages = await collect_pages(async_client, "/tasks/", headers, limit=3)
+
+        assert [item["task_id"] for item in items] == sorted(task.task_id for task in many_tasks)
+        assert pages == 3
+
+    @pytest.mark.asyncio
+    async def test_my_evaluations_newest_first(self, async_client, many_tasks, test_regular_user):
+        """Тест: составной ключ (created_at, id) по убыванию"""
+        headers = await auth_headers(test_regular_user)
+
+        items, _ = await collect_pages(async_client, "/evaluations/my-evaluations", headers, limit=2)
+
+        keys = [(item["created_at"], item["evaluation_id"]) for item in items]
+        assert len(keys) == 7
+        assert keys == sorted(keys, reverse=True)
+
+    @pytest.mark.asyncio
+    async def test_my_meetings_by_date(self, async_client, many_tasks, test_regular_user):
+        """Тест: встречи упорядочены по дате"""
+        headers = await auth_headers(test_regular_user)
+
+        items, _ = await collect_pages(async_client, "/meetings/my-meetings", headers, limit=4)
+
+        dates = [item["meeting_date"] for item in items]
+        assert len(dates) == 7
+        assert dates == sorted(dates)
+
+    @pytest.mark.asyncio
+    async def test_page_size_limit(self, async_client, test_admin_user):
+        """Тест: размер страницы ограничен на сервере"""
+        headers = await auth_headers(test_admin_user)
+
+        response = await async_client.get("/tasks/", params={"limit": MAX_PAGE_SIZE + 1}, headers=headers)
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor_returns_400(self, async_client, test_admin_user):
+        """Тест: поврежденный курсор - 400"""
+        headers = await auth_headers(test_admin_user)
+
+        response = await async_client.get("/tasks/", params={"cursor": "garbage"}, headers=headers)
+        assert response.status_code == 400
+
+
+class TestFastJSON:
+    """Тесты быстрого пути ответа списков"""
+
+    def test_same_body_as_models(self):
+        """Тест: ORM-объекты и строки-отображения дают тот же JSON, что и Pydantic-модели"""
+        tasks = [Task(task_id=i, task_name=f"Задача {i}", status=TaskStatusEnum.open, team_id=1,
+                      created_at=datetime(2030, 1, 1)) for i in range(3)]
+        mappings = [{field: getattr(task, field) for field in TaskRead.model_fields} for task in tasks]
+        expected = Page[TaskRead](items=[TaskRead.model_validate(task) for task in tasks], next_cursor="next")
+
+        assert page_response(TaskRead, tasks, "next").body == expected.model_dump_json().encode()
+        assert page_response(TaskRead, mappings, "next").body == expected.model_dump_json().encode()
+        assert page_adapter(TaskRead) is page_adapter(TaskRead)
+
+    @pytest.mark.asyncio
+    async def test_endpoint_schema(self, async_client, many_tasks, test_admin_user):
+        """Тест: ответ - JSON, схема ответа в OpenAPI прежняя"""
+        response = await async_client.get("/tasks/", params={"limit": 1}, headers=await auth_headers(test_admin_user))
+        assert response.headers["content-type"] == "application/json"
+        assert set(response.json()) == {"items", "next_cursor"}
+
+        openapi = (await async_client.get("/openapi.json")).json()
+        schema = openapi["paths"]["/tasks/"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+        assert schema["$ref"].endswith("Page_TaskRead_")
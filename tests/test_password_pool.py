@@ -0,0 +1,148 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.password_pool import PasswordPool, PasswordPoolBusy, password_pool
+from tests.conftest import auth_headers, password_helper
+
+
+class BlockingHelper:
+    """Хеширование, которое ждет сигнала из теста"""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def hash(self, password):
+        self.release.wait(5)
+        return f"hashed:{password}"
+
+
+@pytest.fixture(scope="function")
+def pool_stats():
+    password_pool.reset()
+    yield password_pool
+    password_pool.reset()
+
+
+class TestPasswordPool:
+    """Тесты пула хеширования паролей"""
+
+    @pytest.mark.asyncio
+    async def test_event_loop_not_blocked(self):
+        """Тест: пока идут хеширования, event loop продолжает обрабатывать задачи"""
+        pool = PasswordPool(workers=2)
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.005)
+
+        task = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        hashes = await asyncio.gather(*(pool.hash(f"secret{i}") for i in range(4)))
+        elapsed = time.perf_counter() - started
+        task.cancel()
+
+        assert all(password_helper.verify_and_update(f"secret{i}", h)[0] for i, h in enumerate(hashes))
+        longest_gap = max(b - a for a, b in zip(ticks, ticks[1:]))
+        assert longest_gap < elapsed / 2
+
+    def test_slots_bound_to_running_loop(self):
+        """Тест: семафор создается в работающем loop, пул переживает смену loop"""
+        pool = PasswordPool(workers=1, helper=BlockingHelper())
+        pool.helper.release.set()
+        assert pool._slots is None
+
+        assert asyncio.run(pool.hash("a")) == "hashed:a"
+        first = pool._slots
+        assert asyncio.run(pool.hash("b")) == "hashed:b"
+        assert pool._slots is not first
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit_and_queue(self):
+        """Тест: не больше workers операций сразу, лишние сверх очереди отклоняются"""
+        helper = BlockingHelper()
+        pool = PasswordPool(workers=1, max_queue=1, helper=helper)
+
+        first = asyncio.create_task(pool.hash("a"))
+        second = asyncio.create_task(pool.hash("b"))
+        await asyncio.sleep(0.05)
+
+        assert (pool.in_flight, pool.waiting) == (1, 1)
+        with pytest.raises(PasswordPoolBusy):
+            await pool.hash("c")
+
+        helper.release.set()
+        assert await asyncio.gather(first, second) == ["hashed:a", "hashed:b"]
+
+        snapshot = pool.snapshot()
+        assert snapshot["operations"] == 2
+        assert snapshot["rejected"] == 1
+        assert snapshot["max_waiting"] == 1
+        assert snapshot["in_flight"] == snapshot["waiting"] == 0
+
+
+class TestPasswordRoutes:
+    """Тесты маршрутов fastapi-users через пул"""
+
+    @pytest.mark.asyncio
+    async def test_login(self, async_client, pool_stats, test_regular_user):
+        """Тест: логин проверяет пароль в пуле"""
+        response = await async_client.post("/auth/jwt/login", data={"username": "user@test.com",
+                                                                     "password": "user123"})
+        assert response.status_code == 200
+
+        response = await async_client.post("/auth/jwt/login", data={"username": "user@test.com",
+                                                                     "password": "wrong"})
+        assert response.status_code == 400
+
+        response = await async_client.post("/auth/jwt/login", data={"username": "nobody@test.com",
+                                                                     "password": "user123"})
+        assert response.status_code == 400
+        assert pool_stats.snapshot()["operations"] == 3
+
+    @pytest.mark.asyncio
+    async def test_register_and_change_password(self, async_client, pool_stats):
+        """Тест: регистрация и смена пароля хешируют в пуле"""
+        response = await async_client.post("/auth/register", json={"email": "new@test.com",
+                                                                    "password": "first-pass",
+                                                                    "username": "newbie"})
+        assert response.status_code == 201
+
+        response = await async_client.post("/auth/jwt/login", data={"username": "new@test.com",
+                                                                     "password": "first-pass"})
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        response = await async_client.patch("/users/me", headers=headers, json={"password": "second-pass"})
+        assert response.status_code == 200
+
+        response = await async_client.post("/auth/jwt/login", data={"username": "new@test.com",
+                                                                     "password": "second-pass"})
+        assert response.status_code == 200
+        assert pool_stats.snapshot()["operations"] == 4
+
+    @pytest.mark.asyncio
+    async def test_busy_returns_503(self, async_client, monkeypatch):
+        """Тест: переполненная очередь - 503 с Retry-After"""
+        async def busy(password):
+            raise PasswordPoolBusy()
+
+        monkeypatch.setattr(password_pool, "hash", busy)
+        response = await async_client.post("/auth/register", json={"email": "new@test.com",
+                                                                    "password": "first-pass",
+                                                                    "username": "newbie"})
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+    @pytest.mark.asyncio
+    async def test_diagnostics_admin_only(self, async_client, pool_stats, test_admin_user, test_regular_user):
+        """Тест: метрики пула доступны только администратору"""
+        response = await async_client.get("/diagnostics/passwords", headers=await auth_headers(test_regular_user))
+        assert response.status_code == 403
+
+        response = await async_client.get("/diagnostics/passwords", headers=await auth_headers(test_admin_user))
+        assert response.status_code == 200
+        assert response.json()["workers"] == password_pool.workers
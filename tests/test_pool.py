@@ -0,0 +1,122 @@
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database.pool import InstrumentedAsyncPool, PoolMetrics, pool_status
+from tests.conftest import auth_headers
+
+
+class TestPoolMetrics:
+    """Тесты метрик ожидания соединения"""
+
+    def test_histogram_is_cumulative(self):
+        """Тест накопительной гистограммы"""
+        metrics = PoolMetrics(buckets=(0.01, 0.1, 1.0))
+        for wait in (0.0, 0.005, 0.05, 0.5, 2.0):
+            metrics.observe(wait)
+
+        assert metrics.histogram() == {"0.01": 2, "0.1": 3, "1.0": 4, "+Inf": 5}
+        assert metrics.checkouts == 5
+        assert metrics.wait_max == 2.0
+
+    def test_quantile(self):
+        """Тест оценки квантиля по границам корзин"""
+        metrics = PoolMetrics(buckets=(0.01, 0.1, 1.0))
+        assert metrics.quantile(0.95) is None
+
+        for _ in range(95):
+            metrics.observe(0.001)
+        for _ in range(5):
+            metrics.observe(0.5)
+
+        assert metrics.quantile(0.5) == 0.01
+        assert metrics.quantile(0.95) == 0.01
+        assert metrics.quantile(0.99) == 1.0
+
+    def test_timeouts_counted_separately(self):
+        """Тест учета таймаутов"""
+        metrics = PoolMetrics()
+        metrics.observe(0.002)
+        metrics.observe(1.0, timed_out=True)
+
+        snapshot = metrics.snapshot()
+        assert snapshot["checkouts"] == 1
+        assert snapshot["timeouts"] == 1
+        assert snapshot["wait_seconds_avg"] == pytest.approx(0.501)
+
+
+class TestInstrumentedAsyncPool:
+    """Тесты пула с замером ожидания"""
+
+    @pytest.mark.asyncio
+    async def test_checkouts_recorded(self):
+        """Тест учета выдачи соединений и состояния пула"""
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=InstrumentedAsyncPool, pool_size=2)
+        try:
+            for _ in range(3):
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+
+            status = pool_status(engine.pool)
+            assert status["pool"] == "InstrumentedAsyncPool"
+            assert status["size"] == 2
+            assert status["checked_out"] == 0
+            assert status["metrics"]["checkouts"] == 3
+            assert status["metrics"]["timeouts"] == 0
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_timeout_recorded(self):
+        """Тест учета таймаута при исчерпании пула"""
+        engine = create_async_engine(
+            "sqlite+aiosqlite://", poolclass=InstrumentedAsyncPool,
+            pool_size=1, max_overflow=0, pool_timeout=0.05,
+        )
+        try:
+            async with engine.connect():
+                with pytest.raises(exc.TimeoutError):
+                    async with engine.connect():
+                        pass
+
+            snapshot = engine.pool.metrics.snapshot()
+            assert snapshot["checkouts"] == 1
+            assert snapshot["timeouts"] == 1
+            assert snapshot["wait_seconds_max"] >= 0.05
+        finally:
+            await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_metrics_survive_dispose(self):
+        """Тест сохранения метрик после пересоздания пула"""
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=InstrumentedAsyncPool)
+        try:
+            async with engine.connect():
+                pass
+            metrics = engine.pool.metrics
+            await engine.dispose()
+            async with engine.connect():
+                pass
+
+            assert engine.pool.metrics is metrics
+            assert metrics.checkouts == 2
+        finally:
+            await engine.dispose()
+
+
+class TestPoolDiagnostics:
+    """Тесты эндпоинта состояния пула"""
+
+    @pytest.mark.asyncio
+    async def test_requires_admin(self, async_client, test_regular_user):
+        """Тест запрета для обычного пользователя"""
+        response = await async_client.get("/diagnostics/pool", headers=await auth_headers(test_regular_user))
+        assert response.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_admin_sees_pool(self, async_client, test_admin_user):
+        """Тест состояния пула для администратора"""
+        response = await async_client.get("/diagnostics/pool", headers=await auth_headers(test_admin_user))
+        assert response.status_code == 200
+        # тестовая база работает на StaticPool без метрик
+        assert response.json() == {"pool": "StaticPool", "metrics": None}
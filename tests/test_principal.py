@@ -0,0 +1,128 @@
+import pytest
+from unittest.mock import patch
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.models import RoleEnum, Team
+from app.database.repository import user_repo
+from app.services.principal import Principal, PrincipalCache, principal_cache
+from tests.conftest import auth_headers
+
+
+class TestPrincipalCache:
+    """Тесты TTL/LRU кэша principal"""
+
+    def test_get_set_invalidate(self):
+        """Тест чтения, записи и сброса записи"""
+        cache = PrincipalCache(maxsize=10, ttl=60)
+        principal = Principal(id=1, role=RoleEnum.user, member_of_team=None, is_active=True)
+
+        assert cache.get(1) is None
+        cache.set(principal)
+        assert cache.get(1) == principal
+
+        cache.invalidate(1)
+        assert cache.get(1) is None
+
+    def test_ttl_expiry(self):
+        """Тест устаревания записи по TTL"""
+        cache = PrincipalCache(maxsize=10, ttl=5)
+        with patch("app.services.principal.time.monotonic", return_value=100.0):
+            cache.set(Principal(id=1, role=RoleEnum.user, member_of_team=None, is_active=True))
+        with patch("app.services.principal.time.monotonic", return_value=106.0):
+            assert cache.get(1) is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        """Тест вытеснения давно не использованной записи"""
+        cache = PrincipalCache(maxsize=2, ttl=60)
+        for user_id in (1, 2):
+            cache.set(Principal(id=user_id, role=RoleEnum.user, member_of_team=None, is_active=True))
+        cache.get(1)
+        cache.set(Principal(id=3, role=RoleEnum.user, member_of_team=None, is_active=True))
+
+        assert cache.get(2) is None
+        assert cache.get(1) is not None
+        assert cache.get(3) is not None
+
+    def test_principal_is_immutable(self):
+        """Тест неизменяемости principal"""
+        principal = Principal(id=1, role=RoleEnum.user, member_of_team=None, is_active=True)
+        with pytest.raises(AttributeError):
+            principal.role = RoleEnum.admin
+
+
+class TestCurrentPrincipal:
+    """Тесты зависимости current_principal"""
+
+    @pytest.mark.asyncio
+    async def test_cached_principal_skips_user_query(self, async_client, sql_statements, test_regular_user):
+        """Тест: повторный запрос не обращается к таблице users"""
+        headers = await auth_headers(test_regular_user)
+
+        await async_client.get("/tasks/", headers=headers)
+        assert principal_cache.get(test_regular_user.id) is not None
+
+        sql_statements.clear()
+        response = await async_client.get("/tasks/", headers=headers)
+
+        assert response.status_code == 200
+        assert not any("FROM users" in statement for statement in sql_statements)
+
+    @pytest.mark.asyncio
+    async def test_update_user_team_invalidates(self, async_client, test_session, test_regular_user):
+        """Тест: смена команды сбрасывает запись кэша"""
+        headers = await auth_headers(test_regular_user)
+        await async_client.get("/tasks/", headers=headers)
+
+        team = Team(team_name="Cache Team")
+        test_session.add(team)
+        await test_session.commit()
+        await user_repo.update_user_team(test_session, test_regular_user.id, team.team_id)
+
+        assert principal_cache.get(test_regular_user.id) is None
+
+    @pytest.mark.asyncio
+    async def test_user_manager_invalidates_after_commit(self, async_client, monkeypatch, test_admin_user,
+                                                          test_regular_user):
+        """Тест: изменение и удаление через fastapi-users сбрасывают principal коммитом, не раньше"""
+        headers = await auth_headers(test_regular_user)
+        await async_client.get("/tasks/", headers=headers)
+        commit = AsyncSession.commit
+        cached_at_commit = []
+
+        async def recording_commit(session):
+            cached_at_commit.append(principal_cache.get(test_regular_user.id) is not None)
+            return await commit(session)
+
+        monkeypatch.setattr(AsyncSession, "commit", recording_commit)
+        response = await async_client.patch("/users/me", headers=headers, json={"username": "renamed"})
+
+        assert response.status_code == 200
+        assert cached_at_commit[0] is True
+        assert principal_cache.get(test_regular_user.id) is None
+
+        await async_client.get("/tasks/", headers=headers)
+        cached_at_commit.clear()
+        response = await async_client.delete(f"/users/{test_regular_user.id}",
+                                             headers=await auth_headers(test_admin_user))
+
+        assert response.status_code == 204
+        assert cached_at_commit[0] is True
+        assert principal_cache.get(test_regular_user.id) is None
+
+    @pytest.mark.asyncio
+    async def test_inactive_user_rejected(self, async_client, test_session, test_regular_user):
+        """Тест: неактивный пользователь получает 401"""
+        test_regular_user.is_active = False
+        await test_session.commit()
+
+        response = await async_client.get("/tasks/", headers=await auth_headers(test_regular_user))
+        assert response.status_code == 401
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("headers", [{}, {"Authorization": "Bearer invalid"}])
+    async def test_invalid_token_rejected(self, async_client, headers):
+        """Тест: запрос без токена или с невалидным токеном получает 401"""
+        response = await async_client.get("/tasks/", headers=headers)
+        assert response.status_code == 401
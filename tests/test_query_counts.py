@@ -0,0 +1,119 @@
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+
+from app.database.models import Task, Team, Meeting, Evaluation, Comment, TaskStatusEnum
+from tests.conftest import auth_headers
+
+
+@pytest_asyncio.fixture(scope="function")
+async def populated_db(test_session, test_admin_user, test_regular_user):
+    """Команда, задачи с оценками и комментариями, встречи"""
+    team = Team(team_name="Query Team", team_admin=test_admin_user.id)
+    test_session.add(team)
+    await test_session.commit()
+
+    test_regular_user.member_of_team = team.team_id
+    now = datetime.now()
+    tasks = [
+        Task(
+            task_name=f"Task {i}",
+            status=TaskStatusEnum.completed,
+            task_executor=test_regular_user.id,
+            task_checker=test_admin_user.id,
+            team_id=team.team_id,
+            deadline=now + timedelta(days=1),
+        )
+        for i in range(5)
+    ]
+    test_session.add_all(tasks)
+    await test_session.commit()
+
+    for task in tasks:
+        test_session.add(Evaluation(evaluation_value=4, task_id=task.task_id, evaluator_id=test_admin_user.id))
+        test_session.add(Comment(content="comment", task_id=task.task_id, author_id=test_regular_user.id))
+    meeting = Meeting(
+        meeting_name="Sync",
+        meeting_date=now + timedelta(hours=2),
+        meeting_admin=test_admin_user.id,
+        participants=[test_admin_user, test_regular_user],
+    )
+    test_session.add(meeting)
+    await test_session.commit()
+
+    return {"team": team, "tasks": tasks, "meeting": meeting}
+
+
+class TestQueryCounts:
+    """Количество SQL-запросов на эндпоинт: защита от возврата жадной загрузки"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("endpoint, expected", [
+        ("/tasks/", 2),
+        ("/api/users/", 2),
+        ("/teams/", 2),
+        ("/meetings/", 2),
+        ("/evaluations/", 2),
+        ("/meetings/my-meetings", 2),
+        ("/evaluations/my-evaluations", 2),
+    ])
+    async def test_list_endpoints(self, async_client, sql_statements, populated_db, test_admin_user,
+                                  endpoint, expected):
+        """Тест: аутентификация и список сущностей без лишних запросов"""
+        headers = await auth_headers(test_admin_user)
+        sql_statements.clear()
+
+        response = await async_client.get(endpoint, headers=headers)
+
+        assert response.status_code == 200, response.text
+        assert len(sql_statements) == expected, sql_statements
+
+    @pytest.mark.asyncio
+    async def test_task_detail(self, async_client, sql_statements, populated_db, test_admin_user):
+        """Тест: проверка прав на задачу не тянет граф связей"""
+        headers = await auth_headers(test_admin_user)
+        task_id = populated_db["tasks"][0].task_id
+        sql_statements.clear()
+
+        response = await async_client.get(f"/tasks/{task_id}", headers=headers)
+
+        assert response.status_code == 200
+        assert len(sql_statements) == 2
+
+    @pytest.mark.asyncio
+    async def test_meeting_detail(self, async_client, sql_statements, populated_db, test_admin_user):
+        """Тест: встреча подгружает только участников"""
+        headers = await auth_headers(test_admin_user)
+        meeting_id = populated_db["meeting"].meeting_id
+        sql_statements.clear()
+
+        response = await async_client.get(f"/meetings/{meeting_id}", headers=headers)
+
+        assert response.status_code == 200
+        assert len(sql_statements) == 3
+
+    @pytest.mark.asyncio
+    async def test_calendar_events(self, async_client, sql_statements, populated_db, test_regular_user):
+        """Тест: календарь - задачи и встречи одним запросом"""
+        headers = await auth_headers(test_regular_user)
+        today = datetime.now().date()
+        sql_statements.clear()
+
+        response = await async_client.get(
+            "/calendar/events",
+            params={"start_date": today.isoformat(), "end_date": (today + timedelta(days=3)).isoformat()},
+            headers=headers,
+        )
+
+        assert response.status_code == 200
+        assert len(sql_statements) == 2
+
+    @pytest.mark.asyncio
+    async def test_index_page(self, async_client, sql_statements, populated_db):
+        """Тест: главная страница - по одному запросу колонок на секцию"""
+        sql_statements.clear()
+
+        response = await async_client.get("/")
+
+        assert response.status_code == 200
+        assert len(sql_statements) == 5
@@ -0,0 +1,75 @@
+import pytest
+from datetime import date, datetime
+
+from sqlalchemy import event
+
+from app.database.repository import (task_repo, evaluation_repo, comment_repo, meeting_repo, calendar_repo,
+                                     rating_repo)
+from tests.conftest import test_engine
+
+
+REPOSITORY_ACCESS_PATHS = [
+    ("tasks_by_team_status", lambda db: task_repo.get_tasks_by_filters(db, status="open", team_id=1),
+     ["ix_tasks_team_status"]),
+    ("tasks_by_executor", lambda db: task_repo.get_tasks_by_filters(db, user_id=1),
+     ["ix_tasks_executor_deadline"]),
+    ("open_tasks_by_deadline", lambda db: task_repo.get_open_tasks_by_deadline(db, 1),
+     ["ix_tasks_executor_open_deadline"]),
+    ("user_tasks", lambda db: task_repo.get_user_tasks(db, 1),
+     ["ix_tasks_executor_deadline", "ix_tasks_checker"]),
+    ("evaluations_by_evaluator", lambda db: evaluation_repo.get_evaluations_by_filters(db, user_id=1),
+     ["ix_evaluations_evaluator_created"]),
+    ("evaluations_by_task", lambda db: evaluation_repo.get_evaluations_by_filters(db, task_id=1),
+     ["sqlite_autoindex_evaluations_1"]),
+    ("evaluations_by_participant", lambda db: evaluation_repo.get_evaluations_by_filters(db, participant_id=1),
+     ["ix_tasks_executor_deadline", "ix_tasks_checker", "sqlite_autoindex_evaluations_1"]),
+    ("user_evaluations", lambda db: evaluation_repo.get_user_evaluations(db, 1),
+     ["ix_tasks_executor_deadline", "sqlite_autoindex_evaluations_1"]),
+    ("comments_by_task", lambda db: comment_repo.get_comments_by_task_id(db, 1),
+     ["ix_comments_task"]),
+    ("user_meetings", lambda db: meeting_repo.get_user_meetings(db, 1),
+     ["ix_meeting_participants_user_id"]),
+    ("meetings_by_date", lambda db: meeting_repo.get_meetings_by_filters(
+        db, start_date=datetime(2030, 1, 1), end_date=datetime(2030, 2, 1)),
+     ["ix_meetings_window"]),
+    ("meeting_conflicts", lambda db: meeting_repo.check_meeting_conflicts(db, [1, 2], datetime(2030, 1, 1), 60),
+     ["ix_meeting_participants_user_id"]),
+    ("calendar_events", lambda db: calendar_repo.get_user_events(db, 1, date(2030, 1, 1), date(2030, 1, 31)),
+     ["ix_tasks_executor_deadline", "ix_meeting_participants_user_id"]),
+    ("calendar_feed_watermark", lambda db: calendar_repo.get_feed_watermark(
+        db, "hash", date(2030, 1, 1), date(2030, 1, 31)),
+     ["ix_users_calendar_feed_token_hash", "ix_tasks_executor_deadline", "ix_meeting_participants_user_id"]),
+    ("user_rating", lambda db: rating_repo.get_user_rating(db, 1, date(2030, 1, 1)),
+     ["sqlite_autoindex_user_rating_daily_1"]),
+]
+
+
+class TestQueryPlans:
+    """Планировщик использует индексы под запросы репозиториев"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("name, call, indexes", REPOSITORY_ACCESS_PATHS,
+                             ids=[path[0] for path in REPOSITORY_ACCESS_PATHS])
+    async def test_repository_uses_index(self, test_session, name, call, indexes):
+        """Тест: EXPLAIN QUERY PLAN запросов метода содержит ожидаемые индексы и не сканирует таблицы"""
+        statements = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        event.listen(test_engine.sync_engine, "before_cursor_execute", _record)
+        try:
+            await call(test_session)
+        finally:
+            event.remove(test_engine.sync_engine, "before_cursor_execute", _record)
+
+        connection = await test_session.connection()
+        plan = []
+        for statement, parameters in statements:
+            result = await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plan.extend(row[-1] for row in result)
+
+        for index in indexes:
+            assert any(index in step for step in plan), plan
+        assert not any(step.startswith("SCAN ") and " USING " not in step and step != "SCAN events"
+                       for step in plan), plan
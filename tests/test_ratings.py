@@ -0,0 +1,181 @@
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, select
+
+from app.admin import EvaluationAdmin, TaskAdmin
+from app.database.models import Evaluation, Task, TaskStatusEnum, UserRatingDaily, TaskRatingTotal
+from app.database.repository import evaluation_repo, rating_repo, task_repo
+from tests.conftest import TestAsyncSessionLocal
+
+
+@pytest_asyncio.fixture(scope="function")
+async def rated_tasks(test_session, test_admin_user, test_regular_user):
+    """Две завершенные задачи обычного пользователя"""
+    tasks = [
+        Task(task_name=f"Rated {i}", status=TaskStatusEnum.completed,
+             task_executor=test_regular_user.id, task_checker=test_admin_user.id)
+        for i in range(2)
+    ]
+    test_session.add_all(tasks)
+    await test_session.commit()
+    return tasks
+
+
+async def evaluate(db, task, evaluator, value, days_ago=0):
+    """Создать оценку через репозиторий"""
+    return await evaluation_repo.create_evaluation(db, {
+        "evaluation_value": value,
+        "task_id": task.task_id,
+        "evaluator_id": evaluator.id,
+        "created_at": datetime.now(timezone.utc) - timedelta(days=days_ago),
+    })
+
+
+async def rollups(db):
+    """Непустые дневные корзины и итоги задач"""
+    users = await db.execute(
+        select(UserRatingDaily.user_id, UserRatingDaily.bucket_date,
+               UserRatingDaily.rating_sum, UserRatingDaily.rating_count)
+        .where(UserRatingDaily.rating_count > 0)
+        .order_by(UserRatingDaily.user_id, UserRatingDaily.bucket_date))
+    tasks = await db.execute(
+        select(TaskRatingTotal.task_id, TaskRatingTotal.rating_sum, TaskRatingTotal.rating_count)
+        .where(TaskRatingTotal.rating_count > 0)
+        .order_by(TaskRatingTotal.task_id))
+    return users.all(), tasks.all()
+
+
+async def assert_rollups_consistent():
+    """Инкрементальные суммы совпадают с пересчетом по оценкам"""
+    async with TestAsyncSessionLocal() as session:
+        incremental = await rollups(session)
+        await rating_repo.rebuild(session)
+        assert await rollups(session) == incremental
+    return incremental
+
+
+def admin_view(view_class):
+    """Вкладка админки на тестовой базе"""
+    view = view_class()
+    view.session_maker = TestAsyncSessionLocal
+    view.is_async = True
+    return view
+
+
+class TestRatingRollup:
+    """Тесты сводных сумм оценок"""
+
+    @pytest.mark.asyncio
+    async def test_average_from_rollup(self, test_session, rated_tasks, test_admin_user, test_regular_user):
+        """Тест: средний рейтинг считается по корзинам"""
+        await evaluate(test_session, rated_tasks[0], test_admin_user, 5)
+        await evaluate(test_session, rated_tasks[1], test_admin_user, 2)
+
+        result = await evaluation_repo.get_user_average_rating(test_session, test_regular_user.id, 30)
+
+        assert result == {"average_rating": 3.5, "total_evaluations": 2, "period_days": 30}
+        assert await rating_repo.get_task_average_rating(test_session, rated_tasks[0].task_id) == 5
+
+    @pytest.mark.asyncio
+    async def test_period_window(self, test_session, rated_tasks, test_admin_user, test_regular_user):
+        """Тест: оценки вне периода не учитываются"""
+        await evaluate(test_session, rated_tasks[0], test_admin_user, 5, days_ago=40)
+        await evaluate(test_session, rated_tasks[1], test_admin_user, 3)
+
+        result = await evaluation_repo.get_user_average_rating(test_session, test_regular_user.id, 30)
+
+        assert result["average_rating"] == 3
+        assert result["total_evaluations"] == 1
+
+    @pytest.mark.asyncio
+    async def test_update_and_delete(self, test_session, rated_tasks, test_admin_user, test_regular_user):
+        """Тест: изменение и удаление оценки меняют сводные суммы"""
+        evaluation = await evaluate(test_session, rated_tasks[0], test_admin_user, 5)
+        await evaluate(test_session, rated_tasks[1], test_admin_user, 3)
+
+        await evaluation_repo.update_evaluation(test_session, evaluation.evaluation_id, {"evaluation_value": 1})
+        result = await evaluation_repo.get_user_average_rating(test_session, test_regular_user.id, 30)
+        assert result["average_rating"] == 2
+
+        assert await evaluation_repo.delete_evaluation(test_session, evaluation.evaluation_id)
+        result = await evaluation_repo.get_user_average_rating(test_session, test_regular_user.id, 30)
+        assert result["average_rating"] == 3
+        assert result["total_evaluations"] == 1
+
+    @pytest.mark.asyncio
+    async def test_delete_task(self, test_session, rated_tasks, test_admin_user, test_regular_user):
+        """Тест: удаление задачи вычитает ее оценки"""
+        await evaluate(test_session, rated_tasks[0], test_admin_user, 5)
+        await evaluate(test_session, rated_tasks[1], test_admin_user, 3)
+
+        assert await task_repo.delete_task(test_session, rated_tasks[0].task_id)
+
+        result = await evaluation_repo.get_user_average_rating(test_session, test_regular_user.id, 30)
+        assert result["average_rating"] == 3
+        assert await rating_repo.get_task_average_rating(test_session, rated_tasks[0].task_id) is None
+
+    @pytest.mark.asyncio
+    async def test_rebuild_matches_incremental(self, test_session, rated_tasks, test_admin_user):
+        """Тест: пересчет дает те же корзины, что и инкрементальное обновление"""
+        await evaluate(test_session, rated_tasks[0], test_admin_user, 5, days_ago=3)
+        await evaluate(test_session, rated_tasks[1], test_admin_user, 4)
+
+        incremental = await rollups(test_session)
+        assert await rating_repo.rebuild(test_session) == (2, 2)
+        assert await rollups(test_session) == incremental
+
+    @pytest.mark.asyncio
+    async def test_executor_change_moves_buckets(self, test_session, rated_tasks, test_admin_user, test_regular_user):
+        """Тест: смена исполнителя переносит оценки задачи в его корзины"""
+        await evaluate(test_session, rated_tasks[0], test_admin_user, 5, days_ago=2)
+        await evaluate(test_session, rated_tasks[1], test_admin_user, 3)
+
+        assert await task_repo.update_task(test_session, rated_tasks[0].task_id, {"task_executor": test_admin_user.id})
+
+        assert (await evaluation_repo.get_user_average_rating(test_session, test_regular_user.id, 30))["average_rating"] == 3
+        assert (await evaluation_repo.get_user_average_rating(test_session, test_admin_user.id, 30))["average_rating"] == 5
+        await assert_rollups_consistent()
+
+
+class TestRatingRollupAdmin:
+    """Тесты сводных сумм при записи через админку"""
+
+    @pytest.mark.asyncio
+    async def test_evaluation_insert_update_delete(self, rated_tasks, test_admin_user, test_regular_user):
+        """Тест: создание, правка (в т.ч. перенос на другую задачу) и удаление оценки"""
+        view = admin_view(EvaluationAdmin)
+
+        evaluation = await view.insert_model(None, {"evaluation_value": 4, "task": str(rated_tasks[0].task_id),
+                                                    "evaluator": str(test_admin_user.id)})
+        users, tasks = await assert_rollups_consistent()
+        assert [(row.user_id, row.rating_sum) for row in users] == [(test_regular_user.id, 4)]
+
+        await view.update_model(None, str(evaluation.evaluation_id),
+                                {"evaluation_value": 2, "task": str(rated_tasks[1].task_id)})
+        users, tasks = await assert_rollups_consistent()
+        assert [(row.task_id, row.rating_sum) for row in tasks] == [(rated_tasks[1].task_id, 2)]
+
+        await view.delete_model(None, str(evaluation.evaluation_id))
+        assert await assert_rollups_consistent() == ([], [])
+
+    @pytest.mark.asyncio
+    async def test_task_executor_change_and_delete(self, test_session, rated_tasks, test_admin_user,
+                                                   test_regular_user):
+        """Тест: смена исполнителя и удаление задачи в админке"""
+        view = admin_view(TaskAdmin)
+        await evaluate(test_session, rated_tasks[0], test_admin_user, 5, days_ago=1)
+        await evaluate(test_session, rated_tasks[1], test_admin_user, 3)
+
+        await view.update_model(None, str(rated_tasks[0].task_id), {"executor": str(test_admin_user.id)})
+        users, _ = await assert_rollups_consistent()
+        assert sorted((row.user_id, row.rating_sum) for row in users) == sorted(
+            [(test_admin_user.id, 5), (test_regular_user.id, 3)])
+
+        await view.delete_model(None, str(rated_tasks[0].task_id))
+        # внешние ключи тестовой SQLite выключены: каскад базы выполняется вручную
+        async with TestAsyncSessionLocal() as session:
+            await session.execute(delete(Evaluation).where(Evaluation.task_id == rated_tasks[0].task_id))
+            await session.commit()
+        users, tasks = await assert_rollups_consistent()
+        assert [(row.user_id, row.rating_sum) for row in users] == [(test_regular_user.id, 3)]
@@ -0,0 +1,90 @@
+import pytest
+from datetime import datetime
+from sqlalchemy import event, select
+
+from app.database.models import meeting_participants
+from tests.conftest import auth_headers, test_engine
+
+
+@pytest.fixture(scope="function")
+def pool_events():
+    """Счетчики выдачи и возврата соединений тестового engine"""
+    counts = {"checkout": 0, "checkin": 0}
+
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        counts["checkout"] += 1
+
+    def _checkin(dbapi_connection, connection_record):
+        counts["checkin"] += 1
+
+    pool = test_engine.sync_engine.pool
+    event.listen(pool, "checkout", _checkout)
+    event.listen(pool, "checkin", _checkin)
+    yield counts
+    event.remove(pool, "checkout", _checkout)
+    event.remove(pool, "checkin", _checkin)
+
+
+class TestRequestSession:
+    """Одна сессия и одно соединение на запрос"""
+
+    @pytest.mark.asyncio
+    async def test_fastapi_users_route_single_connection(self, async_client, test_regular_user, pool_events):
+        """Тест: fastapi-users и обработчик используют одно соединение, возвращенное после ответа"""
+        response = await async_client.get("/users/me", headers=await auth_headers(test_regular_user))
+
+        assert response.status_code == 200
+        assert pool_events == {"checkout": 1, "checkin": 1}
+
+    @pytest.mark.asyncio
+    async def test_router_single_connection(self, async_client, test_regular_user, pool_events):
+        """Тест: проверка прав и обработчик роутера используют одно соединение"""
+        response = await async_client.get("/meetings/my-meetings", headers=await auth_headers(test_regular_user))
+
+        assert response.status_code == 200
+        assert pool_events == {"checkout": 1, "checkin": 1}
+
+    @pytest.mark.asyncio
+    async def test_connection_acquired_lazily(self, async_client, test_regular_user, pool_events):
+        """Тест: запрос без обращений к базе не берет соединение из пула"""
+        headers = await auth_headers(test_regular_user)
+        await async_client.get("/meetings/my-meetings", headers=headers)
+        pool_events.update(checkout=0, checkin=0)
+
+        # principal уже в кэше, обработчик отказывает до запросов к базе
+        response = await async_client.post("/meetings/", headers=headers, json={
+            "meeting_name": "Denied", "meeting_date": "2030-01-01T10:00:00", "participant_ids": []})
+
+        assert response.status_code == 403
+        assert pool_events == {"checkout": 0, "checkin": 0}
+
+    @pytest.mark.asyncio
+    async def test_create_meeting_loads_users_once(self, async_client, sql_statements, test_session,
+                                                   test_admin_user, test_regular_user):
+        """Тест: участники и организатор загружаются одним запросом"""
+        headers = await auth_headers(test_admin_user)
+        await async_client.get("/meetings/my-meetings", headers=headers)
+        sql_statements.clear()
+
+        response = await async_client.post("/meetings/", headers=headers, json={
+            "meeting_name": "Sync",
+            "meeting_date": datetime(2030, 1, 1, 10, 0).isoformat(),
+            "participant_ids": [test_regular_user.id, test_regular_user.id],
+        })
+
+        assert response.status_code == 200
+        user_selects = [s for s in sql_statements if s.lstrip().startswith("SELECT") and "FROM users" in s]
+        assert len(user_selects) == 1, user_selects
+
+        participants = await test_session.scalars(
+            select(meeting_participants.c.user_id).where(meeting_participants.c.meeting_id == response.json()["meeting_id"]))
+        assert set(participants) == {test_admin_user.id, test_regular_user.id}
+
+    @pytest.mark.asyncio
+    async def test_create_meeting_unknown_participant(self, async_client, test_admin_user):
+        """Тест: неизвестный участник - 404"""
+        response = await async_client.post("/meetings/", headers=await auth_headers(test_admin_user), json={
+            "meeting_name": "Sync", "meeting_date": "2030-01-01T10:00:00", "participant_ids": [999]})
+
+        assert response.status_code == 404
+        assert response.json()["detail"] == "User 999 not found"
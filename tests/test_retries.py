@@ -0,0 +1,230 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.database import unit_of_work
+from app.database.models import Team
+from app.database.repository import team_repo
+from app.services.database_error_handler import DatabaseErrorHandler, RetryPolicy, transient_reason
+from tests.conftest import TestAsyncSessionLocal, auth_headers
+
+
+class PgError(Exception):
+    """Ошибка драйвера с SQLSTATE, как у asyncpg"""
+
+    def __init__(self, sqlstate):
+        super().__init__(f"sqlstate {sqlstate}")
+        self.sqlstate = sqlstate
+
+
+def db_error(sqlstate=None, message="boom", connection_invalidated=False):
+    orig = PgError(sqlstate) if sqlstate else Exception(message)
+    return OperationalError("SELECT 1", {}, orig, connection_invalidated=connection_invalidated)
+
+
+def flaky(errors, result="ok"):
+    """Операция, которая падает заданными ошибками, затем возвращает результат"""
+    calls = []
+
+    async def operation():
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    return operation, calls
+
+
+@pytest.fixture(scope="function")
+def retry_stats(monkeypatch):
+    """Политика без пауз и чистые счетчики"""
+    monkeypatch.setattr(DatabaseErrorHandler, "retry_policy", RetryPolicy(attempts=3, budget=1.0, base_delay=0))
+    DatabaseErrorHandler.stats.reset()
+    yield DatabaseErrorHandler.stats
+    DatabaseErrorHandler.stats.reset()
+
+
+class TestTransientReason:
+    """Тесты классификации ошибок"""
+
+    @pytest.mark.parametrize("error, reason", [
+        (db_error("40001"), "serialization_failure"),
+        (db_error("40P01"), "deadlock"),
+        (db_error("08006"), "connection_failure"),
+        (db_error("08P01"), "connection_exception"),
+        (db_error(message="database is locked"), "database_locked"),
+        (db_error(connection_invalidated=True), "connection_reset"),
+        (db_error("23505"), None),
+        (IntegrityError("INSERT", {}, PgError("23505")), None),
+        (ValueError("not a database error"), None),
+    ])
+    def test_reason(self, error, reason):
+        """Тест: временные ошибки распознаются по SQLSTATE и признаку обрыва"""
+        assert transient_reason(error) == reason
+
+
+class TestRetry:
+    """Тесты повтора операций"""
+
+    @pytest.mark.asyncio
+    async def test_recovers_after_transient_errors(self, test_session, retry_stats):
+        """Тест: deadlock и serialization failure повторяются до успеха"""
+        operation, calls = flaky([db_error("40P01"), db_error("40001")])
+
+        assert await DatabaseErrorHandler.execute_with_error_handling(test_session, operation) == "ok"
+        assert len(calls) == 3
+        assert retry_stats.snapshot() == {
+            "retries": 2, "recovered": 1, "exhausted": 0, "not_retryable": 0,
+            "reasons": {"deadlock": 1, "serialization_failure": 1},
+        }
+
+    @pytest.mark.asyncio
+    async def test_exhausted(self, test_session, retry_stats):
+        """Тест: после исчерпания попыток - None, как и раньше"""
+        operation, calls = flaky([db_error("40P01")] * 5)
+
+        assert await DatabaseErrorHandler.execute_with_error_handling(test_session, operation) is None
+        assert len(calls) == 3
+        assert retry_stats.exhausted == 1
+
+    @pytest.mark.asyncio
+    async def test_budget(self, test_session, retry_stats, monkeypatch):
+        """Тест: пауза за пределами бюджета времени не выполняется"""
+        monkeypatch.setattr(DatabaseErrorHandler, "retry_policy",
+                            RetryPolicy(attempts=10, budget=0.01, base_delay=1.0, max_delay=1.0))
+        monkeypatch.setattr(RetryPolicy, "backoff", lambda self, retry: 1.0)
+        operation, calls = flaky([db_error("40001")] * 5)
+
+        assert await DatabaseErrorHandler.execute_with_error_handling(test_session, operation) is None
+        assert len(calls) == 1
+        assert retry_stats.exhausted == 1
+
+    @pytest.mark.asyncio
+    async def test_permanent_error_not_retried(self, test_session, retry_stats):
+        """Тест: ошибки данных не повторяются"""
+        operation, calls = flaky([IntegrityError("INSERT", {}, PgError("23505"))])
+
+        assert await DatabaseErrorHandler.execute_with_error_handling(test_session, operation) is None
+        assert len(calls) == 1
+        assert retry_stats.retries == 0
+
+    @pytest.mark.asyncio
+    async def test_handed_to_request_retry_after_earlier_work(self, retry_stats):
+        """Тест: откат потерял бы чтения, блокировки и записи запроса - ошибка уходит повтору запроса"""
+        operation, calls = flaky([db_error("40P01")])
+
+        with pytest.raises(OperationalError):
+            async with TestAsyncSessionLocal() as session:
+                async with unit_of_work(session):
+                    await session.execute(select(Team))
+                    await DatabaseErrorHandler.execute_with_error_handling(session, operation)
+
+        assert len(calls) == 1
+        assert retry_stats.retries == 0
+
+    @pytest.mark.asyncio
+    async def test_permanent_error_after_earlier_writes_raises(self, retry_stats):
+        """Тест: откат после записей запроса не превращается в None - запрос падает целиком"""
+        operation, calls = flaky([IntegrityError("UPDATE", {}, PgError("23505"))])
+
+        with pytest.raises(IntegrityError):
+            async with TestAsyncSessionLocal() as session:
+                async with unit_of_work(session):
+                    await team_repo.create_team(session, {"team_name": "Lost"})
+                    await DatabaseErrorHandler.execute_with_error_handling(session, operation)
+
+        async with TestAsyncSessionLocal() as session:
+            assert await session.scalar(select(func.count()).select_from(Team)) == 0
+
+    @pytest.mark.asyncio
+    async def test_not_retried_outside_unit_of_work(self, retry_stats):
+        """Тест: без unit of work операция в начатой транзакции не повторяется и дает None"""
+        operation, calls = flaky([db_error("40P01")])
+
+        async with TestAsyncSessionLocal() as session:
+            await session.execute(select(Team))
+            assert await DatabaseErrorHandler.execute_with_error_handling(session, operation) is None
+
+        assert len(calls) == 1
+        assert retry_stats.not_retryable == 1
+
+    @pytest.mark.asyncio
+    async def test_retry_in_fresh_transaction(self, retry_stats):
+        """Тест: операция, начавшая транзакцию, повторяется внутри unit of work"""
+        attempts = []
+
+        async with TestAsyncSessionLocal() as session:
+            async with unit_of_work(session):
+                async def create():
+                    attempts.append(1)
+                    team = await team_repo.create_team(session, {"team_name": f"Core {len(attempts)}"})
+                    if len(attempts) == 1:
+                        raise db_error("40001")
+                    return team
+
+                team = await DatabaseErrorHandler.execute_with_error_handling(session, create)
+
+        assert team.team_name == "Core 2"
+        assert retry_stats.recovered == 1
+
+
+class TestRequestRetry:
+    """Тесты повтора запроса целиком"""
+
+    @pytest.mark.asyncio
+    async def test_commit_failure_retries_request(self, async_client, retry_stats, test_admin_user, monkeypatch):
+        """Тест: serialization failure на коммите повторяет весь запрос, запись не дублируется"""
+        headers = await auth_headers(test_admin_user)
+        commit = AsyncSession.commit
+        commits = []
+
+        async def failing_commit(session):
+            commits.append(1)
+            if len(commits) == 1:
+                raise db_error("40001")
+            return await commit(session)
+
+        monkeypatch.setattr(AsyncSession, "commit", failing_commit)
+        response = await async_client.post("/teams/", headers=headers, json={"team_name": "Core"})
+
+        assert response.status_code == 200
+        assert len(commits) == 2
+        assert retry_stats.snapshot()["reasons"] == {"serialization_failure": 1}
+        assert retry_stats.recovered == 1
+        async with TestAsyncSessionLocal() as session:
+            assert await session.scalar(select(func.count()).select_from(Team)) == 1
+
+    @pytest.mark.asyncio
+    async def test_locked_operation_retries_request(self, async_client, retry_stats, test_admin_user, monkeypatch):
+        """Тест: deadlock после чтений запроса повторяет запрос целиком, а не одну операцию"""
+        headers = await auth_headers(test_admin_user)
+        create_team = team_repo.create_team
+        calls = []
+
+        async def deadlocked_create(db, data):
+            calls.append(1)
+            if len(calls) == 1:
+                return await DatabaseErrorHandler.execute_with_error_handling(db, flaky([db_error("40P01")])[0])
+            return await create_team(db, data)
+
+        monkeypatch.setattr(team_repo, "create_team", deadlocked_create)
+        response = await async_client.post("/teams/", headers=headers, json={"team_name": "Core"})
+
+        assert response.status_code == 200
+        assert len(calls) == 2
+        assert retry_stats.snapshot()["reasons"] == {"deadlock": 1}
+
+
+class TestRetryDiagnostics:
+    """Тесты эндпоинта счетчиков повторов"""
+
+    @pytest.mark.asyncio
+    async def test_admin_only(self, async_client, retry_stats, test_admin_user, test_regular_user):
+        """Тест: счетчики доступны только администратору"""
+        response = await async_client.get("/diagnostics/retries", headers=await auth_headers(test_regular_user))
+        assert response.status_code == 403
+
+        response = await async_client.get("/diagnostics/retries", headers=await auth_headers(test_admin_user))
+        assert response.status_code == 200
+        assert response.json()["retries"] == 0
@@ -0,0 +1,188 @@
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+
+from app.database.models import (Comment, Evaluation, Meeting, Task, TaskStatusEnum, Team, User,
+                                 meeting_participants)
+from app.database.repository import evaluation_repo, meeting_repo, task_repo, team_repo
+from tests.conftest import TestAsyncSessionLocal, auth_headers, test_engine
+
+
+@pytest_asyncio.fixture(scope="function")
+async def foreign_keys():
+    """Внешние ключи SQLite (ON DELETE CASCADE / SET NULL) на время теста"""
+    async with test_engine.connect() as conn:
+        await conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+    yield
+    async with test_engine.connect() as conn:
+        await conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+
+
+@pytest_asyncio.fixture(scope="function")
+async def team_task(test_session, test_admin_user, test_regular_user):
+    """Команда и задача с оценкой и комментариями"""
+    team = Team(team_name="Core", team_admin=test_admin_user.id)
+    test_session.add(team)
+    await test_session.commit()
+
+    test_regular_user.member_of_team = team.team_id
+    task = Task(task_name="Release", task_executor=test_regular_user.id, task_checker=test_admin_user.id,
+                team_id=team.team_id)
+    test_session.add(task)
+    await test_session.commit()
+
+    test_session.add(Evaluation(evaluation_value=4, task_id=task.task_id, evaluator_id=test_admin_user.id))
+    test_session.add_all([Comment(content=f"comment {i}", task_id=task.task_id) for i in range(3)])
+    await test_session.commit()
+    return team, task
+
+
+async def count(model) -> int:
+    async with TestAsyncSessionLocal() as session:
+        return await session.scalar(select(func.count()).select_from(model))
+
+
+class TestTaskStatus:
+    """Тесты смены статуса задачи одним запросом"""
+
+    @pytest.mark.asyncio
+    async def test_single_statement(self, async_client, sql_statements, team_task, test_regular_user):
+        """Тест: смена статуса - один UPDATE ... RETURNING с проверкой прав в условии"""
+        _, task = team_task
+        headers = await auth_headers(test_regular_user)
+        await async_client.get("/tasks/my-tasks", headers=headers)
+        sql_statements.clear()
+
+        response = await async_client.patch(f"/tasks/{task.task_id}/status", params={"status": "completed"},
+                                            headers=headers)
+
+        assert response.status_code == 200
+        assert len(sql_statements) == 1, sql_statements
+        assert sql_statements[0].startswith("UPDATE tasks") and "RETURNING" in sql_statements[0]
+
+        async with TestAsyncSessionLocal() as session:
+            assert await session.scalar(select(Task.status).where(Task.task_id == task.task_id)) == TaskStatusEnum.completed
+
+    @pytest.mark.asyncio
+    async def test_not_found_and_forbidden(self, async_client, team_task, test_session, test_regular_user):
+        """Тест: 404 для несуществующей задачи, 403 для постороннего пользователя"""
+        _, task = team_task
+        headers = await auth_headers(test_regular_user)
+
+        response = await async_client.patch("/tasks/999/status", params={"status": "completed"}, headers=headers)
+        assert response.status_code == 404
+
+        task.task_executor = None
+        await test_session.commit()
+        response = await async_client.patch(f"/tasks/{task.task_id}/status", params={"status": "completed"},
+                                            headers=headers)
+        assert response.status_code == 403
+
+
+class TestDeletePaths:
+    """Тесты удаления без загрузки дочерних строк"""
+
+    @pytest.mark.asyncio
+    async def test_delete_task_cascades_in_database(self, foreign_keys, sql_statements, team_task):
+        """Тест: оценки и комментарии удаляет база, ORM их не загружает"""
+        _, task = team_task
+        sql_statements.clear()
+
+        async with TestAsyncSessionLocal() as session:
+            assert await task_repo.delete_task(session, task.task_id)
+
+        assert not any("FROM comments" in statement for statement in sql_statements), sql_statements
+        assert await count(Comment) == 0
+        assert await count(Evaluation) == 0
+        assert await count(Task) == 0
+
+    @pytest.mark.asyncio
+    async def test_delete_missing(self, test_session):
+        """Тест: удаление несуществующих строк возвращает False"""
+        assert await task_repo.delete_task(test_session, 999) is False
+        assert await meeting_repo.delete_meeting(test_session, 999) is False
+        assert await team_repo.delete_team(test_session, 999) is False
+        assert await evaluation_repo.delete_evaluation(test_session, 999) is False
+
+    @pytest.mark.asyncio
+    async def test_delete_team_detaches_members_and_tasks(self, foreign_keys, team_task, test_regular_user):
+        """Тест: удаление команды отвязывает участников и задачи"""
+        team, task = team_task
+
+        async with TestAsyncSessionLocal() as session:
+            assert await team_repo.delete_team(session, team.team_id)
+
+        async with TestAsyncSessionLocal() as session:
+            assert await session.scalar(select(User.member_of_team).where(User.id == test_regular_user.id)) is None
+            assert await session.scalar(select(Task.team_id).where(Task.task_id == task.task_id)) is None
+
+    @pytest.mark.asyncio
+    async def test_delete_meeting_removes_participants(self, foreign_keys, test_session, test_admin_user,
+                                                       test_regular_user):
+        """Тест: участники встречи удаляются базой"""
+        meeting = Meeting(meeting_name="Sync", meeting_date=datetime(2030, 1, 1, 10, 0),
+                          meeting_admin=test_admin_user.id, participants=[test_admin_user, test_regular_user])
+        test_session.add(meeting)
+        await test_session.commit()
+
+        async with TestAsyncSessionLocal() as session:
+            assert await meeting_repo.delete_meeting(session, meeting.meeting_id)
+
+        assert await count(meeting_participants) == 0
+
+
+class TestUpdatePaths:
+    """Тесты обновления запросом UPDATE ... RETURNING"""
+
+    @pytest.mark.asyncio
+    async def test_update_meeting(self, test_session, test_admin_user, test_regular_user):
+        """Тест: новое окно встречи и замена участников"""
+        start = datetime(2030, 1, 1, 10, 0)
+        meeting = Meeting(meeting_name="Sync", meeting_date=start, meeting_admin=test_admin_user.id,
+                          participants=[test_admin_user])
+        test_session.add(meeting)
+        await test_session.commit()
+
+        async with TestAsyncSessionLocal() as session:
+            updated = await meeting_repo.update_meeting(session, meeting.meeting_id, {
+                "meeting_date": start + timedelta(hours=1),
+                "duration_minutes": 30,
+                "participants": [test_regular_user],
+            })
+            assert updated.meeting_end == start + timedelta(hours=1, minutes=30)
+
+            updated = await meeting_repo.update_meeting(session, meeting.meeting_id, {"duration_minutes": 45})
+            assert updated.meeting_end == start + timedelta(hours=1, minutes=45)
+
+        async with TestAsyncSessionLocal() as session:
+            participants = await session.scalars(
+                select(meeting_participants.c.user_id).where(meeting_participants.c.meeting_id == meeting.meeting_id))
+            assert list(participants) == [test_regular_user.id]
+
+        assert await meeting_repo.update_meeting(test_session, 999, {"meeting_name": "Missing"}) is None
+
+    @pytest.mark.asyncio
+    async def test_update_evaluation_without_value(self, sql_statements, team_task):
+        """Тест: изменение комментария оценки - один UPDATE без чтения прежнего значения"""
+        _, task = team_task
+        async with TestAsyncSessionLocal() as session:
+            evaluation_id = await session.scalar(select(Evaluation.evaluation_id))
+        sql_statements.clear()
+
+        async with TestAsyncSessionLocal() as session:
+            evaluation = await evaluation_repo.update_evaluation(session, evaluation_id, {"evaluation_comment": "ok"})
+
+        assert evaluation.evaluation_comment == "ok"
+        assert len(sql_statements) == 1, sql_statements
+        assert sql_statements[0].startswith("UPDATE evaluations")
+
+    @pytest.mark.asyncio
+    async def test_update_team(self, team_task):
+        """Тест: обновление команды возвращает новую строку"""
+        team, _ = team_task
+        async with TestAsyncSessionLocal() as session:
+            updated = await team_repo.update_team(session, team.team_id, {"team_name": "Platform"})
+
+        assert updated.team_name == "Platform"
+        assert updated.created_at is not None
@@ -0,0 +1,112 @@
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+
+from app.database.models import Evaluation, Meeting, Task, TaskStatusEnum
+from app.database.repository import task_repo
+from tests.conftest import TestAsyncSessionLocal, auth_headers
+
+
+@pytest_asyncio.fixture(scope="function")
+async def records(test_session, test_admin_user, test_regular_user):
+    """Три задачи пользователя с оценками и три встречи, одна без него"""
+    tasks = [
+        Task(task_name=f"Task {i}", task_description="long text", status=TaskStatusEnum.completed,
+             task_executor=test_regular_user.id, task_checker=test_admin_user.id)
+        for i in range(3)
+    ]
+    test_session.add_all(tasks)
+    await test_session.commit()
+
+    start = datetime(2030, 1, 1)
+    meetings = [
+        Meeting(meeting_name=f"Meeting {i}", meeting_date=start + timedelta(hours=i), participants=[test_regular_user])
+        for i in range(2)
+    ] + [Meeting(meeting_name="Board", meeting_date=start, participants=[test_admin_user])]
+    evaluations = [Evaluation(evaluation_value=4, task_id=task.task_id, evaluator_id=test_admin_user.id)
+                   for task in tasks]
+    test_session.add_all(meetings + evaluations)
+    await test_session.commit()
+    return tasks, meetings, evaluations
+
+
+class TestSparseFields:
+    """Тесты разреженных наборов полей"""
+
+    @pytest.mark.asyncio
+    async def test_list_selects_only_requested_columns(self, async_client, sql_statements, records, test_admin_user):
+        """Тест: fields задает и форму ответа, и список колонок SELECT"""
+        headers = await auth_headers(test_admin_user)
+        await async_client.get("/tasks/", headers=headers)
+        sql_statements.clear()
+
+        response = await async_client.get("/tasks/", params={"fields": "task_name,task_id,status"}, headers=headers)
+
+        assert response.status_code == 200
+        assert response.json()["items"][0] == {"task_id": records[0][0].task_id, "task_name": "Task 0",
+                                               "status": "completed"}
+        select_tasks = next(s for s in sql_statements if "FROM tasks" in s)
+        assert "task_description" not in select_tasks and "created_at" not in select_tasks
+
+    @pytest.mark.asyncio
+    async def test_pages_without_key_fields(self, async_client, records, test_regular_user):
+        """Тест: ключи курсора добавляются к колонкам, но не попадают в ответ"""
+        headers = await auth_headers(test_regular_user)
+
+        response = await async_client.get("/meetings/my-meetings", params={"fields": "meeting_name", "limit": 1},
+                                          headers=headers)
+        body = response.json()
+        assert body["items"] == [{"meeting_name": "Meeting 0"}]
+
+        response = await async_client.get("/meetings/my-meetings", headers=headers,
+                                          params={"fields": "meeting_name", "limit": 1, "cursor": body["next_cursor"]})
+        assert response.json() == {"items": [{"meeting_name": "Meeting 1"}], "next_cursor": None}
+
+    @pytest.mark.asyncio
+    async def test_unknown_field(self, async_client, test_admin_user):
+        """Тест: поле не из схемы ответа - 400"""
+        response = await async_client.get("/evaluations/", params={"fields": "evaluation_id,password"},
+                                          headers=await auth_headers(test_admin_user))
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Unknown fields: password"
+
+    @pytest.mark.asyncio
+    async def test_detail_permissions_with_projection(self, async_client, records, test_regular_user):
+        """Тест: права проверяются и когда колонок проверки нет среди запрошенных полей"""
+        tasks, meetings, evaluations = records
+        headers = await auth_headers(test_regular_user)
+
+        response = await async_client.get(f"/tasks/{tasks[0].task_id}", params={"fields": "task_name"}, headers=headers)
+        assert response.json() == {"task_name": "Task 0"}
+
+        response = await async_client.get(f"/evaluations/{evaluations[0].evaluation_id}",
+                                          params={"fields": "evaluation_value"}, headers=headers)
+        assert response.json() == {"evaluation_value": 4}
+
+        response = await async_client.get(f"/meetings/{meetings[0].meeting_id}", params={"fields": "meeting_name"},
+                                          headers=headers)
+        assert response.json() == {"meeting_name": "Meeting 0"}
+
+        response = await async_client.get(f"/meetings/{meetings[2].meeting_id}", params={"fields": "meeting_name"},
+                                          headers=headers)
+        assert response.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_full_detail(self, async_client, records, test_regular_user):
+        """Тест: без fields - полная схема"""
+        _, _, evaluations = records
+
+        response = await async_client.get(f"/evaluations/{evaluations[0].evaluation_id}",
+                                          headers=await auth_headers(test_regular_user))
+        assert response.status_code == 200
+        assert response.json()["evaluation_id"] == evaluations[0].evaluation_id
+        assert "created_at" in response.json()
+
+    @pytest.mark.asyncio
+    async def test_projection_skips_identity_map(self, records):
+        """Тест: проекция возвращает строки, ORM-объекты в сессии не появляются"""
+        async with TestAsyncSessionLocal() as session:
+            page = await task_repo.get_tasks_by_filters(session, fields=("task_name",))
+
+            assert [row.task_name for row in page.items] == ["Task 0", "Task 1", "Task 2"]
+            assert len(session.identity_map) == 0
@@ -0,0 +1,84 @@
+import pytest
+from sqlalchemy import text
+
+import main
+from app.database.migrations import SchemaVersionError, alembic_head, verify_schema_version
+from app.services.lazy_app import LazyApp
+from tests.conftest import test_engine
+
+
+class TestSchemaVersion:
+    """Тесты проверки версии схемы при production-старте"""
+
+    @pytest.mark.asyncio
+    async def test_not_under_alembic(self):
+        """Тест: без таблицы alembic_version старт прерывается"""
+        with pytest.raises(SchemaVersionError, match="alembic upgrade head"):
+            await verify_schema_version(test_engine)
+
+    @pytest.mark.asyncio
+    async def test_version_matches(self):
+        """Тест: версия совпадает с последней миграцией"""
+        async with test_engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)"))
+            await conn.execute(text("INSERT INTO alembic_version VALUES (:version)"), {"version": alembic_head()})
+        try:
+            assert await verify_schema_version(test_engine) == alembic_head()
+
+            async with test_engine.begin() as conn:
+                await conn.execute(text("UPDATE alembic_version SET version_num = '0001'"))
+            with pytest.raises(SchemaVersionError, match="0001"):
+                await verify_schema_version(test_engine)
+        finally:
+            async with test_engine.begin() as conn:
+                await conn.execute(text("DROP TABLE alembic_version"))
+
+    @pytest.mark.asyncio
+    async def test_production_lifespan_skips_create_all(self, monkeypatch):
+        """Тест: production-старт только сверяет версию схемы"""
+        calls = []
+
+        async def record(name):
+            calls.append(name)
+
+        monkeypatch.setattr(main, "STARTUP_MODE", "production")
+        monkeypatch.setattr(main, "verify_schema_version", lambda engine: record("verify"))
+        monkeypatch.setattr(main, "create_db_and_tables", lambda: record("create_all"))
+        monkeypatch.setattr(main, "create_admin_user", lambda: record("create_admin"))
+        monkeypatch.setattr(main, "engine", test_engine)
+
+        async with main.lifespan(main.app):
+            pass
+
+        assert calls == ["verify"]
+
+
+class TestLazyAdmin:
+    """Тесты ленивой сборки админки"""
+
+    @pytest.mark.asyncio
+    async def test_built_on_first_request(self):
+        """Тест: фабрика вызывается один раз, при первом запросе"""
+        built = []
+
+        async def app(scope, receive, send):
+            built.append(scope["path"])
+
+        lazy = LazyApp(lambda: built.append("factory") or app)
+        assert not lazy.is_built
+
+        await lazy({"type": "http", "path": "/a"}, None, None)
+        await lazy({"type": "http", "path": "/b"}, None, None)
+
+        assert built == ["factory", "/a", "/b"]
+
+    @pytest.mark.asyncio
+    async def test_admin_mounted(self, async_client, monkeypatch):
+        """Тест: /admin отвечает, админка собирается при обращении"""
+        monkeypatch.setattr(main.admin, "_app", None)
+
+        response = await async_client.get("/admin/login")
+
+        assert response.status_code == 200
+        assert main.admin.is_built
+        assert main.app.url_path_for("admin:login") == "/admin/login"
@@ -0,0 +1,97 @@
+import pytest
+from sqlalchemy import event, select
+
+from app.database.database import unit_of_work
+from app.database.models import Team, User
+from app.database.repository import team_repo, user_repo
+from app.services.principal import principal_cache
+from tests.conftest import TestAsyncSessionLocal, auth_headers, test_engine
+
+
+@pytest.fixture(scope="function")
+def commits():
+    """Список коммитов тестового engine"""
+    recorded = []
+
+    def _commit(conn):
+        recorded.append(conn)
+
+    event.listen(test_engine.sync_engine, "commit", _commit)
+    yield recorded
+    event.remove(test_engine.sync_engine, "commit", _commit)
+
+
+class TestUnitOfWork:
+    """Тесты записи одной транзакцией на запрос"""
+
+    @pytest.mark.asyncio
+    async def test_create_team_single_commit(self, async_client, sql_statements, commits, test_admin_user):
+        """Тест: команда и привязка админа - один коммит, серверные значения через RETURNING"""
+        headers = await auth_headers(test_admin_user)
+        await async_client.get("/teams/", headers=headers)
+        sql_statements.clear()
+        commits.clear()
+
+        response = await async_client.post("/teams/", headers=headers, json={"team_name": "Core"})
+
+        assert response.status_code == 200
+        assert response.json()["created_at"]
+        assert len(commits) == 1
+
+        insert = next(s for s in sql_statements if s.startswith("INSERT INTO teams"))
+        assert "RETURNING" in insert
+        after_insert = sql_statements[sql_statements.index(insert) + 1:]
+        assert not any(s.startswith("SELECT") and "FROM teams" in s for s in after_insert), after_insert
+
+        async with TestAsyncSessionLocal() as session:
+            member_of_team = await session.scalar(select(User.member_of_team).where(User.id == test_admin_user.id))
+        assert member_of_team == response.json()["team_id"]
+        assert principal_cache.get(test_admin_user.id) is None
+
+    @pytest.mark.asyncio
+    async def test_exception_rolls_back(self, test_admin_user):
+        """Тест: исключение после записи откатывает всю транзакцию"""
+        with pytest.raises(RuntimeError):
+            async with TestAsyncSessionLocal() as session:
+                async with unit_of_work(session):
+                    team = await team_repo.create_team(session, {"team_name": "Rolled back"})
+                    assert team.team_id is not None
+                    raise RuntimeError
+
+        async with TestAsyncSessionLocal() as session:
+            assert await session.scalar(select(Team).where(Team.team_name == "Rolled back")) is None
+
+    @pytest.mark.asyncio
+    async def test_principal_invalidated_after_commit(self, test_regular_user):
+        """Тест: principal сбрасывается только после коммита"""
+        async with TestAsyncSessionLocal() as session:
+            principal_cache.set(await user_repo.get_principal(session, test_regular_user.id))
+            async with unit_of_work(session):
+                team = await team_repo.create_team(session, {"team_name": "Core"})
+                await user_repo.update_user_team(session, test_regular_user.id, team.team_id)
+                assert principal_cache.get(test_regular_user.id) is not None
+
+        assert principal_cache.get(test_regular_user.id) is None
+
+    @pytest.mark.asyncio
+    async def test_failed_operation_returns_none(self, test_session):
+        """Тест: ошибка записи внутри unit of work по-прежнему дает None"""
+        await team_repo.create_team(test_session, {"team_name": "Core"})
+
+        async with TestAsyncSessionLocal() as session:
+            async with unit_of_work(session):
+                assert await team_repo.create_team(session, {"team_name": "Core"}) is None
+                team = await team_repo.create_team(session, {"team_name": "Other"})
+
+        async with TestAsyncSessionLocal() as session:
+            names = await session.scalars(select(Team.team_name).order_by(Team.team_name))
+            assert list(names) == ["Core", "Other"]
+            assert team.team_id is not None
+
+    @pytest.mark.asyncio
+    async def test_commit_outside_unit_of_work(self, test_session):
+        """Тест: без unit of work репозиторий коммитит сам"""
+        await team_repo.create_team(test_session, {"team_name": "Standalone"})
+
+        async with TestAsyncSessionLocal() as session:
+            assert await session.scalar(select(Team).where(Team.team_name == "Standalone")) is not None
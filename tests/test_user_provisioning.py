@@ -0,0 +1,101 @@
+import pytest
+from sqlalchemy import func, select
+
+from app.database.models import RoleEnum, Team, User
+from app.services.password_pool import is_usable_password
+from tests.conftest import TestAsyncSessionLocal, auth_headers, password_helper
+
+
+async def user_by_email(email: str) -> User:
+    async with TestAsyncSessionLocal() as session:
+        return await session.scalar(select(User).where(User.email == email))
+
+
+class TestBulkUsers:
+    """Тесты массового создания пользователей"""
+
+    @pytest.mark.asyncio
+    async def test_admin_only(self, async_client, test_regular_user):
+        """Тест: создавать пользователей пачкой может только администратор"""
+        response = await async_client.post("/api/users/bulk", headers=await auth_headers(test_regular_user),
+                                           json={"users": [{"email": "a@test.com"}]})
+        assert response.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_per_row_results(self, async_client, test_session, test_admin_user):
+        """Тест: ошибки отдельных строк не мешают остальным"""
+        team = Team(team_name="Core")
+        test_session.add(team)
+        await test_session.commit()
+
+        response = await async_client.post("/api/users/bulk", headers=await auth_headers(test_admin_user), json={
+            "users": [
+                {"email": "a@test.com", "username": "alice", "password": "alice-pass", "team_id": team.team_id},
+                {"email": "b@test.com", "role": "manager"},
+                {"email": "ADMIN@test.com"},
+                {"email": "A@test.com"},
+                {"email": "c@test.com", "username": "testadmin"},
+                {"email": "d@test.com", "team_id": 999},
+            ]
+        })
+
+        assert response.status_code == 200
+        report = response.json()
+        assert (report["created"], report["failed"]) == (2, 4)
+        assert [row["error"] for row in report["results"]] == [
+            None, None, "Email already registered", "Duplicate email in import", "Username already taken",
+            "Team 999 not found",
+        ]
+
+        alice = await user_by_email("a@test.com")
+        assert alice.id == report["results"][0]["user_id"]
+        assert alice.member_of_team == team.team_id
+        assert password_helper.verify_and_update("alice-pass", alice.hashed_password)[0]
+
+        bob = await user_by_email("b@test.com")
+        assert bob.role == RoleEnum.manager
+        assert not is_usable_password(bob.hashed_password)
+
+    @pytest.mark.asyncio
+    async def test_no_password_cannot_log_in(self, async_client, test_admin_user):
+        """Тест: пользователь без пароля не входит, пока не задаст его через forgot-password"""
+        await async_client.post("/api/users/bulk", headers=await auth_headers(test_admin_user),
+                                json={"users": [{"email": "b@test.com"}]})
+        hashed_password = (await user_by_email("b@test.com")).hashed_password
+
+        response = await async_client.post("/auth/jwt/login", data={"username": "b@test.com",
+                                                                     "password": hashed_password})
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_batched_statements(self, async_client, sql_statements, test_admin_user):
+        """Тест: проверки и вставка - постоянное число запросов, не по одному на пользователя"""
+        headers = await auth_headers(test_admin_user)
+        await async_client.get("/api/users/", headers=headers)
+        sql_statements.clear()
+
+        response = await async_client.post("/api/users/bulk", headers=headers, json={
+            "users": [{"email": f"user{i}@test.com", "username": f"user{i}"} for i in range(500)]
+        })
+
+        assert response.json()["created"] == 500
+        assert len(sql_statements) <= 4, sql_statements
+        async with TestAsyncSessionLocal() as session:
+            assert await session.scalar(select(func.count()).select_from(User)) == 501
+
+    @pytest.mark.asyncio
+    async def test_csv(self, async_client, test_admin_user):
+        """Тест: CSV-файл, невалидные строки - ошибки этих строк"""
+        content = ("email,username,password,role,team_id\n"
+                   "a@test.com,alice,,,\n"
+                   "not-an-email,bob,,,\n"
+                   "c@test.com,,,wizard,\n")
+
+        response = await async_client.post("/api/users/bulk/csv", headers=await auth_headers(test_admin_user),
+                                           files={"file": ("users.csv", content, "text/csv")})
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert results[0]["user_id"] is not None
+        assert results[1]["email"] == "not-an-email" and results[1]["error"].startswith("email")
+        assert results[2]["error"].startswith("role")